@@ -0,0 +1,65 @@
+import json
+import boto3
+import os
+import uuid
+from common import dynamo
+from common.archive import archive_age_day, archive_cutoff, archive_items
+from common.instrumentation import instrument, instrument_client, log, put_metric, timed_stage
+
+# --- Configuration from Environment Variables ---
+RESUME_TABLE = os.environ.get("RESUME_TABLE")
+SCAN_PAGE_SIZE = int(os.environ.get("ARCHIVE_SCAN_PAGE_SIZE", "500"))
+SAFETY_MARGIN_MS = 60 * 1000  # Stop and hand off before the Lambda timeout
+
+# --- Initialize AWS Clients ---
+lambda_client = instrument_client(boto3.client('lambda'))
+
+@instrument("ArchiveApplicationsFunction")
+def lambda_handler(event, context):
+    """
+    Scheduled archival run: moves applications submitted (or restored) more than
+    ARCHIVE_AFTER_DAYS ago out of the resume table into date-partitioned, compressed
+    columnar files in S3, leaving a stub per application in the archive index. Pass
+    {"days": n} to override the age. Re-invokes itself with the scan cursor when it
+    runs low on time.
+    """
+    event = event or {}
+    cutoff = event.get('cutoff') or archive_cutoff(event.get('days'))
+    run_id = event.get('run_id') or uuid.uuid4().hex[:12]
+    start_key = event.get('start_key')
+    archived = event.get('archived', 0)
+    scanned = event.get('scanned', 0)
+    page_number = event.get('page', 0)
+
+    while True:
+        kwargs = {'Limit': SCAN_PAGE_SIZE}
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+        with timed_stage("Scan"):
+            items, start_key = dynamo.read_page('scan', RESUME_TABLE, **kwargs)
+        scanned += len(items)
+
+        # Unparseable dates are never archived: their age is unknown. Restored applications
+        # count their age from the restore, so the next run does not archive them again.
+        stale = [item for item in items if (archive_age_day(item) or cutoff) < cutoff]
+        if stale:
+            with timed_stage("Archive"):
+                archived += archive_items(stale, RESUME_TABLE, f"{run_id}-{page_number:05d}")
+            page_number += 1
+
+        if not start_key:
+            break
+
+        if context and context.get_remaining_time_in_millis() < SAFETY_MARGIN_MS:
+            log("Running low on time. Handing off.", archived=archived, scanned=scanned)
+            lambda_client.invoke(
+                FunctionName=context.function_name,
+                InvocationType='Event',
+                Payload=json.dumps({'cutoff': cutoff, 'run_id': run_id, 'start_key': start_key,
+                                    'archived': archived, 'scanned': scanned, 'page': page_number})
+            )
+            return {'statusCode': 202, 'body': json.dumps({'archived': archived, 'scanned': scanned})}
+
+    put_metric("ArchiveRunScanned", scanned)
+    log("Archival run finished", cutoff=cutoff, archived=archived, scanned=scanned)
+    return {'statusCode': 200, 'body': json.dumps({'cutoff': cutoff, 'archived': archived, 'scanned': scanned})}
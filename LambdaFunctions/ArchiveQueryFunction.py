@@ -0,0 +1,62 @@
+import json
+import os
+from datetime import date
+from common.archive import query_archive, restore
+from common.instrumentation import instrument, log, put_metric, timed_stage
+from common.responses import json_response
+
+# --- Configuration from Environment Variables ---
+RESUME_TABLE = os.environ.get("RESUME_TABLE")
+MAX_RESULTS = int(os.environ.get("ARCHIVE_MAX_RESULTS", "1000"))
+MAX_RESTORE = 500
+
+HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET,POST,OPTIONS',
+    'Access-Control-Allow-Headers': '*'
+}
+
+def error(status_code, message):
+    return {'statusCode': status_code, 'headers': HEADERS, 'body': json.dumps({'status': 'error', 'message': message})}
+
+@instrument("ArchiveQueryFunction")
+def lambda_handler(event, context):
+    """
+    GET searches the archive: `from`/`to` (YYYY-MM-DD submission dates) plus optional
+    `email`, `job_id` and `status` filters and `limit`. POST {"resume_ids": [...]}
+    restores archived applications into the resume table.
+    """
+    method = (event or {}).get('httpMethod') or ((event or {}).get('requestContext') or {}).get('http', {}).get('method', 'GET')
+    try:
+        if method == 'POST':
+            body = json.loads(event.get('body') or '{}')
+            resume_ids = [str(r) for r in body.get('resume_ids') or [] if r]
+            if not resume_ids or len(resume_ids) > MAX_RESTORE:
+                return error(400, f"resume_ids must list between 1 and {MAX_RESTORE} applications")
+            with timed_stage("Restore"):
+                restored = restore(resume_ids, RESUME_TABLE)
+            log("Restored archived applications", requested=len(resume_ids), restored=len(restored))
+            return json_response(200, {"status": "success", "restored": restored,
+                                       "not_found": sorted(set(resume_ids) - set(restored))}, event, headers=HEADERS)
+
+        params = (event or {}).get('queryStringParameters') or {}
+        try:
+            start = date.fromisoformat(params['from'])
+            end = date.fromisoformat(params['to']) if params.get('to') else date.today()
+            limit = min(int(params.get('limit', MAX_RESULTS)), MAX_RESULTS)
+            if start > end:
+                raise ValueError("from must not be after to")
+        except KeyError:
+            return error(400, "from (YYYY-MM-DD) is required")
+        except ValueError as e:
+            return error(400, str(e))
+
+        filters = {'email': params.get('email'), 'jobId': params.get('job_id'), 'status': params.get('status')}
+        with timed_stage("ArchiveQuery"):
+            applications = query_archive(start, end, filters, limit)
+        put_metric("ArchivedRowsReturned", len(applications))
+        return json_response(200, {"status": "success", "applications": applications}, event, headers=HEADERS)
+
+    except Exception as e:
+        log("Error serving archive request", level="ERROR", error=str(e))
+        return error(500, str(e))
@@ -0,0 +1,106 @@
+import json
+import boto3
+import os
+from common import dynamo
+from common.instrumentation import instrument, instrument_client, log, put_metric, timed_stage
+from common.locations import JOB_SORT_KEY, RESUME_SORT_KEY, job_location, resume_location
+
+# --- Configuration from Environment Variables ---
+RESUME_TABLE = os.environ.get("RESUME_TABLE")
+JOB_TABLE = os.environ.get("JOB_TABLE")
+DEFAULT_SEGMENTS = int(os.environ.get("BACKFILL_SEGMENTS", "8"))
+SAFETY_MARGIN_MS = 30 * 1000  # Stop and hand off before the Lambda timeout
+
+# table -> (table name, key attribute, attributes the location is computed from, sort key, resolver)
+TARGETS = {
+    'resumes': (RESUME_TABLE, 'resume_id', ('address', 'work_pref', 'submitted_at', 'datetime'), RESUME_SORT_KEY, resume_location),
+    'jobs': (JOB_TABLE, 'job_id', ('location', 'workMode', 'postedDate', 'allowRemote'), JOB_SORT_KEY, job_location),
+}
+
+# --- Initialize AWS Clients ---
+lambda_client = instrument_client(boto3.client('lambda'))
+
+def write_location(table_name, key_name, key, attributes):
+    names = {f"#a{i}": name for i, name in enumerate(attributes)}
+    dynamo.table(table_name).update_item(
+        Key={key_name: key},
+        UpdateExpression='SET ' + ', '.join(f"{placeholder} = :a{i}" for i, placeholder in enumerate(names)),
+        ConditionExpression=f'attribute_exists({key_name})',
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues={f":a{i}": value for i, value in enumerate(attributes.values())}
+    )
+
+@instrument("BackfillLocationIndexFunction")
+def lambda_handler(event, context):
+    """
+    One-off backfill of the gazetteer location attributes (city_code, region_code,
+    work_mode and the GSI sort key) on existing resumes and jobs. Invoke it with
+    {"table": "resumes"|"jobs", "segments": n}; it starts one worker per parallel-scan
+    segment, each re-invoking itself with its cursor when low on time. Resumes without
+    submitted_at take their sort key from the display datetime, and undated items are
+    indexed as the oldest, so no item with a known place is left out of the index.
+    """
+    event = event or {}
+    target = event.get('table', 'resumes')
+    if target not in TARGETS:
+        return {'statusCode': 400, 'body': json.dumps({'error': f"table must be one of {', '.join(TARGETS)}"})}
+    table_name, key_name, source_fields, sort_key, resolve = TARGETS[target]
+
+    if 'segment' not in event:
+        total_segments = int(event.get('segments') or DEFAULT_SEGMENTS)
+        for segment in range(total_segments):
+            lambda_client.invoke(
+                FunctionName=context.function_name,
+                InvocationType='Event',
+                Payload=json.dumps({'table': target, 'segment': segment, 'total_segments': total_segments})
+            )
+        log("Backfill started", table=target, segments=total_segments)
+        return {'statusCode': 202, 'body': json.dumps({'table': target, 'segments': total_segments})}
+
+    segment, total_segments = event['segment'], event['total_segments']
+    start_key = event.get('start_key')
+    indexed = unresolved = 0
+    scan_kwargs = {
+        'Segment': segment,
+        'TotalSegments': total_segments,
+        **dynamo.projection((key_name,) + source_fields + ('city_code', 'region_code', 'work_mode', 'remote_code', sort_key))
+    }
+
+    while True:
+        if start_key:
+            scan_kwargs['ExclusiveStartKey'] = start_key
+        with timed_stage("Scan"):
+            items, start_key = dynamo.read_page('scan', table_name, **scan_kwargs)
+
+        for item in items:
+            attributes = resolve(item)
+            if not attributes:
+                unresolved += 1
+                continue
+            if all(item.get(name) == value for name, value in attributes.items()):
+                continue
+            try:
+                with timed_stage("Update"):
+                    write_location(table_name, key_name, item[key_name], attributes)
+                indexed += 1
+            except Exception as e:
+                log("Failed to index item", level="ERROR", key=item[key_name], error=str(e))
+
+        if not start_key:
+            break
+
+        if context and context.get_remaining_time_in_millis() < SAFETY_MARGIN_MS:
+            log("Running low on time. Handing off.", table=target, segment=segment, indexed=indexed)
+            put_metric("ItemsIndexed", indexed)
+            lambda_client.invoke(
+                FunctionName=context.function_name,
+                InvocationType='Event',
+                Payload=json.dumps({'table': target, 'segment': segment, 'total_segments': total_segments,
+                                    'start_key': start_key})
+            )
+            return {'statusCode': 202, 'body': json.dumps({'segment': segment, 'indexed': indexed})}
+
+    log("Location backfill segment finished", table=target, segment=segment, indexed=indexed, unresolved=unresolved)
+    put_metric("ItemsIndexed", indexed)
+    put_metric("LocationsUnresolved", unresolved)
+    return {'statusCode': 200, 'body': json.dumps({'segment': segment, 'indexed': indexed, 'unresolved': unresolved})}
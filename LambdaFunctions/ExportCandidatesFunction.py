@@ -0,0 +1,312 @@
+import csv
+import io
+import json
+import boto3
+import os
+import uuid
+from datetime import datetime
+from boto3.dynamodb.conditions import Attr
+from common import dynamo
+from common.instrumentation import instrument, instrument_client, log, put_metric, timed_stage
+from common.job_aliases import resolve_job_ids
+
+# Optional: Parquet exports when pyarrow is bundled in the layer
+try:
+    import pyarrow
+    import pyarrow.parquet as parquet
+except ImportError:
+    pyarrow = None
+
+# --- Configuration from Environment Variables ---
+RESUME_TABLE = os.environ.get("RESUME_TABLE")
+JOB_TABLE = os.environ.get("JOB_TABLE")
+EXPORT_BUCKET = os.environ.get("EXPORT_BUCKET")
+EXPORT_PREFIX = os.environ.get("EXPORT_PREFIX", "exports/candidates/")
+EXPORT_URL_EXPIRY = int(os.environ.get("EXPORT_URL_EXPIRY", "3600"))
+PART_SIZE = int(os.environ.get("EXPORT_PART_SIZE", str(8 * 1024 * 1024)))
+MIN_PART_SIZE = 5 * 1024 * 1024  # Every part but the last must be at least 5 MB
+SCAN_PAGE_SIZE = 1000
+SAFETY_MARGIN_MS = 30 * 1000  # Stop and hand off before the Lambda timeout
+
+HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET,POST,OPTIONS',
+    'Access-Control-Allow-Headers': '*'
+}
+
+# Same columns as the Candidate Database table, plus the keys needed to join back
+COLUMNS = ('resume_id', 'first_name', 'last_name', 'email', 'phone', 'department', 'jobId', 'experience',
+           'gender', 'age', 'status', 'work_pref', 'skills', 'datetime')
+RESUME_FIELDS = tuple(c for c in COLUMNS if c != 'department')
+# Parquet columns are all strings: form fields mix numbers and text, and a column that is
+# empty on the first page must not pin its type
+PARQUET_SCHEMA = pyarrow.schema([(column, pyarrow.string()) for column in COLUMNS]) if pyarrow else None
+FORMATS = {'csv': ('.csv', 'text/csv; charset=utf-8'), 'parquet': ('.parquet', 'application/vnd.apache.parquet')}
+
+# --- Initialize AWS Clients ---
+s3 = instrument_client(boto3.client('s3'))
+lambda_client = instrument_client(boto3.client('lambda'))
+
+def response(status_code, payload):
+    return {'statusCode': status_code, 'headers': HEADERS, 'body': json.dumps(payload)}
+
+def export_key(export_id, file_format):
+    return f"{EXPORT_PREFIX}{export_id}/candidates{FORMATS[file_format][0]}"
+
+def error_key(export_id):
+    return f"{EXPORT_PREFIX}{export_id}/error.json"
+
+def clean_filters(filters):
+    """The Candidate Database filters: search (name/email substring), gender, department, experience."""
+    filters = filters or {}
+    return {k: str(filters[k]).strip() for k in ('search', 'gender', 'department', 'experience')
+            if str(filters.get(k) or '').strip()}
+
+# --- Rows ---
+class DepartmentLookup:
+    """job_id -> current department, loaded once per run; moved job IDs resolve through the alias table."""
+    def __init__(self):
+        jobs = dynamo.iter_scan(JOB_TABLE, **dynamo.projection(('job_id', 'department')))
+        self.departments = {job['job_id']: job.get('department') for job in jobs}
+
+    def resolve(self, job_ids):
+        missing = {job_id for job_id in job_ids if job_id and job_id not in self.departments}
+        if missing:
+            aliases = resolve_job_ids(missing)
+            for job_id in missing:
+                self.departments[job_id] = self.departments.get(aliases.get(job_id))
+
+    def __getitem__(self, job_id):
+        return self.departments.get(job_id)
+
+def export_rows(items, departments, filters):
+    """Flattens a page of resumes into export rows, applying the filters DynamoDB cannot (search, department)."""
+    departments.resolve({str(item.get('jobId') or '').strip() for item in items})
+    search = filters.get('search', '').lower()
+    rows = []
+    for item in items:
+        if search and not any(search in str(item.get(f) or '').lower() for f in ('first_name', 'last_name', 'email')):
+            continue
+        department = departments[str(item.get('jobId') or '').strip()]
+        if filters.get('department') and department != filters['department']:
+            continue
+        row = {c: item.get(c) for c in RESUME_FIELDS}
+        row['department'] = department
+        row['skills'] = ';'.join(s for s in item.get('skills') or [] if isinstance(s, str))
+        rows.append(row)
+    return rows
+
+def parquet_table(rows):
+    return pyarrow.Table.from_pylist(
+        [{c: None if row.get(c) is None else str(row[c]) for c in COLUMNS} for row in rows], schema=PARQUET_SCHEMA)
+
+def encode_csv(rows, with_header):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS, extrasaction='ignore')
+    if with_header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+# --- Multipart upload ---
+class MultipartSink:
+    """
+    File-like sink that uploads every PART_SIZE bytes as one multipart part, so memory
+    stays bounded by a single part whatever the size of the export. The state (upload
+    ID, part ETags, and the bytes not yet in a part, parked in S3) is JSON-safe for
+    handing to a re-invocation.
+    """
+    def __init__(self, key, content_type, state=None):
+        self.key = key
+        self.buffer = bytearray()
+        if state:
+            self.upload_id, self.parts = state['upload_id'], state['parts']
+            if state.get('pending_key'):
+                self.buffer += s3.get_object(Bucket=EXPORT_BUCKET, Key=state['pending_key'])['Body'].read()
+                s3.delete_object(Bucket=EXPORT_BUCKET, Key=state['pending_key'])
+        else:
+            self.upload_id = s3.create_multipart_upload(Bucket=EXPORT_BUCKET, Key=key, ContentType=content_type)['UploadId']
+            self.parts = []
+        self.written = 0
+        self.closed = False
+
+    def write(self, data):
+        self.buffer += data
+        self.written += len(data)
+        if len(self.buffer) >= PART_SIZE:
+            self.flush_part()
+        return len(data)
+
+    def flush_part(self):
+        if not self.buffer:
+            return
+        part_number = len(self.parts) + 1
+        etag = s3.upload_part(Bucket=EXPORT_BUCKET, Key=self.key, UploadId=self.upload_id,
+                              PartNumber=part_number, Body=bytes(self.buffer))['ETag']
+        self.parts.append({'ETag': etag, 'PartNumber': part_number})
+        put_metric("ExportBytesUploaded", len(self.buffer))
+        self.buffer = bytearray()
+
+    def state(self):
+        """The sink's state for a hand-off; bytes short of a part are parked in a side object."""
+        state = {'upload_id': self.upload_id, 'parts': self.parts}
+        if self.buffer:
+            state['pending_key'] = f"{self.key.rsplit('/', 1)[0]}/pending-part"
+            s3.put_object(Bucket=EXPORT_BUCKET, Key=state['pending_key'], Body=bytes(self.buffer))
+        return state
+
+    def complete(self):
+        self.flush_part()
+        if not self.parts:
+            # A Parquet export with no rows has written nothing; leave an empty object behind
+            s3.abort_multipart_upload(Bucket=EXPORT_BUCKET, Key=self.key, UploadId=self.upload_id)
+            s3.put_object(Bucket=EXPORT_BUCKET, Key=self.key, Body=b'')
+            return
+        s3.complete_multipart_upload(Bucket=EXPORT_BUCKET, Key=self.key, UploadId=self.upload_id,
+                                     MultipartUpload={'Parts': self.parts})
+
+    def abort(self):
+        s3.abort_multipart_upload(Bucket=EXPORT_BUCKET, Key=self.key, UploadId=self.upload_id)
+
+    # pyarrow's writer treats the sink as a plain binary file
+    def tell(self):
+        return self.written
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+# --- API ---
+def start_export(event, context):
+    """POST: validates the request and hands the export to an asynchronous invocation."""
+    body = json.loads(event.get('body') or '{}')
+    file_format = str(body.get('format') or 'csv').lower()
+    if file_format not in FORMATS:
+        return response(400, {'error': f"format must be one of {', '.join(FORMATS)}"})
+    if file_format == 'parquet' and not pyarrow:
+        return response(400, {'error': 'Parquet export is not available; use csv'})
+
+    export_id = f"{datetime.utcnow():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}"
+    lambda_client.invoke(
+        FunctionName=context.function_name,
+        InvocationType='Event',
+        Payload=json.dumps({'action': 'run', 'export_id': export_id, 'format': file_format,
+                            'filters': clean_filters(body.get('filters'))})
+    )
+    log("Export started", export_id=export_id, format=file_format)
+    return response(202, {'export_id': export_id, 'status': 'running'})
+
+def export_status(export_id):
+    """GET: running, failed (with the error), or ready with a presigned download link."""
+    listing = s3.list_objects_v2(Bucket=EXPORT_BUCKET, Prefix=f"{EXPORT_PREFIX}{export_id}/")
+    keys = [obj['Key'] for obj in listing.get('Contents', [])]
+    if error_key(export_id) in keys:
+        error = json.loads(s3.get_object(Bucket=EXPORT_BUCKET, Key=error_key(export_id))['Body'].read())
+        return response(200, {'export_id': export_id, 'status': 'failed', **error})
+    ready = [key for key in keys if key.rsplit('/', 1)[-1].startswith('candidates.')]
+    if not ready:
+        return response(200, {'export_id': export_id, 'status': 'running'})
+    url = s3.generate_presigned_url(
+        'get_object',
+        Params={'Bucket': EXPORT_BUCKET, 'Key': ready[0],
+                'ResponseContentDisposition': f'attachment; filename="{ready[0].rsplit("/", 1)[-1]}"'},
+        ExpiresIn=EXPORT_URL_EXPIRY
+    )
+    return response(200, {'export_id': export_id, 'status': 'ready', 'url': url, 'expires_in': EXPORT_URL_EXPIRY})
+
+# --- Export run ---
+def run_export(event, context):
+    """
+    Streams the resume table page by page into the export object. CSV exports hand off
+    to a new invocation when time runs low, carrying the bytes not yet uploaded; a Parquet
+    file cannot be split across writers, so Parquet exports must finish within one invocation.
+    """
+    export_id, file_format, filters = event['export_id'], event['format'], event.get('filters') or {}
+    key = export_key(export_id, file_format)
+    sink = MultipartSink(key, FORMATS[file_format][1], event.get('upload'))
+    start_key = event.get('start_key')
+    exported = event.get('exported', 0)
+    departments = DepartmentLookup()
+    parquet_writer = None
+
+    scan_kwargs = {'Limit': SCAN_PAGE_SIZE, **dynamo.projection(RESUME_FIELDS)}
+    conditions = [Attr(attr).eq(filters[f]) for f, attr in (('gender', 'gender'), ('experience', 'experience')) if f in filters]
+    if conditions:
+        condition = conditions[0]
+        for extra in conditions[1:]:
+            condition = condition & extra
+        scan_kwargs['FilterExpression'] = condition
+
+    try:
+        while True:
+            if start_key:
+                scan_kwargs['ExclusiveStartKey'] = start_key
+            with timed_stage("Scan"):
+                items, start_key = dynamo.read_page('scan', RESUME_TABLE, **scan_kwargs)
+            rows = export_rows(items, departments, filters)
+
+            with timed_stage("Encode"):
+                if file_format == 'csv':
+                    sink.write(encode_csv(rows, with_header=not (sink.parts or sink.buffer)))
+                elif rows:
+                    if parquet_writer is None:
+                        parquet_writer = parquet.ParquetWriter(sink, PARQUET_SCHEMA, compression='zstd')
+                    parquet_writer.write_table(parquet_table(rows))
+            exported += len(rows)
+
+            if not start_key:
+                break
+
+            if context and context.get_remaining_time_in_millis() < SAFETY_MARGIN_MS:
+                if file_format != 'csv':
+                    raise TimeoutError("Export is too large for a single Parquet file; use csv")
+                # Cut a part if the buffer allows one; a smaller remainder travels with the hand-off,
+                # so a selective filter that exports little still makes progress every invocation
+                if len(sink.buffer) >= MIN_PART_SIZE:
+                    sink.flush_part()
+                log("Running low on time. Handing off.", export_id=export_id, exported=exported)
+                lambda_client.invoke(
+                    FunctionName=context.function_name,
+                    InvocationType='Event',
+                    Payload=json.dumps({**event, 'upload': sink.state(), 'start_key': start_key, 'exported': exported})
+                )
+                return {'export_id': export_id, 'status': 'running', 'exported': exported}
+
+        if parquet_writer is not None:
+            parquet_writer.close()
+        with timed_stage("Complete"):
+            sink.complete()
+    except Exception as e:
+        log("Export failed", level="ERROR", export_id=export_id, error=str(e))
+        sink.abort()
+        s3.put_object(Bucket=EXPORT_BUCKET, Key=error_key(export_id), Body=json.dumps({'error': str(e)}).encode('utf-8'))
+        return {'export_id': export_id, 'status': 'failed'}
+
+    put_metric("CandidatesExported", exported)
+    log("Export finished", export_id=export_id, exported=exported)
+    return {'export_id': export_id, 'status': 'ready', 'exported': exported}
+
+@instrument("ExportCandidatesFunction")
+def lambda_handler(event, context):
+    """
+    Server-side candidate export. POST {"format": "csv"|"parquet", "filters": {...}} starts
+    an export and returns its export_id; GET ?export_id= reports progress and, once done,
+    a presigned download link. The export itself runs asynchronously.
+    """
+    event = event or {}
+    if event.get('action') == 'run':
+        return run_export(event, context)
+
+    method = event.get('httpMethod') or (event.get('requestContext') or {}).get('http', {}).get('method', 'GET')
+    try:
+        if method == 'POST':
+            return start_export(event, context)
+        export_id = ((event.get('queryStringParameters') or {}).get('export_id') or '').strip()
+        if not export_id or '/' in export_id:
+            return response(400, {'error': 'export_id is required'})
+        return export_status(export_id)
+    except Exception as e:
+        log("Error serving export request", level="ERROR", error=str(e))
+        return response(500, {'error': str(e)})
@@ -0,0 +1,55 @@
+import json
+from common.dynamo import get_item, iter_scan
+from common.instrumentation import instrument, log, put_metric, timed_stage
+from common.models import CandidateProfile
+from common.profiles import PROFILE_TABLE, normalize_email
+from common.responses import json_response
+from common.signing import resume_urls
+
+HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET,OPTIONS',
+    'Access-Control-Allow-Headers': '*'
+}
+
+@instrument("GetCandidateProfilesFunction")
+def lambda_handler(event, context):
+    """
+    Candidate-centric read: one entry per person with merged skills, departments and
+    jobs applied to, the application count and a fresh link to their latest resume.
+    Pass ?email= to read a single candidate.
+    """
+    try:
+        email = normalize_email(((event or {}).get('queryStringParameters') or {}).get('email'))
+
+        with timed_stage("ProfileRead"):
+            if email:
+                profile = get_item(PROFILE_TABLE, {'email': email}, model=CandidateProfile)
+                profiles = [profile] if profile else []
+            else:
+                profiles = list(iter_scan(PROFILE_TABLE, model=CandidateProfile))
+        put_metric("ProfilesReturned", len(profiles))
+
+        if email and not profiles:
+            return json_response(404, {"status": "error", "message": "Candidate not found"}, event, headers=HEADERS)
+
+        with timed_stage("UrlSigning"):
+            urls = resume_urls(profile.latest_filename for profile in profiles)
+
+        candidates = []
+        for profile in profiles:
+            candidate = profile.to_dict()
+            candidate.pop('latest_filename', None)
+            candidate.pop('resume_ids', None)
+            candidate['resume_url'] = urls.get(profile.latest_filename)
+            candidates.append(candidate)
+
+        return json_response(200, {"status": "success", "candidates": candidates}, event, headers=HEADERS)
+
+    except Exception as e:
+        log("Error reading candidate profiles", level="ERROR", error=str(e))
+        return {
+            'statusCode': 500,
+            'headers': HEADERS,
+            'body': json.dumps({'status': 'error', 'message': str(e)})
+        }
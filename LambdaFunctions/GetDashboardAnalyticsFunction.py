@@ -0,0 +1,46 @@
+import json
+from datetime import date
+from common.analytics import default_range, query_rollups
+from common.instrumentation import instrument, log, timed_stage
+from common.responses import json_response
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 366
+
+HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET,OPTIONS',
+    'Access-Control-Allow-Headers': '*'
+}
+
+@instrument("GetDashboardAnalyticsFunction")
+def lambda_handler(event, context):
+    """
+    Dashboard charts from the daily rollups. Query parameters: `days` (default 30) or
+    `from`/`to` (YYYY-MM-DD), plus optional `department`, `status` and `job_id` filters.
+    """
+    params = (event or {}).get('queryStringParameters') or {}
+    try:
+        if params.get('from'):
+            start = date.fromisoformat(params['from'])
+            end = date.fromisoformat(params['to']) if params.get('to') else date.today()
+        else:
+            start, end = default_range(int(params.get('days', DEFAULT_DAYS)))
+        if start > end or (end - start).days >= MAX_DAYS:
+            raise ValueError(f"date range must be between 1 and {MAX_DAYS} days")
+    except ValueError as e:
+        return {'statusCode': 400, 'headers': HEADERS, 'body': json.dumps({'status': 'error', 'message': str(e)})}
+
+    try:
+        filters = {k: params.get(k) for k in ('department', 'status', 'job_id')}
+        with timed_stage("RollupQuery"):
+            analytics = query_rollups(start, end, filters)
+        return json_response(200, {"status": "success", **analytics}, event, headers=HEADERS)
+
+    except Exception as e:
+        log("Error reading dashboard analytics", level="ERROR", error=str(e))
+        return {
+            'statusCode': 500,
+            'headers': HEADERS,
+            'body': json.dumps({'status': 'error', 'message': str(e)})
+        }
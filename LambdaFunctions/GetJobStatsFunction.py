@@ -0,0 +1,33 @@
+import json
+from common.instrumentation import instrument, log, put_metric, timed_stage
+from common.responses import json_response
+from common.stats import read_counts
+
+HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET,OPTIONS',
+    'Access-Control-Allow-Headers': '*'
+}
+
+@instrument("GetJobStatsFunction")
+def lambda_handler(event, context):
+    """
+    Returns the materialized applicant counters: {"jobs": {job_id: {"total": n,
+    "statuses": {status: n}}}}. Pass ?job_id= to read a single job.
+    """
+    try:
+        job_id = ((event or {}).get('queryStringParameters') or {}).get('job_id')
+
+        with timed_stage("StatsRead"):
+            jobs = read_counts(job_id)
+        put_metric("JobsReturned", len(jobs))
+
+        return json_response(200, {"status": "success", "jobs": jobs}, event, headers=HEADERS)
+
+    except Exception as e:
+        log("Error reading job stats", level="ERROR", error=str(e))
+        return {
+            'statusCode': 500,
+            'headers': HEADERS,
+            'body': json.dumps({'status': 'error', 'message': str(e)})
+        }
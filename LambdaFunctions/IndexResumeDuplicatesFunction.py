@@ -0,0 +1,100 @@
+import json
+import boto3
+import gzip
+import os
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+from common import dynamo, duplicates
+from common.instrumentation import instrument, instrument_client, log, put_metric, timed_stage
+
+# --- Configuration from Environment Variables ---
+TABLE_NAME = os.environ.get("TABLE_NAME")
+# Where ResumeProcessorFunction stored the text: TEXT_BUCKET, or else the resume's own (upload) bucket
+TEXT_BUCKET = os.environ.get("TEXT_BUCKET") or os.environ.get("BUCKET_NAME")
+SAFETY_MARGIN_MS = 30 * 1000  # Stop and hand off before the Lambda timeout
+
+# --- Initialize AWS Clients ---
+s3 = instrument_client(boto3.client('s3'))
+lambda_client = instrument_client(boto3.client('lambda'))
+table = dynamo.table(TABLE_NAME)
+
+def read_text(text_key):
+    return gzip.decompress(s3.get_object(Bucket=TEXT_BUCKET, Key=text_key)['Body'].read()).decode('utf-8')
+
+def flag_duplicates(resume_id, matches):
+    try:
+        table.update_item(
+            Key={'resume_id': resume_id},
+            UpdateExpression='SET duplicate_of = :d',
+            ConditionExpression='attribute_exists(resume_id)',
+            ExpressionAttributeValues={':d': matches}
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+
+@instrument("IndexResumeDuplicatesFunction")
+def lambda_handler(event, context):
+    """
+    One-off backfill of the near-duplicate index for resumes processed before it existed:
+    computes each resume's MinHash signature from its stored text, flags it against the
+    resumes indexed so far and adds it to the index. Resumes that already have a signature
+    are skipped, so the job can be re-run. It runs as a single sequential worker (two
+    copies of a resume indexed concurrently could miss each other) and re-invokes itself
+    with the scan cursor when low on time.
+    """
+    if not TEXT_BUCKET:
+        log("TEXT_BUCKET or BUCKET_NAME must be set", level="ERROR")
+        return {'statusCode': 500, 'body': json.dumps({'error': "TEXT_BUCKET or BUCKET_NAME must be set"})}
+
+    start_key = (event or {}).get('start_key')
+    indexed = flagged = 0
+
+    scan_kwargs = {
+        'FilterExpression': Attr('extracted_text_key').exists(),
+        **dynamo.projection(('resume_id', 'email', 'extracted_text_key'))
+    }
+
+    while True:
+        if start_key:
+            scan_kwargs['ExclusiveStartKey'] = start_key
+        with timed_stage("Scan"):
+            items, start_key = dynamo.read_page('scan', TABLE_NAME, **scan_kwargs)
+
+        done = duplicates.indexed_ids([item['resume_id'] for item in items]) if items else set()
+        for item in items:
+            if item['resume_id'] in done:
+                continue
+            try:
+                with timed_stage("Signature"):
+                    signature = duplicates.signature(read_text(item['extracted_text_key']))
+                if not signature:
+                    continue
+                with timed_stage("Index"):
+                    matches, present = duplicates.find_near_duplicates(item['resume_id'], signature)
+                    if matches:
+                        flag_duplicates(item['resume_id'], matches)
+                        flagged += 1
+                    duplicates.index_signature(item['resume_id'], signature, item.get('email'), present)
+                indexed += 1
+            except Exception as e:
+                log("Failed to index resume", level="ERROR", resume_id=item['resume_id'], error=str(e))
+
+        if not start_key:
+            break
+
+        if context and context.get_remaining_time_in_millis() < SAFETY_MARGIN_MS:
+            log("Running low on time. Handing off.", indexed=indexed, flagged=flagged)
+            put_metric("ResumesIndexed", indexed)
+            put_metric("DuplicatesFlagged", flagged)
+            lambda_client.invoke(
+                FunctionName=context.function_name,
+                InvocationType='Event',
+                Payload=json.dumps({'start_key': start_key})
+            )
+            return {'statusCode': 202, 'body': json.dumps({'indexed': indexed, 'flagged': flagged})}
+
+    log("Duplicate index backfill finished", indexed=indexed, flagged=flagged)
+    put_metric("ResumesIndexed", indexed)
+    put_metric("DuplicatesFlagged", flagged)
+    return {'statusCode': 200, 'body': json.dumps({'indexed': indexed, 'flagged': flagged})}
@@ -1,32 +1,27 @@
 import json
-import boto3
 import os
 from collections import defaultdict
-from decimal import Decimal # Import the Decimal type
+from common.dynamo import iter_scan
+from common.instrumentation import instrument, log, put_metric, timed_stage
+from common.locations import JOB_SORT_KEY, REMOTE_INDEX, location_query
+from common.responses import json_response
 
 TABLE_NAME = os.environ.get("TABLE_NAME")
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(TABLE_NAME)
-
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, o):
-        if isinstance(o, Decimal):
-            if o % 1 > 0:
-                return float(o)
-            else:
-                return int(o)
-        return super(DecimalEncoder, self).default(o)
 
+@instrument("JobListingFunction")
 def lambda_handler(event, context):
     try:
-        # Scan the table
-        response = table.scan()
-        items = response.get('Items', [])
-
-        # Handle pagination if the table is large
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response.get('Items', []))
+        # ?city= / ?region= (and ?work_mode=) are served from the city_code-index GSI and
+        # ?work_mode= alone from work_mode-index; remote searches read the sparse
+        # remote_code-index, so jobs that allow remote work match too. Only an unfiltered
+        # listing scans the table (iter_scan follows every page)
+        params = (event or {}).get('queryStringParameters') or {}
+        with timed_stage("JobQuery"):
+            items = location_query(TABLE_NAME, JOB_SORT_KEY, params, remote_index=REMOTE_INDEX)
+        if items is None:
+            with timed_stage("JobScan"):
+                items = list(iter_scan(TABLE_NAME))
+        put_metric("JobsScanned", len(items))
 
         # Group by department
         grouped = defaultdict(list)
@@ -34,22 +29,14 @@ def lambda_handler(event, context):
             department = item.get('department', 'Unknown')
             grouped[department].append(item)
 
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                'Access-Control-Allow-Headers': '*'
-            },
-            # --- FIX: Use the custom encoder in the json.dumps call ---
-            'body': json.dumps({
-                "status": "success",
-                "data": grouped
-            }, cls=DecimalEncoder) # Add cls=DecimalEncoder here
-        }
+        return json_response(200, {"status": "success", "data": grouped}, event, headers={
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Methods': 'GET,OPTIONS',
+            'Access-Control-Allow-Headers': '*'
+        })
 
     except Exception as e:
-        print(f"Error fetching and processing job listings: {e}")
+        log("Error fetching and processing job listings", level="ERROR", error=str(e))
         return {
             'statusCode': 500,
             'headers': {
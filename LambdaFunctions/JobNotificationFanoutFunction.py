@@ -0,0 +1,131 @@
+import boto3
+import json
+import os
+from datetime import datetime, timezone
+from botocore.exceptions import ClientError
+from common import dynamo
+from common.instrumentation import instrument, instrument_client, log, put_metric, timed_stage
+from common.models import Job
+from common.notifications import capped_emails
+from common.subscriptions import find_subscribers, job_topics
+
+# --- Configuration from Environment Variables ---
+JOB_TABLE = os.environ.get("JOB_TABLE")
+NOTIFICATION_QUEUE_URL = os.environ.get("NOTIFICATION_QUEUE_URL")  # Consumed by SendJobNotificationFunction
+NOTIFY_MAX_JOBS_PER_EMAIL = int(os.environ.get("NOTIFY_MAX_JOBS_PER_EMAIL", "5"))
+
+SQS_BATCH_LIMIT = 10
+CARD_FIELDS = ('job_id', 'jobTitle', 'department', 'location', 'workType', 'workMode',
+               'minSalary', 'maxSalary', 'currency', 'positionsAvailable')
+
+sqs = instrument_client(boto3.client('sqs'))
+
+
+def posted_job_ids(event):
+    """Job ids from the JobsPosted SNS messages, or from a direct {"job_ids": [...]} invoke."""
+    job_ids = list((event or {}).get('job_ids') or [])
+    for record in (event or {}).get('Records', []):
+        message = json.loads(record.get('Sns', {}).get('Message') or '{}')
+        if message.get('event') == 'JobsPosted':
+            job_ids.extend(message.get('job_ids') or [])
+    return list(dict.fromkeys(job_ids))
+
+
+def match_jobs(subscriber, jobs):
+    """The jobs a subscriber matches, most overlapping topics first."""
+    scored = [(len(topics & subscriber['topics']), job) for job, topics in jobs if topics & subscriber['topics']]
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return [job for _, job in scored[:NOTIFY_MAX_JOBS_PER_EMAIL]]
+
+
+def enqueue(messages):
+    """send_message_batch in chunks of ten, retrying failed entries once. Returns the count queued."""
+    queued = 0
+    for start in range(0, len(messages), SQS_BATCH_LIMIT):
+        entries = [
+            {'Id': str(i), 'MessageBody': json.dumps(message)}
+            for i, message in enumerate(messages[start:start + SQS_BATCH_LIMIT])
+        ]
+        for _ in range(2):
+            response = sqs.send_message_batch(QueueUrl=NOTIFICATION_QUEUE_URL, Entries=entries)
+            queued += len(response.get('Successful', []))
+            failed = {entry['Id'] for entry in response.get('Failed', [])}
+            entries = [entry for entry in entries if entry['Id'] in failed]
+            if not entries:
+                break
+        if entries:
+            log("Notifications not queued", level="ERROR", count=len(entries))
+    return queued
+
+
+def mark_announced(job_ids):
+    """Stamps announced_at on the jobs, so the daily digest does not email them a second time."""
+    announced_at = datetime.now(timezone.utc).isoformat()
+    for job_id in job_ids:
+        try:
+            dynamo.table(JOB_TABLE).update_item(
+                Key={'job_id': job_id},
+                UpdateExpression='SET announced_at = if_not_exists(announced_at, :at)',
+                ConditionExpression='attribute_exists(job_id)',
+                ExpressionAttributeValues={':at': announced_at}
+            )
+        except ClientError as e:
+            # Deleted (or moved) since it was posted
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+
+
+@instrument("JobNotificationFanoutFunction")
+def lambda_handler(event, context):
+    """
+    Subscribed to the JobsPosted SNS topic. Looks up the department and skill subscribers
+    of the new jobs, drops candidates already at their daily cap and queues one
+    personalized notification per candidate, listing every new job they match. The
+    sender takes the cap atomically, so this pre-filter only needs batched reads. The
+    announced jobs are stamped with announced_at, which the daily digest skips.
+    """
+    job_ids = posted_job_ids(event)
+    if not job_ids:
+        return {'statusCode': 200, 'body': json.dumps({'queued': 0})}
+
+    # 1. Load the new jobs; only open positions are announced
+    with timed_stage("JobLookup"):
+        jobs = dynamo.batch_get(JOB_TABLE, [{'job_id': job_id} for job_id in job_ids], model=Job)
+    jobs = [(job, job_topics(job)) for job in jobs if (job.status or 'Active') == 'Active']
+    if not jobs:
+        log("No active jobs to announce", job_ids=job_ids)
+        return {'statusCode': 200, 'body': json.dumps({'queued': 0})}
+
+    # 2. Query the subscription index once per topic across the whole batch
+    with timed_stage("SubscriberLookup"):
+        subscribers = find_subscribers(set().union(*(topics for _, topics in jobs)))
+    put_metric("SubscribersMatched", len(subscribers))
+
+    # 3. One message per candidate, skipping those already at their daily cap
+    with timed_stage("FrequencyCap"):
+        capped = capped_emails(list(subscribers))
+    put_metric("NotificationsCapped", len(capped))
+    messages = []
+    for email, subscriber in subscribers.items():
+        matched = match_jobs(subscriber, jobs)
+        if matched and email not in capped:
+            messages.append({
+                'email': email,
+                'first_name': subscriber['first_name'] or 'there',
+                'jobs': [{field: job.get(field) for field in CARD_FIELDS} for job in matched]
+            })
+
+    # 4. Hand the personalized messages to the sender queue in batches
+    with timed_stage("Enqueue"):
+        queued = enqueue(messages)
+    put_metric("NotificationsQueued", queued)
+
+    try:
+        with timed_stage("MarkAnnounced"):
+            mark_announced([job.job_id for job, _ in jobs])
+    except Exception as e:
+        # The digest may then repeat these jobs; the per-candidate cap still applies
+        log("Failed to mark jobs announced", level="WARNING", error=str(e))
+
+    log("Job notifications fanned out", jobs=len(jobs), subscribers=len(subscribers), queued=queued, capped=len(capped))
+    return {'statusCode': 200, 'body': json.dumps({'queued': queued, 'capped': len(capped)})}
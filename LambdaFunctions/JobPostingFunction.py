@@ -1,17 +1,199 @@
+import base64
+import boto3
+import csv
+import io
 import json
 import uuid
-import boto3
 import os
-from datetime import datetime
+from datetime import date, datetime
+from common import dynamo
+from common.instrumentation import instrument, instrument_client, log, put_metric, timed_stage
+from common.locations import job_location
 
 TABLE_NAME = os.environ.get("TABLE_NAME")
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(TABLE_NAME)
+JOB_EVENTS_TOPIC_ARN = os.environ.get("JOB_EVENTS_TOPIC_ARN")  # One "JobsPosted" message per request
+BULK_MAX_ROWS = int(os.environ.get("BULK_MAX_ROWS", "500"))
 
-def lambda_handler(event, context):
+table = dynamo.table(TABLE_NAME)
+sns = instrument_client(boto3.client('sns'))
+
+HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+}
+
+NUMBER_FIELDS = ('minExperience', 'maxExperience', 'minSalary', 'maxSalary', 'positionsAvailable')
+BOOLEAN_FIELDS = ('isUrgent', 'allowRemote', 'travelRequired', 'backgroundCheckRequired')
+LIST_FIELDS = ('responsibilities', 'requirements', 'qualifications', 'skills', 'benefits')
+
+def build_job_item(data):
+    department = data.get('department', 'GENERIC').upper().replace(" ", "")
+    unique_suffix = str(uuid.uuid4())[:8]  # Short UUID
+    job_id = f"{department}-{unique_suffix}"
+
+    item = {
+        'job_id': job_id,
+        'jobTitle': data.get('jobTitle'),
+        'department': data.get('department'),
+        'location': data.get('location'),
+        'workType': data.get('workType'),
+        'workMode': data.get('workMode'),
+        'experienceLevel': data.get('experienceLevel'),
+        'minExperience': data.get('minExperience'),
+        'maxExperience': data.get('maxExperience'),
+        'minSalary': data.get('minSalary'),
+        'maxSalary': data.get('maxSalary'),
+        'currency': data.get('currency'),
+        'jobDescription': data.get('jobDescription'),
+        'responsibilities': data.get('responsibilities', []),
+        'requirements': data.get('requirements', []),
+        'qualifications': data.get('qualifications', []),
+        'skills': data.get('skills', []),
+        'benefits': data.get('benefits', []),
+        'applicationDeadline': data.get('applicationDeadline'),
+        'positionsAvailable': data.get('positionsAvailable', 1),
+        'reportingTo': data.get('reportingTo'),
+        'contactEmail': data.get('contactEmail'),
+        'isUrgent': data.get('isUrgent', False),
+        'allowRemote': data.get('allowRemote', False),
+        'travelRequired': data.get('travelRequired', False),
+        'backgroundCheckRequired': data.get('backgroundCheckRequired', False),
+        'postedDate': data.get('postedDate', datetime.utcnow().isoformat()),
+        'status': data.get('status', 'Active')
+    }
+    # Gazetteer city/region codes for the city_code-index GSI, resolved once here
+    item.update(job_location(item))
+    return item
+
+def publish_jobs_posted(job_ids):
+    """One event for the whole request, so downstream listeners run once per batch, not per job."""
+    if not JOB_EVENTS_TOPIC_ARN or not job_ids:
+        return
     try:
-        print("Incoming event:", json.dumps(event))
+        sns.publish(
+            TopicArn=JOB_EVENTS_TOPIC_ARN,
+            Subject="JobsPosted",
+            Message=json.dumps({'event': 'JobsPosted', 'job_ids': job_ids})
+        )
+    except Exception as e:
+        # The jobs are already saved; a missed event only delays notifications
+        log("Failed to publish JobsPosted event", level="ERROR", count=len(job_ids), error=str(e))
+
+# --- Bulk import ---
+def get_header(event, name):
+    return next((v for k, v in (event.get('headers') or {}).items() if k.lower() == name), '') or ''
+
+def parse_csv(body):
+    """Rows of a CSV whose header line uses the job schema's field names; blank lines are skipped."""
+    return [row for row in csv.DictReader(io.StringIO(body)) if any((v or '').strip() for v in row.values())]
+
+def normalize_row(row):
+    """
+    Coerces a JSON or CSV row to the single-post schema and returns (data, errors). CSV
+    cells are strings: numbers are parsed, booleans accept true/yes/1 and list fields are
+    split on newlines or semicolons (skills also on commas).
+    """
+    errors = []
+    data = {k: (v.strip() if isinstance(v, str) else v) for k, v in row.items() if k and v not in (None, '')}
+
+    for field in ('jobTitle', 'department'):
+        if not data.get(field):
+            errors.append(f"{field} is required")
+
+    for field in NUMBER_FIELDS:
+        value = data.get(field)
+        if isinstance(value, str):
+            try:
+                data[field] = int(value) if value.lstrip('-').isdigit() else float(value)
+            except ValueError:
+                errors.append(f"{field} must be a number")
+        elif value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            errors.append(f"{field} must be a number")
+    for low, high in (('minExperience', 'maxExperience'), ('minSalary', 'maxSalary')):
+        if isinstance(data.get(low), (int, float)) and isinstance(data.get(high), (int, float)) and data[low] > data[high]:
+            errors.append(f"{low} cannot exceed {high}")
+
+    for field in BOOLEAN_FIELDS:
+        if isinstance(data.get(field), str):
+            data[field] = data[field].lower() in ('true', 'yes', 'y', '1')
 
+    for field in LIST_FIELDS:
+        value = data.get(field)
+        if isinstance(value, str):
+            separators = ',;\n' if field == 'skills' else ';\n'
+            for separator in separators[1:]:
+                value = value.replace(separator, separators[0])
+            data[field] = [part.strip() for part in value.split(separators[0]) if part.strip()]
+
+    if data.get('applicationDeadline'):
+        try:
+            date.fromisoformat(str(data['applicationDeadline'])[:10])
+        except ValueError:
+            errors.append("applicationDeadline must be YYYY-MM-DD")
+
+    return data, errors
+
+def bulk_post(rows):
+    if not rows:
+        return {'statusCode': 400, 'headers': HEADERS, 'body': json.dumps({'error': 'No jobs to import'})}
+    if len(rows) > BULK_MAX_ROWS:
+        return {'statusCode': 400, 'headers': HEADERS, 'body': json.dumps({'error': f'At most {BULK_MAX_ROWS} jobs per request'})}
+
+    # 1. Validate every row before writing anything
+    results = []
+    items = []
+    for index, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            results.append({'row': index, 'errors': ['row must be an object']})
+            continue
+        data, errors = normalize_row(row)
+        if errors:
+            results.append({'row': index, 'errors': errors})
+            continue
+        item = build_job_item(data)
+        items.append(item)
+        results.append({'row': index, 'job_id': item['job_id']})
+
+    # 2. Write the valid rows with BatchWriteItem, 25 per call with retry of unprocessed items
+    failed_ids = set()
+    with timed_stage("JobBatchWrite"):
+        for start in range(0, len(items), dynamo.BATCH_WRITE_LIMIT):
+            chunk = items[start:start + dynamo.BATCH_WRITE_LIMIT]
+            try:
+                dynamo.batch_write(TABLE_NAME, put_items=chunk)
+            except dynamo.UnprocessedItemsError as e:
+                failed_ids.update(request['PutRequest']['Item']['job_id']['S'] for request in e.unprocessed.get(TABLE_NAME, []))
+            except Exception as e:
+                log("Job batch write failed", level="ERROR", error=str(e))
+                failed_ids.update(item['job_id'] for item in chunk)
+
+    for result in results:
+        if result.get('job_id') in failed_ids:
+            result['errors'] = ['write failed, please retry this row']
+            del result['job_id']
+
+    created = [result['job_id'] for result in results if 'job_id' in result]
+    put_metric("JobsCreated", len(created))
+    put_metric("JobRowsRejected", len(results) - len(created))
+
+    # 3. Notify downstream once for the whole batch
+    publish_jobs_posted(created)
+    log("Bulk job import finished", created=len(created), failed=len(results) - len(created))
+
+    return {
+        'statusCode': 200 if created else 400,
+        'headers': HEADERS,
+        'body': json.dumps({
+            'message': f'{len(created)} of {len(results)} jobs posted',
+            'created': len(created),
+            'failed': len(results) - len(created),
+            'results': results
+        })
+    }
+
+@instrument("JobPostingFunction")
+def lambda_handler(event, context):
+    try:
         body = event.get('body')
         if body is None:
             return {
@@ -19,61 +201,40 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'Missing request body'})
             }
 
+        if event.get('isBase64Encoded'):
+            body = base64.b64decode(body).decode('utf-8-sig')
+
+        # A CSV upload, a JSON array or {"jobs": [...]} is a bulk import
+        if 'csv' in get_header(event, 'content-type').lower():
+            try:
+                return bulk_post(parse_csv(body))
+            except csv.Error as e:
+                return {'statusCode': 400, 'headers': HEADERS, 'body': json.dumps({'error': f'Could not read CSV: {e}'})}
+
         data = json.loads(body) if isinstance(body, str) else body
+        if isinstance(data, list):
+            return bulk_post(data)
+        if isinstance(data.get('jobs'), list):
+            return bulk_post(data['jobs'])
 
-        department = data.get('department', 'GENERIC').upper().replace(" ", "")
-        unique_suffix = str(uuid.uuid4())[:8]  # Short UUID
-        job_id = f"{department}-{unique_suffix}"
-
-        item = {
-            'job_id': job_id,
-            'jobTitle': data.get('jobTitle'),
-            'department': data.get('department'),
-            'location': data.get('location'),
-            'workType': data.get('workType'),
-            'workMode': data.get('workMode'),
-            'experienceLevel': data.get('experienceLevel'),
-            'minExperience': data.get('minExperience'),
-            'maxExperience': data.get('maxExperience'),
-            'minSalary': data.get('minSalary'),
-            'maxSalary': data.get('maxSalary'),
-            'currency': data.get('currency'),
-            'jobDescription': data.get('jobDescription'),
-            'responsibilities': data.get('responsibilities', []),
-            'requirements': data.get('requirements', []),
-            'qualifications': data.get('qualifications', []),
-            'skills': data.get('skills', []),
-            'benefits': data.get('benefits', []),
-            'applicationDeadline': data.get('applicationDeadline'),
-            'positionsAvailable': data.get('positionsAvailable', 1),
-            'reportingTo': data.get('reportingTo'),
-            'contactEmail': data.get('contactEmail'),
-            'isUrgent': data.get('isUrgent', False),
-            'allowRemote': data.get('allowRemote', False),
-            'travelRequired': data.get('travelRequired', False),
-            'backgroundCheckRequired': data.get('backgroundCheckRequired', False),
-            'postedDate': data.get('postedDate', datetime.utcnow().isoformat()),
-            'status': data.get('status', 'Active')
-        }
+        item = build_job_item(data)
+        job_id = item['job_id']
 
-        table.put_item(Item=item)
+        with timed_stage("JobWrite"):
+            table.put_item(Item=item)
+        log("Job posted", job_id=job_id)
+        publish_jobs_posted([job_id])
 
         return {
             'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-            },
+            'headers': HEADERS,
             'body': json.dumps({'message': 'Job posted successfully', 'job_id': job_id})
         }
 
     except Exception as e:
-        print(f"Error: {e}")
+        log("Error posting job", level="ERROR", error=str(e))
         return {
             'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-            },
+            'headers': HEADERS,
             'body': json.dumps({'error': str(e)})
         }
@@ -0,0 +1,98 @@
+import json
+import boto3
+import gzip
+import os
+from boto3.dynamodb.conditions import Attr
+from common import dynamo
+from common.instrumentation import instrument, instrument_client, log, put_metric, timed_stage
+
+# --- Configuration from Environment Variables ---
+TABLE_NAME = os.environ.get("TABLE_NAME")
+# Same bucket ResumeProcessorFunction writes to: TEXT_BUCKET, or else the resume's own (upload) bucket
+TEXT_BUCKET = os.environ.get("TEXT_BUCKET") or os.environ.get("BUCKET_NAME")
+TEXT_PREFIX = os.environ.get("TEXT_PREFIX", "extracted-text/")
+SAFETY_MARGIN_MS = 30 * 1000  # Stop and hand off before the Lambda timeout
+
+# --- Initialize AWS Clients ---
+s3 = instrument_client(boto3.client('s3'))
+lambda_client = instrument_client(boto3.client('lambda'))
+table = dynamo.table(TABLE_NAME)
+
+def drop_stored_url(resume_id):
+    """Download links are signed at read time now; the stored 15-day URL is dead weight."""
+    table.update_item(
+        Key={'resume_id': resume_id},
+        UpdateExpression='REMOVE resume_url',
+        ConditionExpression='attribute_exists(resume_id)'
+    )
+
+def move_text_to_s3(resume_id, text):
+    """Same layout as ResumeProcessorFunction.store_extracted_text."""
+    text_key = f"{TEXT_PREFIX}{resume_id}.txt.gz"
+    s3.put_object(
+        Bucket=TEXT_BUCKET,
+        Key=text_key,
+        Body=gzip.compress(text.encode('utf-8')),
+        ContentType='text/plain; charset=utf-8',
+        ContentEncoding='gzip'
+    )
+    table.update_item(
+        Key={'resume_id': resume_id},
+        UpdateExpression='SET extracted_text_key = :k REMOVE extracted_text, resume_url',
+        ConditionExpression='attribute_exists(resume_id)',
+        ExpressionAttributeValues={':k': text_key}
+    )
+
+@instrument("MigrateExtractedTextFunction")
+def lambda_handler(event, context):
+    """
+    One-off backfill: moves the inline extracted_text of existing resume items into
+    gzipped S3 objects and drops their stored resume_url. Re-invokes itself asynchronously with the scan cursor when it
+    runs low on time, so the whole table is migrated without a long-running job.
+    """
+    if not TEXT_BUCKET:
+        log("TEXT_BUCKET or BUCKET_NAME must be set", level="ERROR")
+        return {'statusCode': 500, 'body': json.dumps({'error': "TEXT_BUCKET or BUCKET_NAME must be set"})}
+
+    start_key = (event or {}).get('start_key')
+    migrated = 0
+
+    scan_kwargs = {
+        'FilterExpression': Attr('extracted_text').exists() | Attr('resume_url').exists(),
+        'ProjectionExpression': 'resume_id, extracted_text'
+    }
+
+    while True:
+        if start_key:
+            scan_kwargs['ExclusiveStartKey'] = start_key
+        with timed_stage("Scan"):
+            response = table.scan(**scan_kwargs)
+
+        for item in response.get('Items', []):
+            try:
+                with timed_stage("Migrate"):
+                    if 'extracted_text' in item:
+                        move_text_to_s3(item['resume_id'], item['extracted_text'])
+                    else:
+                        drop_stored_url(item['resume_id'])
+                migrated += 1
+            except Exception as e:
+                log("Failed to migrate item", level="ERROR", resume_id=item.get('resume_id'), error=str(e))
+
+        start_key = response.get('LastEvaluatedKey')
+        if not start_key:
+            break
+
+        if context and context.get_remaining_time_in_millis() < SAFETY_MARGIN_MS:
+            log("Running low on time. Handing off.", migrated=migrated, start_key=start_key)
+            put_metric("ItemsMigrated", migrated)
+            lambda_client.invoke(
+                FunctionName=context.function_name,
+                InvocationType='Event',
+                Payload=json.dumps({'start_key': start_key})
+            )
+            return {'statusCode': 202, 'body': json.dumps({'migrated': migrated, 'next_start_key': start_key})}
+
+    log("Extracted text migration finished", migrated=migrated)
+    put_metric("ItemsMigrated", migrated)
+    return {'statusCode': 200, 'body': json.dumps({'migrated': migrated})}
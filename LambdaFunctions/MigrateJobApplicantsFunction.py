@@ -0,0 +1,116 @@
+import json
+import boto3
+import os
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from common import dynamo
+from common.instrumentation import instrument, instrument_client, log, put_metric, timed_stage
+from common.job_aliases import mark_migrated
+
+# --- Configuration from Environment Variables ---
+RESUME_TABLE = os.environ.get("RESUME_TABLE")
+# The jobId-submitted_at GSI getResumeEntities already reads; it is sparse, so MigrateSubmittedAtFunction
+# must have backfilled submitted_at on older applicants first
+RESUME_RECENCY_INDEX = os.environ.get("RESUME_RECENCY_INDEX", "jobId-submitted_at-index")
+TRANSACTION_LIMIT = 100  # TransactWriteItems maximum
+SAFETY_MARGIN_MS = 30 * 1000  # Stop and hand off before the Lambda timeout
+
+# --- Initialize AWS Clients ---
+lambda_client = instrument_client(boto3.client('lambda'))
+
+def move_op(resume_id, old_job_id, new_job_id, job_title, department=None):
+    """
+    Conditional update, so an applicant already moved (or deleted) is never rewritten. The
+    frozen department moves with the job, so the dashboard rollups follow the applicant.
+    """
+    update = 'SET jobId = :new'
+    values = {':new': new_job_id, ':old': old_job_id}
+    if job_title:
+        update += ', jobTitle = :title'
+        values[':title'] = job_title
+    if department:
+        update += ', department = :dept'
+        values[':dept'] = department
+    return {'Update': {
+        'TableName': RESUME_TABLE,
+        'Key': {'resume_id': resume_id},
+        'UpdateExpression': update,
+        'ConditionExpression': 'jobId = :old',
+        'ExpressionAttributeValues': values
+    }}
+
+def move_applicants(resume_ids, old_job_id, new_job_id, job_title, department=None):
+    """
+    Rewrites a page of applicants, up to 100 per TransactWriteItems call. If any condition
+    fails the chunk falls back to one update per item, skipping those already moved.
+    """
+    moved = 0
+    for start in range(0, len(resume_ids), TRANSACTION_LIMIT):
+        chunk = resume_ids[start:start + TRANSACTION_LIMIT]
+        ops = [move_op(resume_id, old_job_id, new_job_id, job_title, department) for resume_id in chunk]
+        try:
+            dynamo.transact_write(ops)
+            moved += len(chunk)
+            continue
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'TransactionCanceledException':
+                raise
+            put_metric("TransactionFallbacks")
+
+        for op in ops:
+            try:
+                dynamo.table(RESUME_TABLE).update_item(**{k: v for k, v in op['Update'].items() if k != 'TableName'})
+                moved += 1
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+    return moved
+
+@instrument("MigrateJobApplicantsFunction")
+def lambda_handler(event, context):
+    """
+    Invoked asynchronously by UpdateJobPostingStatus after a department change. Pages
+    through the old job_id on the jobId-submitted_at GSI and moves every applicant to the
+    new job_id. Re-invokes itself with the cursor when it runs low on time, and marks the
+    alias as migrated when done. Reads resolve the old ID through the alias table meanwhile.
+    """
+    old_job_id = event['old_job_id']
+    new_job_id = event['new_job_id']
+    job_title = event.get('job_title')
+    department = event.get('department')
+    start_key = event.get('start_key')
+    moved = event.get('moved', 0)
+
+    query_kwargs = {
+        'IndexName': RESUME_RECENCY_INDEX,
+        'KeyConditionExpression': Key('jobId').eq(old_job_id),
+        **dynamo.projection(('resume_id',))
+    }
+
+    while True:
+        if start_key:
+            query_kwargs['ExclusiveStartKey'] = start_key
+        with timed_stage("ApplicantQuery"):
+            items, start_key = dynamo.read_page('query', RESUME_TABLE, **query_kwargs)
+        resume_ids = [item['resume_id'] for item in items]
+
+        with timed_stage("ApplicantMove"):
+            moved += move_applicants(resume_ids, old_job_id, new_job_id, job_title, department)
+
+        if not start_key:
+            break
+
+        if context and context.get_remaining_time_in_millis() < SAFETY_MARGIN_MS:
+            log("Running low on time. Handing off.", old_job_id=old_job_id, moved=moved)
+            put_metric("ApplicantsMoved", moved)
+            lambda_client.invoke(
+                FunctionName=context.function_name,
+                InvocationType='Event',
+                Payload=json.dumps({**event, 'start_key': start_key, 'moved': moved})
+            )
+            return {'statusCode': 202, 'body': json.dumps({'moved': moved})}
+
+    mark_migrated(old_job_id, moved)
+    put_metric("ApplicantsMoved", moved)
+    log("Job applicant migration finished", old_job_id=old_job_id, new_job_id=new_job_id, moved=moved)
+    return {'statusCode': 200, 'body': json.dumps({'moved': moved})}
@@ -0,0 +1,116 @@
+import json
+import boto3
+import os
+import re
+from datetime import datetime
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+from common import dynamo
+from common.analytics import SUBMITTED_AT_FORMAT, submitted_at
+from common.instrumentation import instrument, instrument_client, log, put_metric, timed_stage
+
+# --- Configuration from Environment Variables ---
+TABLE_NAME = os.environ.get("TABLE_NAME")
+DEFAULT_SEGMENTS = int(os.environ.get("BACKFILL_SEGMENTS", "8"))
+SAFETY_MARGIN_MS = 30 * 1000  # Stop and hand off before the Lambda timeout
+
+# Upload keys carry the server's UTC time: uploads/YYYYmmdd_HHMMSS_<filename>
+UPLOAD_KEY_TIME = re.compile(r'uploads/(\d{8}_\d{6})_')
+
+# --- Initialize AWS Clients ---
+lambda_client = instrument_client(boto3.client('lambda'))
+table = dynamo.table(TABLE_NAME)
+
+def backfill_value(item):
+    """submitted_at from the form's `datetime`, else from the upload key's timestamp."""
+    value = submitted_at(item.get('datetime'))
+    if value:
+        return value
+    match = UPLOAD_KEY_TIME.match(item.get('filename') or '')
+    if match:
+        return datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').strftime(SUBMITTED_AT_FORMAT)
+    return None
+
+def set_submitted_at(resume_id, value):
+    """Never overwrites a value written by the upload function in the meantime."""
+    try:
+        table.update_item(
+            Key={'resume_id': resume_id},
+            UpdateExpression='SET submitted_at = :t',
+            ConditionExpression='attribute_exists(resume_id) AND attribute_not_exists(submitted_at)',
+            ExpressionAttributeValues={':t': value}
+        )
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return False
+        raise
+
+def fan_out(context, total_segments):
+    """Starts one asynchronous worker per parallel-scan segment."""
+    for segment in range(total_segments):
+        lambda_client.invoke(
+            FunctionName=context.function_name,
+            InvocationType='Event',
+            Payload=json.dumps({'segment': segment, 'total_segments': total_segments})
+        )
+    log("Backfill started", segments=total_segments)
+    return {'statusCode': 202, 'body': json.dumps({'segments': total_segments})}
+
+@instrument("MigrateSubmittedAtFunction")
+def lambda_handler(event, context):
+    """
+    One-off backfill of the sortable submitted_at attribute (UTC ISO-8601) on existing
+    resume items, so they appear in the jobId-submitted_at-index GSI. Invoke it with
+    {"segments": n} (default BACKFILL_SEGMENTS); it starts n workers, each scanning one
+    parallel-scan segment and re-invoking itself with its cursor when low on time.
+    """
+    event = event or {}
+    if 'segment' not in event:
+        return fan_out(context, int(event.get('segments') or DEFAULT_SEGMENTS))
+
+    segment, total_segments = event['segment'], event['total_segments']
+    start_key = event.get('start_key')
+    migrated = skipped = 0
+
+    scan_kwargs = {
+        'Segment': segment,
+        'TotalSegments': total_segments,
+        'FilterExpression': Attr('submitted_at').not_exists(),
+        **dynamo.projection(('resume_id', 'datetime', 'filename'))
+    }
+
+    while True:
+        if start_key:
+            scan_kwargs['ExclusiveStartKey'] = start_key
+        with timed_stage("Scan"):
+            items, start_key = dynamo.read_page('scan', TABLE_NAME, **scan_kwargs)
+
+        for item in items:
+            value = backfill_value(item)
+            if not value:
+                skipped += 1
+                log("No usable submission time", level="WARNING", resume_id=item['resume_id'])
+                continue
+            try:
+                with timed_stage("Update"):
+                    migrated += set_submitted_at(item['resume_id'], value)
+            except Exception as e:
+                log("Failed to migrate item", level="ERROR", resume_id=item['resume_id'], error=str(e))
+
+        if not start_key:
+            break
+
+        if context and context.get_remaining_time_in_millis() < SAFETY_MARGIN_MS:
+            log("Running low on time. Handing off.", segment=segment, migrated=migrated)
+            put_metric("ItemsMigrated", migrated)
+            lambda_client.invoke(
+                FunctionName=context.function_name,
+                InvocationType='Event',
+                Payload=json.dumps({'segment': segment, 'total_segments': total_segments, 'start_key': start_key})
+            )
+            return {'statusCode': 202, 'body': json.dumps({'segment': segment, 'migrated': migrated})}
+
+    log("submitted_at backfill segment finished", segment=segment, migrated=migrated, skipped=skipped)
+    put_metric("ItemsMigrated", migrated)
+    return {'statusCode': 200, 'body': json.dumps({'segment': segment, 'migrated': migrated, 'skipped': skipped})}
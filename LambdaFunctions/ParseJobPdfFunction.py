@@ -0,0 +1,301 @@
+import base64
+import boto3
+import hashlib
+import os
+import re
+import time
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from common import dynamo
+from common.extraction import (
+    analyze_text, check_pdf_header, has_text_layer, join_lines, pdf_lines, textract_lines
+)
+from common.instrumentation import instrument, instrument_client, log, put_metric, timed_stage
+from common.responses import json_response
+
+# --- Configuration from Environment Variables ---
+PARSE_CACHE_TABLE = os.environ.get("PARSE_CACHE_TABLE")  # Keyed by doc_hash, with TTL on `ttl`
+PARSE_CACHE_DAYS = int(os.environ.get("PARSE_CACHE_DAYS", "30"))
+PARSER_VERSION = 1  # Bump when the section mapping changes so cached results are re-parsed
+FORM_FIELD = "jobPdf"
+MAX_SKILLS = 20
+
+# --- Initialize AWS Clients ---
+textract = instrument_client(boto3.client('textract'))
+comprehend = instrument_client(boto3.client('comprehend'))
+
+HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'POST,OPTIONS',
+    'Access-Control-Allow-Headers': '*'
+}
+
+# Section headings mapped to JobPostingFunction fields, matched case-insensitively
+SECTION_HEADINGS = {
+    'jobDescription': ('job description', 'description', 'about the role', 'role overview', 'overview', 'summary', 'job summary'),
+    'responsibilities': ('responsibilities', 'key responsibilities', 'roles and responsibilities', 'role and responsibilities',
+                         'job responsibilities', 'duties', 'what you will do', "what you'll do"),
+    'requirements': ('requirements', 'job requirements', 'must have', 'must haves', 'eligibility', 'eligibility criteria',
+                     'what we are looking for', "what we're looking for", 'who you are'),
+    'qualifications': ('qualifications', 'preferred qualifications', 'education', 'educational qualifications'),
+    'skills': ('skills', 'key skills', 'required skills', 'technical skills', 'skills required', 'tech stack'),
+    'benefits': ('benefits', 'perks', 'perks and benefits', 'what we offer'),
+}
+HEADING_TO_FIELD = {heading: field for field, headings in SECTION_HEADINGS.items() for heading in headings}
+
+# Single-line "Label: value" fields
+LABELS = {
+    'jobTitle': ('job title', 'title', 'position', 'role', 'designation'),
+    'department': ('department', 'team', 'function'),
+    'location': ('location', 'job location', 'work location', 'based in'),
+    'experience': ('experience', 'experience required', 'work experience'),
+    'salary': ('salary', 'salary range', 'ctc', 'compensation', 'pay', 'stipend'),
+    'applicationDeadline': ('application deadline', 'deadline', 'apply by', 'last date'),
+    'contactEmail': ('contact', 'contact email', 'email'),
+    'reportingTo': ('reporting to', 'reports to'),
+}
+LABEL_TO_FIELD = {label: field for field, labels in LABELS.items() for label in labels}
+
+BULLET_RE = re.compile(r'^\s*(?:[•●▪–\-\*·>]|\d{1,2}[.)])\s*')
+LABEL_RE = re.compile(r'^([A-Za-z][A-Za-z \'/&]{1,40}?)\s*[:–\-]\s*(.*)$')
+RANGE_RE = re.compile(r'(\d[\d,.]*)\s*(?:-|to|–)\s*(\d[\d,.]*)')
+NUMBER_RE = re.compile(r'(\d[\d,.]*)')
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+WORK_TYPES = (('intern', 'Internship'), ('part-time', 'Part-time'), ('part time', 'Part-time'),
+              ('contract', 'Contract'), ('full-time', 'Full-time'), ('full time', 'Full-time'))
+WORK_MODES = (('hybrid', 'Hybrid'), ('remote', 'Remote'), ('work from home', 'Remote'),
+              ('on-site', 'On-site'), ('onsite', 'On-site'), ('in office', 'On-site'))
+CURRENCIES = (('₹', 'INR'), ('inr', 'INR'), ('rs', 'INR'), ('lpa', 'INR'), ('$', 'USD'), ('usd', 'USD'),
+              ('€', 'EUR'), ('eur', 'EUR'), ('£', 'GBP'), ('gbp', 'GBP'))
+
+def read_upload(event):
+    """The PDF bytes from a multipart/form-data upload (field jobPdf) or a raw application/pdf body."""
+    body = event.get('body') or ''
+    raw = base64.b64decode(body) if event.get('isBase64Encoded') else body.encode('latin-1')
+    content_type = next((v for k, v in (event.get('headers') or {}).items() if k.lower() == 'content-type'), '') or ''
+
+    if not content_type.lower().startswith('multipart/form-data'):
+        return raw
+
+    message = BytesParser(policy=default_policy).parsebytes(
+        f"Content-Type: {content_type}\r\nMIME-Version: 1.0\r\n\r\n".encode('latin-1') + raw
+    )
+    for part in message.iter_parts():
+        if part.get_param('name', header='content-disposition') == FORM_FIELD:
+            return part.get_payload(decode=True) or b''
+    raise ValueError(f"Missing '{FORM_FIELD}' file in the upload.")
+
+def clean_item(line):
+    return BULLET_RE.sub('', line).strip()
+
+def parse_amount(text, lakhs):
+    value = float(text.replace(',', ''))
+    return int(value * 100000) if lakhs and value < 1000 else int(value)
+
+def parse_range(value, lakhs=False):
+    """(min, max) from '2-5 years', '6,00,000 - 9,00,000', '6 to 9 LPA' or a single number."""
+    match = RANGE_RE.search(value)
+    if match:
+        return parse_amount(match.group(1), lakhs), parse_amount(match.group(2), lakhs)
+    match = NUMBER_RE.search(value)
+    if match:
+        amount = parse_amount(match.group(1), lakhs)
+        return amount, None
+    return None, None
+
+def split_skills(lines):
+    skills = []
+    for line in lines:
+        skills.extend(part.strip() for part in re.split(r'[,;|/]', clean_item(line)) if part.strip())
+    return skills
+
+def map_sections(lines):
+    """
+    Walks the text line by line: a known heading starts a section, "Label: value" lines
+    fill single fields, and everything else is added to the current section.
+    """
+    labels = {}
+    sections = {}
+    current = None
+
+    for line in lines:
+        heading = line.strip().rstrip(':').strip().lower()
+        if heading in HEADING_TO_FIELD:
+            current = HEADING_TO_FIELD[heading]
+            sections.setdefault(current, [])
+            continue
+
+        match = LABEL_RE.match(line)
+        if match:
+            label = match.group(1).strip().lower()
+            if label in LABEL_TO_FIELD and match.group(2).strip():
+                labels.setdefault(LABEL_TO_FIELD[label], match.group(2).strip())
+                continue
+            if label in HEADING_TO_FIELD:
+                current = HEADING_TO_FIELD[label]
+                sections.setdefault(current, [])
+                if match.group(2).strip():
+                    sections[current].append(match.group(2).strip())
+                continue
+
+        if current:
+            sections[current].append(line)
+    return labels, sections
+
+def find_keyword(text, options):
+    lowered = text.lower()
+    return next((value for keyword, value in options if keyword in lowered), None)
+
+def build_job(lines, entities, found_skills):
+    """Maps the extracted lines onto the JobPostingFunction schema."""
+    labels, sections = map_sections(lines)
+    text = join_lines(lines)
+    job = {}
+
+    title = labels.get('jobTitle')
+    if not title and lines and len(lines[0]) <= 80 and lines[0].lower().rstrip(':') not in HEADING_TO_FIELD:
+        title = lines[0]
+    if title:
+        job['jobTitle'] = title
+    for field in ('department', 'reportingTo'):
+        if labels.get(field):
+            job[field] = labels[field]
+
+    locations = [ent['Text'] for ent in entities if ent['Type'] == 'LOCATION']
+    if labels.get('location') or locations:
+        job['location'] = labels.get('location') or locations[0]
+
+    email = EMAIL_RE.search(labels.get('contactEmail', '') or text)
+    if email:
+        job['contactEmail'] = email.group(0)
+
+    deadline = labels.get('applicationDeadline')
+    if deadline:
+        job['applicationDeadline'] = deadline
+
+    experience = labels.get('experience')
+    if experience:
+        low, high = parse_range(experience)
+        if low is not None:
+            job['minExperience'] = low
+        if high is not None:
+            job['maxExperience'] = high
+
+    salary = labels.get('salary')
+    if salary:
+        lakhs = 'lpa' in salary.lower() or 'lakh' in salary.lower()
+        low, high = parse_range(salary, lakhs)
+        if low is not None:
+            job['minSalary'] = low
+        if high is not None:
+            job['maxSalary'] = high
+        currency = find_keyword(salary, CURRENCIES)
+        if currency:
+            job['currency'] = currency
+
+    work_type = find_keyword(text, WORK_TYPES)
+    if work_type:
+        job['workType'] = work_type
+    work_mode = find_keyword(text, WORK_MODES)
+    if work_mode:
+        job['workMode'] = work_mode
+
+    if sections.get('jobDescription'):
+        job['jobDescription'] = ' '.join(clean_item(line) for line in sections['jobDescription'])
+    for field in ('responsibilities', 'requirements', 'qualifications', 'benefits'):
+        items = [clean_item(line) for line in sections.get(field, []) if clean_item(line)]
+        if items:
+            job[field] = items
+
+    # Skills come from a skills section when there is one, otherwise from the extraction stage
+    skills = split_skills(sections['skills']) if sections.get('skills') else found_skills
+    seen = set()
+    job['skills'] = [s for s in skills if not (s.lower() in seen or seen.add(s.lower()))][:MAX_SKILLS]
+    return job
+
+def get_cached(doc_hash):
+    if not PARSE_CACHE_TABLE:
+        return None
+    cached = dynamo.get_item(PARSE_CACHE_TABLE, {'doc_hash': doc_hash})
+    if cached and cached.get('parser_version') == PARSER_VERSION:
+        return cached
+    return None
+
+def put_cached(doc_hash, job, extraction):
+    if not PARSE_CACHE_TABLE:
+        return
+    try:
+        dynamo.table(PARSE_CACHE_TABLE).put_item(Item={
+            'doc_hash': doc_hash,
+            'parser_version': PARSER_VERSION,
+            'job': job,
+            'extraction': extraction,
+            'ttl': int(time.time()) + PARSE_CACHE_DAYS * 86400
+        })
+    except Exception as e:
+        log("Failed to cache parsed job", level="WARNING", error=str(e))
+
+@instrument("ParseJobPdfFunction")
+def lambda_handler(event, context):
+    """
+    Parses a job-description PDF for SmartPost into the JobPostingFunction schema. Text-layer
+    PDFs are read locally; only image-only scans go to Textract. Results are cached by the
+    document's SHA-256, so re-uploading the same file returns instantly.
+    """
+    # 1. Read and check the upload
+    try:
+        pdf_bytes = read_upload(event or {})
+        check_pdf_header(pdf_bytes, len(pdf_bytes))
+    except ValueError as e:
+        return json_response(400, {'error': str(e)}, event, headers=HEADERS)
+
+    doc_hash = hashlib.sha256(pdf_bytes).hexdigest()
+
+    # 2. Serve re-uploads from the cache
+    try:
+        with timed_stage("CacheLookup"):
+            cached = get_cached(doc_hash)
+    except Exception as e:
+        log("Parse cache lookup failed", level="WARNING", error=str(e))
+        cached = None
+    if cached:
+        put_metric("CacheHits")
+        return json_response(200, {'job': cached['job'], 'doc_hash': doc_hash, 'extraction': cached.get('extraction'),
+                                   'cached': True}, event, headers=HEADERS)
+
+    # 3. Extract the text: locally for text-layer PDFs, Textract only for image-only scans
+    try:
+        with timed_stage("Preflight"):
+            lines = pdf_lines(pdf_bytes)
+        extraction = 'text-layer'
+        if not has_text_layer(lines):
+            with timed_stage("Textract"):
+                response = textract.detect_document_text(Document={'Bytes': pdf_bytes})
+            lines = textract_lines(response)
+            extraction = 'textract'
+            put_metric("TextractPages", response.get('DocumentMetadata', {}).get('Pages', 0))
+    except ValueError as e:
+        return json_response(400, {'error': f"PDF preflight failed: {str(e)}"}, event, headers=HEADERS)
+    except Exception as e:
+        log("Job PDF extraction failed", level="ERROR", error=str(e))
+        return json_response(500, {'error': 'Could not read the PDF.'}, event, headers=HEADERS)
+
+    if not lines:
+        return json_response(400, {'error': 'No readable text found in document.'}, event, headers=HEADERS)
+
+    # 4. Skills and entities, the same stage the resume processor uses
+    try:
+        with timed_stage("SkillExtraction"):
+            entities, found_skills = analyze_text(comprehend, join_lines(lines))
+    except Exception as e:
+        # Section mapping still works without it; only the extracted-skills fallback is lost
+        log("Skill extraction failed for job PDF", level="WARNING", error=str(e))
+        entities, found_skills = [], []
+
+    # 5. Map sections to the job schema and cache the result
+    with timed_stage("SectionMapping"):
+        job = build_job(lines, entities, found_skills)
+    put_cached(doc_hash, job, extraction)
+
+    return json_response(200, {'job': job, 'doc_hash': doc_hash, 'extraction': extraction, 'cached': False},
+                         event, headers=HEADERS)
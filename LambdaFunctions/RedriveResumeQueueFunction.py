@@ -0,0 +1,82 @@
+import json
+import boto3
+import os
+import urllib.parse
+from common.instrumentation import instrument, instrument_client, log, put_metric
+
+# --- Configuration from Environment Variables ---
+RESUME_QUEUE_URL = os.environ.get("RESUME_QUEUE_URL")
+RESUME_DLQ_URL = os.environ.get("RESUME_DLQ_URL")
+REDRIVE_RATE = int(os.environ.get("REDRIVE_MESSAGES_PER_SECOND", "10"))  # Keep redrives under the processing quota
+RESUME_BUCKET = os.environ.get("RESUME_BUCKET")
+SQS_BATCH_LIMIT = 10
+
+# --- Initialize AWS Clients ---
+sqs = instrument_client(boto3.client('sqs'))
+
+def queue_arn(url):
+    return sqs.get_queue_attributes(QueueUrl=url, AttributeNames=['QueueArn'])['Attributes']['QueueArn']
+
+def dead_letter_depth():
+    attributes = sqs.get_queue_attributes(
+        QueueUrl=RESUME_DLQ_URL,
+        AttributeNames=['ApproximateNumberOfMessages', 'ApproximateNumberOfMessagesNotVisible']
+    )['Attributes']
+    return {k: int(v) for k, v in attributes.items()}
+
+def enqueue_keys(keys, bucket):
+    """
+    Queues S3-notification-shaped messages so the processor handles the objects like fresh
+    uploads. Keys are URL-encoded as S3 encodes them, since the processor decodes them.
+    """
+    queued = 0
+    for start in range(0, len(keys), SQS_BATCH_LIMIT):
+        entries = [
+            {'Id': str(i), 'MessageBody': json.dumps({'Records': [
+                {'eventSource': 'aws:s3', 's3': {'bucket': {'name': bucket}, 'object': {'key': urllib.parse.quote_plus(key)}}}
+            ]})}
+            for i, key in enumerate(keys[start:start + SQS_BATCH_LIMIT])
+        ]
+        response = sqs.send_message_batch(QueueUrl=RESUME_QUEUE_URL, Entries=entries)
+        queued += len(response.get('Successful', []))
+        if response.get('Failed'):
+            log("Resumes not queued", level="ERROR", count=len(response['Failed']))
+    return queued
+
+@instrument("RedriveResumeQueueFunction")
+def lambda_handler(event, context):
+    """
+    Operator tool for the resume processing dead-letter queue:
+      {"action": "status"}                  DLQ depth and recent redrive tasks
+      {"action": "redrive"}                 moves every DLQ message back to the resume queue
+                                            at REDRIVE_MESSAGES_PER_SECOND
+      {"action": "cancel", "task_handle": h} stops a running redrive
+      {"action": "reprocess", "keys": [...]} queues specific S3 objects again
+    """
+    event = event or {}
+    action = event.get('action', 'status')
+
+    if action == 'redrive':
+        task = sqs.start_message_move_task(
+            SourceArn=queue_arn(RESUME_DLQ_URL),
+            DestinationArn=queue_arn(RESUME_QUEUE_URL),
+            MaxNumberOfMessagesPerSecond=int(event.get('rate') or REDRIVE_RATE)
+        )
+        log("Redrive started", task_handle=task['TaskHandle'])
+        return {'statusCode': 200, 'body': json.dumps({'task_handle': task['TaskHandle'], **dead_letter_depth()})}
+
+    if action == 'cancel':
+        moved = sqs.cancel_message_move_task(TaskHandle=event['task_handle']).get('ApproximateNumberOfMessagesMoved', 0)
+        return {'statusCode': 200, 'body': json.dumps({'moved': moved})}
+
+    if action == 'reprocess':
+        keys = [str(key) for key in event.get('keys') or [] if key]
+        queued = enqueue_keys(keys, event.get('bucket') or RESUME_BUCKET)
+        put_metric("ResumesRequeued", queued)
+        return {'statusCode': 200, 'body': json.dumps({'queued': queued})}
+
+    if action == 'status':
+        tasks = sqs.list_message_move_tasks(SourceArn=queue_arn(RESUME_DLQ_URL), MaxResults=10).get('Results', [])
+        return {'statusCode': 200, 'body': json.dumps({**dead_letter_depth(), 'tasks': tasks}, default=str)}
+
+    return {'statusCode': 400, 'body': json.dumps({'error': f"Unknown action: {action}"})}
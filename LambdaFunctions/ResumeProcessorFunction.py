@@ -1,118 +1,239 @@
 import boto3
+import gzip
+from botocore.config import Config
 import json
 import urllib.parse
-import uuid
 import os
+import tempfile
+from botocore.exceptions import ClientError
 from boto3.dynamodb.conditions import Attr
-
-# AWS clients
-s3 = boto3.client('s3')
-textract = boto3.client('textract')
-comprehend = boto3.client('comprehend')
-dynamodb = boto3.resource('dynamodb')
-sns = boto3.client('sns')
+from common import analytics, duplicates
+from common.dynamo import iter_scan, table
+from common.extraction import (
+    PREFLIGHT_SNIFF_BYTES, analyze_text, check_pdf_header, extract_word_fileobj,
+    has_text_layer, join_lines, pdf_lines, textract_lines
+)
+from common.instrumentation import instrument, instrument_client, log, put_metric, timed_stage
+from common.models import Resume
 
 TABLE_NAME = os.environ.get("TABLE_NAME")
 HR_TOPIC_ARN = os.environ.get("HR_TOPIC_ARN")
 
-table = dynamodb.Table(TABLE_NAME)
+# --- Queue consumption ---
+# Textract/Comprehend calls per container retry with client-side rate limiting, so a burst
+# slows down to the account quota instead of failing
+SERVICE_MAX_ATTEMPTS = int(os.environ.get("SERVICE_MAX_ATTEMPTS", "6"))
+RETRY_BASE_SECONDS = int(os.environ.get("RETRY_BASE_SECONDS", "30"))
+RETRY_MAX_SECONDS = int(os.environ.get("RETRY_MAX_SECONDS", "900"))
 
-def lambda_handler(event, context):
-    # 1. Extract S3 bucket and key
+# AWS clients
+throttled = Config(retries={'mode': 'adaptive', 'max_attempts': SERVICE_MAX_ATTEMPTS})
+s3 = instrument_client(boto3.client('s3'))
+textract = instrument_client(boto3.client('textract', config=throttled))
+comprehend = instrument_client(boto3.client('comprehend', config=throttled))
+sns = instrument_client(boto3.client('sns'))
+sqs = instrument_client(boto3.client('sqs'))
+
+# --- Word document extraction ---
+SUPPORTED_EXTENSIONS = ('.pdf', '.doc', '.docx')
+SPOOL_MAX_MEMORY_BYTES = 4 * 1024 * 1024  # Larger downloads spill to /tmp
+
+# --- Extracted text is kept out of the hot resume item ---
+TEXT_BUCKET = os.environ.get("TEXT_BUCKET")  # Defaults to the resume's own bucket
+TEXT_PREFIX = os.environ.get("TEXT_PREFIX", "extracted-text/")
+
+class RejectedResume(Exception):
+    """A document that will never process (wrong format, corrupt, no text); retrying cannot help."""
+
+
+def preflight_pdf(bucket, key):
+    """
+    Cheap local checks before any Textract call. Sniffs the magic bytes with a ranged GET,
+    then counts pages and pulls the embedded text layer. Raises ValueError for files that
+    should be rejected; returns the local text ('' for image-only scans that need OCR).
+    """
     try:
-        bucket = event['Records'][0]['s3']['bucket']['name']
-        key = urllib.parse.unquote_plus(event['Records'][0]['s3']['object']['key'])
-    except Exception as e:
-        return {
-            'statusCode': 400,
-            'body': json.dumps(f"Error parsing S3 event: {str(e)}")
-        }
-
-    if not key.lower().endswith(".pdf"):
-        return {
-            'statusCode': 400,
-            'body': json.dumps("Unsupported file format (only PDF supported).")
-        }
-
-    # 2. Extract text using OCR
+        head = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes=0-{PREFLIGHT_SNIFF_BYTES - 1}")
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'InvalidRange':  # 416: the object is empty
+            raise ValueError("File is empty.")
+        raise
+    head_bytes = head['Body'].read()
+    # A 200 instead of a 206 (no ContentRange) means the whole object fit in the range
+    content_range = head.get('ContentRange')
+    total_size = int(content_range.split('/')[-1]) if content_range else len(head_bytes)
+    check_pdf_header(head_bytes, total_size)
+
+    if total_size > len(head_bytes):
+        pdf_bytes = s3.get_object(Bucket=bucket, Key=key)['Body'].read()
+    else:
+        pdf_bytes = head_bytes
+
+    lines = pdf_lines(pdf_bytes)
+    return join_lines(lines) if has_text_layer(lines) else ''
+
+def extract_word_text(bucket, key, file_ext):
+    """Streams a DOC/DOCX resume from S3 into a spooled temp file and extracts its text without Textract."""
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY_BYTES) as spool:
+        s3.download_fileobj(bucket, key, spool)
+        spool.seek(0)
+        return extract_word_fileobj(spool, file_ext)
+
+def store_extracted_text(bucket, resume_id, text):
+    """Writes the gzipped text to S3 and returns its key; the resume item only keeps the reference."""
+    text_key = f"{TEXT_PREFIX}{resume_id}.txt.gz"
+    s3.put_object(
+        Bucket=TEXT_BUCKET or bucket,
+        Key=text_key,
+        Body=gzip.compress(text.encode('utf-8')),
+        ContentType='text/plain; charset=utf-8',
+        ContentEncoding='gzip'
+    )
+    return text_key
+
+def s3_objects(record):
+    """
+    The (bucket, key) pairs one trigger record refers to: an SQS message carrying an S3
+    event notification (which may list several objects), or a direct S3 record.
+    """
+    if record.get('eventSource') == 'aws:sqs':
+        notification = json.loads(record['body'])
+        s3_records = notification.get('Records', [])  # s3:TestEvent messages have none
+    else:
+        s3_records = [record]
+    return [
+        (r['s3']['bucket']['name'], urllib.parse.unquote_plus(r['s3']['object']['key']))
+        for r in s3_records
+    ]
+
+def queue_url(event_source_arn):
+    """https URL of the queue behind an SQS event source ARN (arn:aws:sqs:region:account:name)."""
+    _, _, _, region, account, name = event_source_arn.split(':')
+    return f"https://sqs.{region}.amazonaws.com/{account}/{name}"
+
+def retry_later(record):
+    """
+    Exponential backoff for a failed message: its visibility timeout grows with every
+    receive, so a throttled burst drains at the quota instead of retrying in lockstep.
+    After the queue's maxReceiveCount the message moves to the dead-letter queue.
+    """
+    attempt = int(record.get('attributes', {}).get('ApproximateReceiveCount', '1'))
+    delay = min(RETRY_BASE_SECONDS * 2 ** (attempt - 1), RETRY_MAX_SECONDS)
     try:
-        response = textract.detect_document_text(
-            Document={'S3Object': {'Bucket': bucket, 'Name': key}}
+        sqs.change_message_visibility(
+            QueueUrl=queue_url(record['eventSourceARN']),
+            ReceiptHandle=record['receiptHandle'],
+            VisibilityTimeout=delay
         )
-    except textract.exceptions.UnsupportedDocumentException:
-        return {
-            'statusCode': 400,
-            'body': json.dumps("Unsupported document format for Textract.")
-        }
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'body': json.dumps(f"Textract error: {str(e)}")
-        }
+        # The queue's own visibility timeout still applies
+        log("Could not set retry delay", level="WARNING", message_id=record.get('messageId'), error=str(e))
 
-    extracted_text = ' '.join(
-        [item["Text"] for item in response["Blocks"] if item["BlockType"] == "LINE"]
-    ).strip()
+def process_resume(bucket, key):
+    """
+    Extracts, analyzes and stores one uploaded resume, then notifies HR. Raises
+    RejectedResume for documents that can never be processed; any other exception
+    is transient and the message is retried.
+    """
+    file_ext = os.path.splitext(key.lower())[1]
+    if file_ext not in SUPPORTED_EXTENSIONS:
+        raise RejectedResume("Unsupported file format (only PDF, DOC and DOCX supported).")
+
+    # 1. Extract text: Word documents and text-layer PDFs locally, image-only scans via Textract
+    if file_ext in ('.doc', '.docx'):
+        try:
+            with timed_stage("WordExtraction"):
+                extracted_text = extract_word_text(bucket, key, file_ext)
+        except ValueError as e:
+            raise RejectedResume(f"Document extraction failed: {str(e)}")
+    else:
+        try:
+            with timed_stage("Preflight"):
+                extracted_text = preflight_pdf(bucket, key)
+        except ValueError as e:
+            raise RejectedResume(f"PDF preflight failed: {str(e)}")
+
+        if not extracted_text:
+            try:
+                with timed_stage("Textract"):
+                    response = textract.detect_document_text(
+                        Document={'S3Object': {'Bucket': bucket, 'Name': key}}
+                    )
+            except textract.exceptions.UnsupportedDocumentException:
+                raise RejectedResume("Unsupported document format for Textract.")
+
+            extracted_text = join_lines(textract_lines(response)).strip()
+            put_metric("TextractPages", response.get('DocumentMetadata', {}).get('Pages', 0))
 
     if not extracted_text:
-        return {
-            'statusCode': 400,
-            'body': json.dumps("No readable text found in document.")
-        }
+        raise RejectedResume("No readable text found in document.")
+    put_metric("ExtractedTextBytes", len(extracted_text))
 
-    # 3. Detect language and extract entities
-    try:
-        lang_response = comprehend.detect_dominant_language(Text=extracted_text)
-        dominant_lang = lang_response['Languages'][0]['LanguageCode'] if lang_response['Languages'] else 'en'
+    # 2. Skills and entities: the dictionary automaton, with Comprehend only when EXTRACTION_ENGINE asks for it
+    with timed_stage("SkillExtraction"):
+        extracted_entities, extracted_skills = analyze_text(comprehend, extracted_text)
 
-        entities = comprehend.detect_entities(Text=extracted_text, LanguageCode=dominant_lang).get('Entities', [])
-        key_phrases = comprehend.detect_key_phrases(Text=extracted_text, LanguageCode=dominant_lang).get('KeyPhrases', [])
+    # 3. Lookup candidate by matching filename. The upload can land before its item is
+    #    visible, so a miss is retried like any other transient failure.
+    with timed_stage("CandidateLookup"):
+        candidate = next(iter_scan(TABLE_NAME, model=Resume, FilterExpression=Attr("filename").eq(key)), None)
+    if not candidate:
+        raise LookupError("Candidate record not found for this resume.")
 
-        extracted_entities = [{"Text": ent["Text"], "Type": ent["Type"]}
-                              for ent in entities if ent["Type"] in ["PERSON", "ORGANIZATION", "DATE", "LOCATION"]]
-        extracted_skills = [phrase["Text"] for phrase in key_phrases if len(phrase["Text"].split()) <= 3]
-    except Exception as e:
-        return {
-            'statusCode': 500,
-            'body': json.dumps(f"Comprehend error: {str(e)}")
-        }
+    # 4. Store the bulky text compressed in S3, then update the (small) DynamoDB item
+    with timed_stage("TextStorage"):
+        text_key = store_extracted_text(bucket, candidate.resume_id, extracted_text)
 
-    # 4. Lookup candidate by matching filename
+    # 5. Near-duplicate check against the LSH index; the flags ride on the candidate update
+    signature, near_duplicates, indexed_bands = None, [], set()
     try:
-        scan_response = table.scan(
-            FilterExpression=Attr("filename").eq(key)
-        )
-        candidate = scan_response['Items'][0] if scan_response['Items'] else None
-
-        if not candidate:
-            return {
-                'statusCode': 404,
-                'body': json.dumps("Candidate record not found for this resume.")
-            }
+        if duplicates.DUPLICATE_INDEX_TABLE:
+            with timed_stage("DuplicateCheck"):
+                signature = duplicates.signature(extracted_text)
+                if signature:
+                    near_duplicates, indexed_bands = duplicates.find_near_duplicates(candidate.resume_id, signature)
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'body': json.dumps(f"DynamoDB lookup error: {str(e)}")
-        }
+        log("Duplicate check failed", level="WARNING", resume_id=candidate.resume_id, error=str(e))
 
-    # 5. Update DynamoDB item
+    update_expression = "SET extracted_text_key=:t, entities=:e, skills=:s, #s=:status"
+    values = {
+        ":t": text_key,
+        ":e": extracted_entities,
+        ":s": extracted_skills,
+        ":status": "Under Review"
+    }
+    # The dashboard rollups count the application under its job's department and skill match
+    # as they are now; freezing them on the item keeps later job edits from moving it
     try:
-        table.update_item(
-            Key={"resume_id": candidate["resume_id"]},
-            UpdateExpression="SET extracted_text=:t, entities=:e, skills=:s, #s=:status",
+        job_id = str(candidate.get('jobId') or '').strip()
+        with timed_stage("JobLookup"):
+            job = analytics.load_jobs([job_id]).get(job_id) if analytics.JOB_TABLE else None
+        frozen = analytics.frozen_dimensions(extracted_skills, job)
+        update_expression += ", department=:dept, match_bucket=:bucket"
+        values[":dept"], values[":bucket"] = frozen['department'], frozen['match_bucket']
+    except Exception as e:
+        # The rollups fall back to the job's current values for items without them
+        log("Job lookup failed", level="WARNING", resume_id=candidate.resume_id, error=str(e))
+    if near_duplicates:
+        update_expression += ", duplicate_of=:d"
+        values[":d"] = near_duplicates
+        put_metric("DuplicatesFlagged")
+
+    with timed_stage("CandidateUpdate"):
+        table(TABLE_NAME).update_item(
+            Key={"resume_id": candidate.resume_id},
+            UpdateExpression=update_expression + " REMOVE extracted_text",
             ExpressionAttributeNames={"#s": "status"},
-            ExpressionAttributeValues={
-                ":t": extracted_text,
-                ":e": extracted_entities,
-                ":s": extracted_skills,
-                ":status": "Under Review"
-            }
+            ExpressionAttributeValues=values
         )
-    except Exception as e:
-        return {
-            'statusCode': 500,
-            'body': json.dumps(f"Error updating DynamoDB item: {str(e)}")
-        }
+
+    if signature:
+        try:
+            with timed_stage("DuplicateIndex"):
+                duplicates.index_signature(candidate.resume_id, signature, candidate.get('email'), indexed_bands)
+        except Exception as e:
+            # The backlog job picks up resumes without a stored signature
+            log("Duplicate indexing failed", level="WARNING", resume_id=candidate.resume_id, error=str(e))
 
     # 6. Notify HR via SNS
     try:
@@ -130,15 +251,45 @@ def lambda_handler(event, context):
                 f"🎓 Educational Details:\n- " + ("\n- ".join(education_orgs) if education_orgs else "Not Found")
             )
 
-            sns.publish(
-                TopicArn=HR_TOPIC_ARN,
-                Subject="New Resume Processed",
-                Message=message
-            )
+            with timed_stage("SNS"):
+                sns.publish(
+                    TopicArn=HR_TOPIC_ARN,
+                    Subject="New Resume Processed",
+                    Message=message
+                )
     except Exception as e:
-        print(f"Failed to send SNS notification: {str(e)}")
+        log("Failed to send SNS notification", level="ERROR", error=str(e))
 
-    return {
-        'statusCode': 200,
-        'body': json.dumps("Resume processed and HR notified.")
-    }
+@instrument("ResumeProcessorFunction")
+def lambda_handler(event, context):
+    """
+    Consumes the resume queue (S3 upload notifications delivered through SQS) and
+    processes every object in every message of the batch. Rejected documents are
+    logged and dropped; transient failures are reported as batchItemFailures with an
+    exponential retry delay, ending in the dead-letter queue. Direct S3 events are
+    still accepted and raise on failure so Lambda's async retry applies.
+    """
+    records = (event or {}).get('Records', [])
+    failures = []
+    processed = rejected = 0
+
+    for record in records:
+        try:
+            for bucket, key in s3_objects(record):
+                try:
+                    process_resume(bucket, key)
+                    processed += 1
+                except RejectedResume as e:
+                    rejected += 1
+                    log("Resume rejected", level="WARNING", key=key, reason=str(e))
+        except Exception as e:
+            log("Resume processing failed", level="ERROR", message_id=record.get('messageId'), error=str(e))
+            if record.get('eventSource') != 'aws:sqs':
+                raise
+            failures.append({'itemIdentifier': record['messageId']})
+            retry_later(record)
+
+    put_metric("ResumesProcessed", processed)
+    put_metric("ResumesRejected", rejected)
+    put_metric("ResumeFailures", len(failures))
+    return {'batchItemFailures': failures}
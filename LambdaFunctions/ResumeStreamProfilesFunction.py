@@ -0,0 +1,52 @@
+import json
+import os
+from common.analytics import referenced_jobs
+from common.archive import without_archive_moves
+from common.dynamo import stream_images
+from common.instrumentation import instrument, log, put_metric, timed_stage
+from common.profiles import PROFILE_TABLE, apply_profile_changes, profile_changes, rebuild_profiles
+from common.subscriptions import SUBSCRIPTIONS_TABLE, backfill_subscriptions, subscription_puts, write_subscriptions
+
+# --- Configuration from Environment Variables ---
+RESUME_TABLE = os.environ.get("RESUME_TABLE")
+
+@instrument("ResumeStreamProfilesFunction")
+def lambda_handler(event, context):
+    """
+    Second consumer of the resume table's DynamoDB stream, next to ResumeStreamStatsFunction.
+    Merges every application into the per-candidate profiles and subscribes candidates
+    to the new-job topics. Every write is idempotent, so a retried batch is harmless.
+    Invoked with {"action": "rebuild"} it recomputes the profiles from scratch and
+    backfills the subscription index.
+    """
+    if (event or {}).get('action') == 'rebuild':
+        with timed_stage("Rebuild"):
+            profiles = rebuild_profiles(RESUME_TABLE) if PROFILE_TABLE else 0
+            subscriptions = backfill_subscriptions(RESUME_TABLE) if SUBSCRIPTIONS_TABLE else 0
+        return {'statusCode': 200, 'body': json.dumps({
+            'rebuilt_profiles': profiles, 'subscriptions_written': subscriptions
+        })}
+
+    records = (event or {}).get('Records', [])
+    put_metric("StreamRecords", len(records))
+
+    # Moves to and from the archive are not new or withdrawn applications
+    images = without_archive_moves(stream_images(records))
+    with timed_stage("JobLookup"):
+        jobs = referenced_jobs(images)
+
+    # 1. Merge the batch into the per-candidate profiles
+    profiles = 0
+    if PROFILE_TABLE:
+        with timed_stage("ProfileUpdate"):
+            profiles = apply_profile_changes(profile_changes(images, jobs), RESUME_TABLE)
+
+    # 2. Subscribe candidates to the department and skill topics of their new applications
+    subscribed = 0
+    if SUBSCRIPTIONS_TABLE:
+        with timed_stage("SubscriptionUpdate"):
+            subscribed = write_subscriptions(subscription_puts(images, jobs))
+
+    log("Applied stream changes to profiles", level="DEBUG", records=len(records), profiles=profiles,
+        subscriptions=subscribed)
+    return {'statusCode': 200, 'body': json.dumps({'profiles_updated': profiles, 'subscriptions_written': subscribed})}
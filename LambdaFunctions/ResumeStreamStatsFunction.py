@@ -0,0 +1,46 @@
+import json
+import os
+from common.analytics import apply_rollup_deltas, rebuild_rollups, rollup_deltas, unfrozen_jobs
+from common.archive import without_archive_moves
+from common.dynamo import stream_images
+from common.instrumentation import instrument, log, put_metric, timed_stage
+from common.stats import apply_deltas, rebuild_counts, status_deltas
+
+# --- Configuration from Environment Variables ---
+RESUME_TABLE = os.environ.get("RESUME_TABLE")
+
+@instrument("ResumeStreamStatsFunction")
+def lambda_handler(event, context):
+    """
+    Consumes the resume table's DynamoDB stream (NEW_AND_OLD_IMAGES) and keeps the
+    per-job x status applicant counters and the daily dashboard rollups in step with
+    every upload, processing update and status change. Profiles and subscriptions have
+    their own consumer (ResumeStreamProfilesFunction), so their failures never replay
+    these counters. Invoked with {"action": "rebuild"} it recomputes them from scratch.
+    """
+    if (event or {}).get('action') == 'rebuild':
+        with timed_stage("Rebuild"):
+            pairs = rebuild_counts(RESUME_TABLE)
+            cells = rebuild_rollups(RESUME_TABLE)
+        return {'statusCode': 200, 'body': json.dumps({'rebuilt_pairs': pairs, 'rebuilt_rollups': cells})}
+
+    records = (event or {}).get('Records', [])
+    put_metric("StreamRecords", len(records))
+
+    # 1. Net the batch down to one delta per (job_id, status) and per rollup cell.
+    #    Moves to and from the archive are not new or withdrawn applications.
+    images = without_archive_moves(stream_images(records))
+    deltas = status_deltas(images)
+    with timed_stage("JobLookup"):
+        jobs = unfrozen_jobs(images)
+    rollups = rollup_deltas(images, jobs)
+
+    # 2. Apply them atomically. A failure fails the whole batch so the stream retries it;
+    #    updates already applied are then counted twice, which a rebuild corrects.
+    with timed_stage("CounterUpdate"):
+        applied = apply_deltas(deltas)
+    with timed_stage("RollupUpdate"):
+        rolled = apply_rollup_deltas(rollups)
+
+    log("Applied stream deltas", level="DEBUG", records=len(records), counters=applied, rollups=rolled)
+    return {'statusCode': 200, 'body': json.dumps({'counters_updated': applied, 'rollups_updated': rolled})}
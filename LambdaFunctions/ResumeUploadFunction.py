@@ -2,12 +2,19 @@ import json
 import boto3
 import os
 import datetime
+import hashlib
+import time
 import uuid
 import smtplib
 from email.message import EmailMessage
+from botocore.exceptions import ClientError
+from common import dynamo
+from common.analytics import submitted_at_now
+from common.instrumentation import instrument, instrument_client, log, put_metric, timed_stage
+from common.locations import resume_location
+from common.signing import resume_url
 
-s3 = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
+s3 = instrument_client(boto3.client('s3'))
 
 BUCKET_NAME = os.environ.get("BUCKET_NAME")
 TABLE_NAME = os.environ.get("DDB_TABLE")
@@ -17,6 +24,31 @@ SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD")
 SMTP_SERVER = os.environ.get("SMTP_SERVER", "smtp.gmail.com")
 SMTP_PORT = int(os.environ.get("SMTP_PORT", "587"))
 
+# --- Upload limits (enforced by S3 itself, not just the browser) ---
+# Files above MULTIPART_THRESHOLD_BYTES upload in parts, so MAX_RESUME_BYTES must stay above it.
+# 10 MB matches the PDF preflight limit (Textract's synchronous limit).
+MAX_RESUME_BYTES = int(os.environ.get("MAX_RESUME_BYTES", str(10 * 1024 * 1024)))
+MULTIPART_THRESHOLD_BYTES = int(os.environ.get("MULTIPART_THRESHOLD_BYTES", str(5 * 1024 * 1024)))
+# S3 requires every part except the last to be at least 5 MiB
+MULTIPART_PART_BYTES = max(int(os.environ.get("MULTIPART_PART_BYTES", str(5 * 1024 * 1024))), 5 * 1024 * 1024)
+UPLOAD_URL_EXPIRY = int(os.environ.get("UPLOAD_URL_EXPIRY", "900"))
+
+# --- Duplicate-submission suppression ---
+# Partition key `idempotency_key`, ttl enabled. Keys come from the Idempotency-Key header or (email, jobId).
+IDEMPOTENCY_TABLE = os.environ.get("IDEMPOTENCY_TABLE")
+IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL", str(7 * 24 * 3600)))
+PENDING_TIMEOUT = 120  # A claim this old never finished (the invocation died) and may be taken over
+
+# complete_multipart_upload errors that mean the parts themselves are bad; anything else
+# (throttling, a timeout) leaves the upload intact so the client can retry completing it
+INVALID_UPLOAD_ERRORS = ('InvalidPart', 'InvalidPartOrder', 'EntityTooSmall', 'EntityTooLarge', 'NoSuchUpload')
+
+CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".doc": "application/msword",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
 def send_email(to_address, subject, body):
     """Sends an email using configured SMTP settings."""
     msg = EmailMessage()
@@ -30,12 +62,218 @@ def send_email(to_address, subject, body):
         server.login(SMTP_EMAIL, SMTP_PASSWORD)
         server.send_message(msg)
 
+def get_content_type(filename):
+    """Returns the exact content type for an allowed resume extension, or None."""
+    _, ext = os.path.splitext(filename.lower())
+    return CONTENT_TYPES.get(ext)
+
+def get_header(event, name):
+    return next((v for k, v in (event.get('headers') or {}).items() if k.lower() == name), None)
+
+def idempotency_key(event, email, job_id):
+    """The client's Idempotency-Key, or one derived from (email, jobId) so a candidate applies once per job."""
+    header_key = (get_header(event, 'idempotency-key') or '').strip()
+    if header_key:
+        return f"key#{header_key[:128]}"
+    return "derived#" + hashlib.sha256(f"{email.strip().lower()}#{job_id}".encode('utf-8')).hexdigest()
+
+def request_fingerprint(body):
+    """Identifies the submission itself, so a reused key with a different payload is refused."""
+    fields = (body.get("email", "").strip().lower(), body.get("jobId") or "", body.get("resume", ""), str(body.get("resumeSize") or 0))
+    return hashlib.sha256("\x1f".join(fields).encode('utf-8')).hexdigest()
+
+def reserve_submission(key, fingerprint, resume_id, s3_key):
+    """
+    Claims the key with a conditional put. Returns None when this request owns the
+    submission, or the existing record when another request already claimed it.
+    """
+    now = int(time.time())
+    try:
+        dynamo.table(IDEMPOTENCY_TABLE).put_item(
+            Item={
+                'idempotency_key': key,
+                'state': 'pending',
+                'fingerprint': fingerprint,
+                'resume_id': resume_id,
+                's3_key': s3_key,
+                'created_at': now,
+                'ttl': now + IDEMPOTENCY_TTL,
+            },
+            # Expired records linger until TTL deletes them; treat them as free, like abandoned claims
+            ConditionExpression=('attribute_not_exists(idempotency_key) OR #ttl < :now '
+                                 'OR (#state = :pending AND created_at < :stale)'),
+            ExpressionAttributeNames={'#ttl': 'ttl', '#state': 'state'},
+            ExpressionAttributeValues={':now': now, ':pending': 'pending', ':stale': now - PENDING_TIMEOUT}
+        )
+        return None
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+    return dynamo.get_item(IDEMPOTENCY_TABLE, {'idempotency_key': key}) or {}
+
+def release_submission(key):
+    """Frees the key after a failed submission so the client's retry can go through."""
+    try:
+        dynamo.table(IDEMPOTENCY_TABLE).delete_item(Key={'idempotency_key': key})
+    except Exception as e:
+        log("Error releasing idempotency key", level="ERROR", error=str(e))
+
+def complete_submission(key, response_body):
+    dynamo.table(IDEMPOTENCY_TABLE).update_item(
+        Key={'idempotency_key': key},
+        UpdateExpression='SET #state = :done, response_body = :response, upload_expires_at = :expires',
+        ExpressionAttributeNames={'#state': 'state'},
+        ExpressionAttributeValues={
+            ':done': 'completed',
+            ':response': response_body,
+            ':expires': int(time.time()) + UPLOAD_URL_EXPIRY,
+        }
+    )
+
+def resume_uploaded(s3_key):
+    """Whether the resume for a submission already reached S3 (assumed so when the check itself fails)."""
+    try:
+        s3.head_object(Bucket=BUCKET_NAME, Key=s3_key)
+        return True
+    except ClientError as e:
+        return e.response['Error']['Code'] not in ('404', 'NoSuchKey', 'NotFound')
+
+def replay_submission(key, record, fingerprint, content_type, resume_size):
+    """
+    Answers a repeated submission without creating another candidate. Once the resume is
+    in S3 the stored result comes back without upload targets, so a replay can neither
+    overwrite it nor trigger processing again; before that the client gets the original
+    targets while they are valid, and fresh ones for the same S3 key after.
+    """
+    if record.get('fingerprint') != fingerprint:
+        return {"statusCode": 409, "body": json.dumps({
+            "error": "An application with these details was already submitted for this job"})}
+    if record.get('state') != 'completed':
+        return {"statusCode": 409, "body": json.dumps({
+            "error": "This application is still being submitted, please retry shortly"})}
+
+    response_body = record['response_body']
+    if resume_uploaded(record['s3_key']):
+        payload = json.loads(response_body)
+        response_body = json.dumps({
+            "already_uploaded": True,
+            "content_type": payload.get("content_type"),
+            "s3_key": record['s3_key'],
+            "resume_url": resume_url(record['s3_key'], BUCKET_NAME)
+        })
+    elif record.get('upload_expires_at', 0) <= time.time() + 60:
+        payload = json.loads(response_body)
+        if payload.get("multipart"):
+            payload["multipart"] = create_multipart_upload(record['s3_key'], content_type, resume_size)
+        else:
+            presigned_post = create_presigned_post(record['s3_key'], content_type)
+            payload["upload_url"], payload["upload_fields"] = presigned_post["url"], presigned_post["fields"]
+        payload["resume_url"] = resume_url(record['s3_key'], BUCKET_NAME)
+        response_body = json.dumps(payload)
+        try:
+            complete_submission(key, response_body)
+        except Exception as e:
+            # The fresh targets are still valid; the next replay just signs new ones
+            log("Error recording idempotent response", level="ERROR", error=str(e))
+
+    put_metric("DuplicateSubmissions")
+    log("Replayed duplicate submission", resume_id=record.get('resume_id'))
+    return {
+        "statusCode": 200,
+        "headers": {"Access-Control-Allow-Origin": "*", "Idempotent-Replayed": "true"},
+        "body": response_body
+    }
+
+def create_presigned_post(s3_key, content_type):
+    """Presigned POST policy: S3 rejects the upload unless the size and type match."""
+    return s3.generate_presigned_post(
+        Bucket=BUCKET_NAME,
+        Key=s3_key,
+        Fields={"Content-Type": content_type},
+        Conditions=[
+            {"Content-Type": content_type},
+            ["content-length-range", 1, MAX_RESUME_BYTES],
+        ],
+        ExpiresIn=UPLOAD_URL_EXPIRY
+    )
+
+def create_multipart_upload(s3_key, content_type, file_size):
+    """Starts a multipart upload and presigns one PUT URL per part so each part can be retried on its own."""
+    upload = s3.create_multipart_upload(Bucket=BUCKET_NAME, Key=s3_key, ContentType=content_type)
+    upload_id = upload["UploadId"]
+    part_count = -(-file_size // MULTIPART_PART_BYTES)
+    part_urls = [
+        s3.generate_presigned_url(
+            'upload_part',
+            Params={"Bucket": BUCKET_NAME, "Key": s3_key, "UploadId": upload_id, "PartNumber": part_number},
+            ExpiresIn=UPLOAD_URL_EXPIRY
+        )
+        for part_number in range(1, part_count + 1)
+    ]
+    return {"upload_id": upload_id, "part_size": MULTIPART_PART_BYTES, "part_urls": part_urls}
+
+def abort_upload(s3_key, upload_id):
+    try:
+        s3.abort_multipart_upload(Bucket=BUCKET_NAME, Key=s3_key, UploadId=upload_id)
+    except Exception as e:
+        log("Error aborting multipart upload", level="ERROR", s3_key=s3_key, error=str(e))
+
+def complete_upload(body):
+    """Completes a multipart upload, then re-checks the assembled object against the size and type limits."""
+    s3_key = body.get("s3_key")
+    upload_id = body.get("upload_id")
+    parts = body.get("parts") or []
+
+    if not all([s3_key, upload_id, parts]):
+        return {"statusCode": 400, "body": json.dumps({"error": "s3_key, upload_id and parts are required"})}
+
+    try:
+        s3.complete_multipart_upload(
+            Bucket=BUCKET_NAME,
+            Key=s3_key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": sorted(
+                [{"PartNumber": int(p["PartNumber"]), "ETag": p["ETag"]} for p in parts],
+                key=lambda p: p["PartNumber"]
+            )}
+        )
+    except ClientError as e:
+        code = e.response['Error']['Code']
+        log("Error completing multipart upload", level="ERROR", s3_key=s3_key, code=code, error=str(e))
+        if code not in INVALID_UPLOAD_ERRORS:
+            return {"statusCode": 503, "body": json.dumps({"error": "Failed to complete upload, please retry"})}
+        abort_upload(s3_key, upload_id)
+        return {"statusCode": 400, "body": json.dumps({"error": "The uploaded parts are invalid, please upload the file again"})}
+    except Exception as e:
+        log("Error completing multipart upload", level="ERROR", s3_key=s3_key, error=str(e))
+        return {"statusCode": 503, "body": json.dumps({"error": "Failed to complete upload, please retry"})}
+
+    # Part URLs cannot carry a content-length-range, so enforce the limits on the finished object
+    try:
+        head = s3.head_object(Bucket=BUCKET_NAME, Key=s3_key)
+        if head["ContentLength"] > MAX_RESUME_BYTES or head.get("ContentType") != get_content_type(s3_key):
+            s3.delete_object(Bucket=BUCKET_NAME, Key=s3_key)
+            return {"statusCode": 400, "body": json.dumps({"error": "Uploaded file exceeds the size limit or has the wrong type"})}
+    except Exception as e:
+        log("Error verifying uploaded object", level="ERROR", s3_key=s3_key, error=str(e))
+        return {"statusCode": 500, "body": json.dumps({"error": "Failed to verify upload"})}
+
+    return {
+        "statusCode": 200,
+        "headers": {"Access-Control-Allow-Origin": "*"},
+        "body": json.dumps({"message": "Upload completed", "s3_key": s3_key})
+    }
+
+@instrument("ResumeUploadFunction")
 def lambda_handler(event, context):
     try:
         body = json.loads(event["body"])
     except Exception:
         return {"statusCode": 400, "body": json.dumps({"error": "Invalid JSON in request body"})}
 
+    if body.get("action") == "complete_upload":
+        return complete_upload(body)
+
     # --- UPDATED: Added 'age' to the list of required fields ---
     required_fields = ["name", "email", "contact", "gender", "workPref", "address", "resume", "experience", "age"]
     missing_fields = [field for field in required_fields if not body.get(field)]
@@ -70,44 +308,57 @@ def lambda_handler(event, context):
     
     submission_timestamp = body.get("submittedAt")
 
+    content_type = get_content_type(resume_filename)
+    if not content_type:
+        return {"statusCode": 400, "body": json.dumps({"error": "Only PDF, DOC, or DOCX files are allowed"})}
+
+    try:
+        resume_size = int(body.get("resumeSize") or 0)
+    except (TypeError, ValueError):
+        return {"statusCode": 400, "body": json.dumps({"error": "resumeSize must be a number of bytes"})}
+
+    if resume_size > MAX_RESUME_BYTES:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": f"File is too large. Maximum allowed is {MAX_RESUME_BYTES // (1024 * 1024)} MB"})
+        }
+
     first_name, *rest = name.strip().split()
     last_name = " ".join(rest) if rest else ""
 
     s3_key = f"uploads/{datetime.datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{resume_filename}"
     resume_id = str(uuid.uuid4())
 
-    # Generate presigned PUT URL
-    try:
-        content_type = 'application/octet-stream' # Default
-        if resume_filename.lower().endswith('.pdf'):
-            content_type = 'application/pdf'
-        elif resume_filename.lower().endswith('.doc'):
-            content_type = 'application/msword'
-        elif resume_filename.lower().endswith('.docx'):
-            content_type = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-
-        presigned_upload_url = s3.generate_presigned_url(
-            'put_object',
-            Params={"Bucket": BUCKET_NAME, "Key": s3_key, "ContentType": content_type},
-            ExpiresIn=300
-        )
-    except Exception as e:
-        print(f"Error generating PUT URL: {e}")
-        return {"statusCode": 500, "body": json.dumps({"error": "Failed to generate upload URL"})}
+    # Double-clicks and client retries replay the first submission instead of creating a duplicate
+    submission_key = None
+    if IDEMPOTENCY_TABLE:
+        submission_key = idempotency_key(event, email, job_id)
+        fingerprint = request_fingerprint(body)
+        try:
+            with timed_stage("IdempotencyCheck"):
+                existing = reserve_submission(submission_key, fingerprint, resume_id, s3_key)
+            if existing is not None:
+                return replay_submission(submission_key, existing, fingerprint, content_type, resume_size)
+        except Exception as e:
+            log("Error checking idempotency key", level="ERROR", error=str(e))
+            return {"statusCode": 500, "body": json.dumps({"error": "Failed to register submission"})}
 
-    # Generate presigned GET URL
+    # Generate the upload target: a size/type-restricted POST policy, or per-part URLs for large files
     try:
-        presigned_download_url = s3.generate_presigned_url(
-            'get_object',
-            Params={"Bucket": BUCKET_NAME, "Key": s3_key},
-            ExpiresIn=15 * 24 * 3600 
-        )
+        multipart_upload = None
+        presigned_post = None
+        if resume_size > MULTIPART_THRESHOLD_BYTES:
+            multipart_upload = create_multipart_upload(s3_key, content_type, resume_size)
+        else:
+            presigned_post = create_presigned_post(s3_key, content_type)
     except Exception as e:
-        print(f"Error generating GET URL: {e}")
-        return {"statusCode": 500, "body": json.dumps({"error": "Failed to generate download URL"})}
+        log("Error generating upload URL", level="ERROR", error=str(e))
+        if submission_key:
+            release_submission(submission_key)
+        return {"statusCode": 500, "body": json.dumps({"error": "Failed to generate upload URL"})}
 
     # Store metadata in DynamoDB
-    table = dynamodb.Table(TABLE_NAME)
+    table = dynamo.table(TABLE_NAME)
     try:
         item_to_store = {
             "resume_id": resume_id,
@@ -127,36 +378,55 @@ def lambda_handler(event, context):
             "grad_marks": grad_marks,
             "linkedin": linkedin,
             "status": "Uploaded",
-            "resume_url": presigned_download_url,
             "jobId": job_id,
             "jobTitle": job_title,
-            "datetime": submission_timestamp 
+            "datetime": submission_timestamp,
+            # Server-side UTC time; sort key of the jobId-submitted_at-index GSI
+            "submitted_at": submitted_at_now()
         }
         # Remove keys with None or empty string values so they aren't stored in DynamoDB
         item_to_store = {k: v for k, v in item_to_store.items() if v is not None and v != ''}
+        # Gazetteer city/region codes for the city_code-index GSI, resolved once here
+        item_to_store.update(resume_location(item_to_store))
         
-        table.put_item(Item=item_to_store)
+        with timed_stage("MetadataWrite"):
+            table.put_item(Item=item_to_store)
         
     except Exception as e:
-        print(f"Error storing metadata: {e}")
+        log("Error storing metadata", level="ERROR", error=str(e))
+        if submission_key:
+            release_submission(submission_key)
         return {"statusCode": 500, "body": json.dumps({"error": "Failed to store metadata"})}
 
     # Send confirmation email
     try:
-        send_email(
-            to_address=email,
-            subject="Resume Upload Confirmation",
-            body=f"Hi {first_name},\n\nYour resume for the position of {job_title} has been received. We will get back to you shortly.\n\nRegards,\nThe Hiring Team"
-        )
+        with timed_stage("ConfirmationEmail"):
+            send_email(
+                to_address=email,
+                subject="Resume Upload Confirmation",
+                body=f"Hi {first_name},\n\nYour resume for the position of {job_title} has been received. We will get back to you shortly.\n\nRegards,\nThe Hiring Team"
+            )
     except Exception as e:
-        print(f"Email sending failed: {e}") # Log email errors but don't fail the request
+        log("Email sending failed", level="ERROR", error=str(e)) # Log email errors but don't fail the request
+
+    response_body = json.dumps({
+        "upload_url": presigned_post["url"] if presigned_post else None,
+        "upload_fields": presigned_post["fields"] if presigned_post else None,
+        "multipart": multipart_upload,
+        "content_type": content_type,
+        "s3_key": s3_key,
+        "resume_url": resume_url(s3_key, BUCKET_NAME)
+    })
+
+    # Remember the response so replays return the same upload targets
+    if submission_key:
+        try:
+            complete_submission(submission_key, response_body)
+        except Exception as e:
+            log("Error recording idempotent response", level="ERROR", error=str(e))
 
     return {
         "statusCode": 200,
         "headers": {"Access-Control-Allow-Origin": "*"},
-        "body": json.dumps({
-            "upload_url": presigned_upload_url,
-            "s3_key": s3_key,
-            "resume_url": presigned_download_url
-        })
+        "body": response_body
     }
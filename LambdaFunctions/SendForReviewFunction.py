@@ -7,6 +7,9 @@ from datetime import datetime, timedelta, timezone
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from common import dynamo
+from common.instrumentation import instrument, instrument_client, log, put_metric, timed_stage
+from common.models import ReviewToken
 
 # --- Configuration from Environment Variables ---
 SENDER_EMAIL = os.environ.get('SENDER_EMAIL')
@@ -20,19 +23,19 @@ TOKEN_TABLE_NAME = os.environ.get('TOKEN_TABLE_NAME')
 FRONTEND_REVIEW_URL = os.environ.get('FRONTEND_REVIEW_URL')
 
 # --- Initialize AWS Clients ---
-dynamodb_client = boto3.client('dynamodb')
-secrets_manager_client = boto3.client('secretsmanager')
+secrets_manager_client = instrument_client(boto3.client('secretsmanager'))
 
 def get_jwt_secret():
     """
     Fetches the JWT secret from AWS Secrets Manager and caches it globally.
     """
     if 'jwt_secret' not in globals():
-        print("Fetching JWT secret from Secrets Manager...")
+        log("Fetching JWT secret from Secrets Manager")
         secret_value = secrets_manager_client.get_secret_value(SecretId=JWT_SECRET_ARN)
         globals()['jwt_secret'] = secret_value['SecretString']
     return globals()['jwt_secret']
 
+@instrument("SendForReviewFunction")
 def lambda_handler(event, context):
     headers = {
         'Access-Control-Allow-Headers': 'Content-Type',
@@ -47,6 +50,7 @@ def lambda_handler(event, context):
         cc_emails = body.get('cc_emails', [])  # Expect a list of CC emails
         candidate_name = body.get('candidate_name')
         department = body.get('department')
+        job_id = body.get('job_id')  # Lets the review page load the job in the same read as the candidate
 
         if not all([resume_id, reviewer_email, candidate_name, department]):
             return {'statusCode': 400, 'headers': headers, 'body': json.dumps({'message': 'Missing required fields.'})}
@@ -58,6 +62,7 @@ def lambda_handler(event, context):
         payload = {
             'resume_id': resume_id,
             'reviewer_email': reviewer_email,
+            **({'job_id': job_id} if job_id else {}),
             'exp': int(expiration_time.timestamp())
         }
         
@@ -65,21 +70,14 @@ def lambda_handler(event, context):
 
         # 2. Store the token for one-time use validation
         ttl_timestamp = int(expiration_time.timestamp())
-        dynamodb_client.put_item(
-            TableName=TOKEN_TABLE_NAME,
-            Item={
-                'token': {'S': token},
-                'resume_id': {'S': resume_id},
-                'status': {'S': 'pending'},
-                'ttl': {'N': str(ttl_timestamp)}
-            }
-        )
+        review_token = ReviewToken(token=token, resume_id=resume_id, job_id=job_id, status='pending', ttl=ttl_timestamp)
+        dynamo.table(TOKEN_TABLE_NAME).put_item(Item=review_token.to_item())
         
         # 3. Construct the secure review link
         review_link = f"{FRONTEND_REVIEW_URL}?token={token}"
 
         # 4. Send the email using smtplib
-        print(f"Preparing to send email to {reviewer_email} and CC {cc_emails}...")
+        log("Preparing to send review email", cc_count=len(cc_emails))
         
         msg = MIMEMultipart('alternative')
         msg['Subject'] = f"Review Requested for Candidate: {candidate_name}"
@@ -110,12 +108,13 @@ def lambda_handler(event, context):
         # Combine all recipients for the sendmail function
         all_recipients = [reviewer_email] + cc_emails
         
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PASSWORD)
-            server.sendmail(SENDER_EMAIL, all_recipients, msg.as_string())
+        with timed_stage("ReviewEmail"):
+            with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
+                server.starttls()
+                server.login(SMTP_USER, SMTP_PASSWORD)
+                server.sendmail(SENDER_EMAIL, all_recipients, msg.as_string())
         
-        print(f"Email successfully sent to {all_recipients}.")
+        put_metric("EmailsSent", len(all_recipients))
 
         return {
             'statusCode': 200,
@@ -124,7 +123,7 @@ def lambda_handler(event, context):
         }
 
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        log("An error occurred", level="ERROR", error=str(e))
         return {
             'statusCode': 500,
             'headers': headers,
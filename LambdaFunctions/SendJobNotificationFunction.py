@@ -0,0 +1,71 @@
+import json
+import os
+import smtplib
+from common.instrumentation import instrument, log, put_metric, timed_stage
+from common.notifications import build_jobs_email, release_quota, take_quota
+
+# --- Configuration from Environment Variables ---
+SENDER_EMAIL = os.environ.get('SENDER_EMAIL')
+SMTP_HOST = os.environ.get('SMTP_HOST')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', '587'))
+SMTP_USER = os.environ.get('SMTP_USER')
+SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
+JOB_LISTINGS_URL = os.environ.get('JOB_LISTINGS_URL')
+
+
+@instrument("SendJobNotificationFunction")
+def lambda_handler(event, context):
+    """
+    Consumes the notification queue filled by JobNotificationFanoutFunction and emails
+    each candidate their matching new jobs over a single SMTP session per batch. Each send
+    first takes one unit of the candidate's daily cap (given back if the send fails);
+    over-cap messages are dropped. Failed messages are reported back as batchItemFailures
+    so only they are retried.
+    """
+    records = (event or {}).get('Records', [])
+    failures = []
+    sent = 0
+    capped = 0
+
+    with timed_stage("EmailSend"):
+        try:
+            server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
+            server.starttls()
+            server.login(SMTP_USER, SMTP_PASSWORD)
+        except Exception as e:
+            log("Could not open SMTP session", level="ERROR", error=str(e))
+            put_metric("EmailFailures", len(records))
+            return {'batchItemFailures': [{'itemIdentifier': r['messageId']} for r in records]}
+
+        with server:
+            for record in records:
+                charged = None
+                try:
+                    message = json.loads(record['body'])
+                    if not take_quota(message['email']):
+                        capped += 1
+                        continue
+                    charged = message['email']
+                    jobs = message['jobs']
+                    subject = (f"New opening: {jobs[0].get('jobTitle')}" if len(jobs) == 1
+                               else f"{len(jobs)} new openings that match your profile")
+                    msg = build_jobs_email(
+                        SENDER_EMAIL, message['email'], subject, message.get('first_name') or 'there',
+                        "New jobs matching your applications and skills were just posted:",
+                        jobs, JOB_LISTINGS_URL
+                    )
+                    server.sendmail(SENDER_EMAIL, [message['email']], msg.as_string())
+                    sent += 1
+                except Exception as e:
+                    log("Failed to send job notification", level="ERROR", message_id=record.get('messageId'), error=str(e))
+                    failures.append({'itemIdentifier': record['messageId']})
+                    if charged:
+                        try:
+                            release_quota(charged)
+                        except Exception as release_error:
+                            log("Failed to release notification quota", level="WARNING", error=str(release_error))
+
+    put_metric("EmailsSent", sent)
+    put_metric("EmailFailures", len(failures))
+    put_metric("NotificationsCapped", capped)
+    return {'batchItemFailures': failures}
@@ -1,13 +1,13 @@
 import json
-import boto3
 import smtplib
 import os
 from email.message import EmailMessage
+from common import dynamo
+from common.instrumentation import instrument, log, put_metric, timed_stage
+from common.models import Resume
 
-# Initialize DynamoDB client
-dynamodb = boto3.resource('dynamodb')
 table_name = os.environ.get("DDB_NAME")
-table = dynamodb.Table(table_name)
+table = dynamo.table(table_name)
 
 # --- Configuration ---
 APTITUDE_QUIZ_LINK = "https://forms.office.com/r/ZR3zEC9Hqt"
@@ -29,13 +29,13 @@ def send_email(to_email, subject, plain_body, html_body):
             smtp.starttls()
             smtp.login(sender_email, sender_password)
             smtp.send_message(msg)
-        print(f"Email sent successfully to {to_email}")
+        put_metric("EmailsSent")
     except Exception as e:
-        print(f"Error sending email to {to_email}: {e}")
+        log("Error sending email", level="ERROR", error=str(e))
         
+@instrument("UpdateApplicantStatus")
 def lambda_handler(event, context):
     try:
-        print("EVENT RECEIVED:", json.dumps(event))
         body = json.loads(event.get("body", "{}"))
 
         resume_id = body.get('resume_id')
@@ -48,9 +48,9 @@ def lambda_handler(event, context):
                 'body': json.dumps("Missing required fields: resume_id and status are required.")
             }
 
-        # 1. Fetch the full candidate record to get all necessary details
-        response = table.get_item(Key={'resume_id': resume_id})
-        candidate = response.get('Item')
+        # 1. Fetch only the candidate fields the email needs
+        candidate = dynamo.get_item(table_name, {'resume_id': resume_id}, model=Resume,
+                                    **dynamo.projection(('email', 'first_name', 'experience')))
 
         if not candidate:
             return {
@@ -59,9 +59,9 @@ def lambda_handler(event, context):
                 'body': json.dumps(f"Candidate with resume_id {resume_id} not found.")
             }
         
-        email = candidate.get('email')
-        first_name = candidate.get('first_name')
-        experience = candidate.get('experience')
+        email = candidate.email
+        first_name = candidate.first_name
+        experience = candidate.experience
 
         if not all([email, first_name]):
              return {
@@ -77,7 +77,7 @@ def lambda_handler(event, context):
             ExpressionAttributeNames={'#s': 'status'},
             ExpressionAttributeValues={':val': new_status}
         )
-        print(f"Successfully updated status for {resume_id} to {new_status}")
+        log("Updated applicant status", resume_id=resume_id, status=new_status)
 
         # 3. Determine which email to send based on the new status and experience
         subject = ""
@@ -156,7 +156,8 @@ def lambda_handler(event, context):
             html_body = email_template_wrapper.format(content=html_content)
         
         # 4. Send the appropriate email
-        send_email(email, subject, plain_text_body, html_body)
+        with timed_stage("StatusEmail"):
+            send_email(email, subject, plain_text_body, html_body)
 
         return {
             'statusCode': 200,
@@ -165,7 +166,7 @@ def lambda_handler(event, context):
         }
 
     except Exception as e:
-        print("Exception:", str(e))
+        log("Exception", level="ERROR", error=str(e))
         return {
             'statusCode': 500,
             'headers': {'Access-Control-Allow-Origin': '*'},
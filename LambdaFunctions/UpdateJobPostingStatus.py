@@ -2,18 +2,18 @@ import json
 import boto3
 import os
 import uuid
-from decimal import Decimal
+from common import dynamo
+from common.instrumentation import instrument, instrument_client, log, timed_stage
+from common.job_aliases import JOB_ALIAS_TABLE, alias_put
+from common.locations import JOB_SORT_KEY, job_location, stale_attributes
+from common.responses import dumps
 
-dynamodb = boto3.resource('dynamodb')
 TABLE_NAME = os.environ.get('TABLE_NAME')
-table = dynamodb.Table(TABLE_NAME)
-
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, o):
-        if isinstance(o, Decimal):
-            return int(o) if o % 1 == 0 else float(o)
-        return super(DecimalEncoder, self).default(o)
+JOB_MIGRATION_FUNCTION = os.environ.get('JOB_MIGRATION_FUNCTION')  # MigrateJobApplicantsFunction
+table = dynamo.table(TABLE_NAME)
+lambda_client = instrument_client(boto3.client('lambda'))
 
+@instrument("UpdateJobPostingStatus")
 def lambda_handler(event, context):
     headers = {
         'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
@@ -47,7 +47,7 @@ def lambda_handler(event, context):
                 ExpressionAttributeValues={':s': new_status},
                 ReturnValues='ALL_NEW'
             )
-            return {'statusCode': 200, 'headers': headers, 'body': json.dumps({'message': 'Status updated.', 'updatedJob': response.get('Attributes', {})}, cls=DecimalEncoder)}
+            return {'statusCode': 200, 'headers': headers, 'body': dumps({'message': 'Status updated.', 'updatedJob': response.get('Attributes', {})}, drop_none=False)}
 
         # --- ACTION: UPDATE JOB DETAILS ---
         elif action == 'update_job_details':
@@ -62,26 +62,52 @@ def lambda_handler(event, context):
             
             # SCENARIO 1: Department has changed, so we need to create a new item and delete the old one.
             if new_department and original_job.get('department') != new_department:
-                print(f"Department changed for {job_id}. Creating new job item.")
+                log("Department changed. Creating new job item.", job_id=job_id)
                 
                 # Create the new job item by merging old and new data
-                new_item = {**original_job, **body}
+                new_item = {**original_job, **{k: v for k, v in body.items() if k != 'action'}}
                 
                 # Generate a new job_id
                 unique_suffix = str(uuid.uuid4())[:8]
-                new_item['job_id'] = f"{new_department.upper().replace(' ', '')}-{unique_suffix}"
+                new_job_id = f"{new_department.upper().replace(' ', '')}-{unique_suffix}"
+                new_item['job_id'] = new_job_id
+                location = job_location(new_item)
+                for name in stale_attributes(location, JOB_SORT_KEY):
+                    new_item.pop(name, None)
+                new_item.update(location)
                 
-                # Save the new item
-                table.put_item(Item=new_item)
+                # Create the new item, delete the old one and record the alias in one transaction,
+                # so readers always find the job under one ID or resolve it through the alias
+                operations = [
+                    {'Put': {'TableName': TABLE_NAME, 'Item': new_item,
+                             'ConditionExpression': 'attribute_not_exists(job_id)'}},
+                    {'Delete': {'TableName': TABLE_NAME, 'Key': {'job_id': job_id},
+                                'ConditionExpression': 'attribute_exists(job_id)'}},
+                ]
+                if JOB_ALIAS_TABLE:
+                    operations.append(alias_put(job_id, new_job_id))
+                else:
+                    log("JOB_ALIAS_TABLE not set; old job_id will not resolve until applicants move", level="WARNING", job_id=job_id)
+                with timed_stage("JobMove"):
+                    dynamo.transact_write(operations)
                 
-                # Delete the old item
-                table.delete_item(Key={'job_id': job_id})
+                # Move the applicants in the background; the request does not wait for it
+                try:
+                    lambda_client.invoke(
+                        FunctionName=JOB_MIGRATION_FUNCTION,
+                        InvocationType='Event',
+                        Payload=json.dumps({'old_job_id': job_id, 'new_job_id': new_job_id,
+                                            'job_title': new_item.get('jobTitle'), 'department': new_department})
+                    )
+                except Exception as e:
+                    # The alias keeps reads correct; the migration can be re-run with the same payload
+                    log("Failed to start applicant migration", level="ERROR", job_id=job_id, error=str(e))
                 
-                return {'statusCode': 200, 'headers': headers, 'body': json.dumps({'message': 'Job updated with new ID.', 'updatedJob': new_item}, cls=DecimalEncoder)}
+                return {'statusCode': 200, 'headers': headers, 'body': dumps({'message': 'Job updated with new ID.', 'updatedJob': new_item, 'previousJobId': job_id}, drop_none=False)}
 
             # SCENARIO 2: Department is the same, just update the existing item.
             else:
-                print(f"Updating details for job_id: {job_id}")
+                log("Updating job details", job_id=job_id)
                 update_expression_parts = []
                 expression_values = {}
                 expression_names = {}
@@ -105,7 +131,21 @@ def lambda_handler(event, context):
                 if not expression_values:
                      return {'statusCode': 400, 'headers': headers, 'body': json.dumps({'message': 'No fields to update.'})}
 
+                # Keep the location index attributes in step with location/workMode edits
+                remove_names = []
+                if 'location' in body or 'workMode' in body:
+                    location = job_location({**original_job, **body})
+                    for field, value in location.items():
+                        update_expression_parts.append(f"#{field} = :{field}")
+                        expression_names[f"#{field}"] = field
+                        expression_values[f":{field}"] = value
+                    for field in stale_attributes(location, JOB_SORT_KEY):
+                        remove_names.append(f"#{field}")
+                        expression_names[f"#{field}"] = field
+
                 update_expression = "SET " + ", ".join(update_expression_parts)
+                if remove_names:
+                    update_expression += " REMOVE " + ", ".join(remove_names)
                 response = table.update_item(
                     Key={'job_id': job_id},
                     UpdateExpression=update_expression,
@@ -113,11 +153,11 @@ def lambda_handler(event, context):
                     ExpressionAttributeValues=expression_values,
                     ReturnValues="ALL_NEW"
                 )
-                return {'statusCode': 200, 'headers': headers, 'body': json.dumps({'message': 'Details updated.', 'updatedJob': response.get('Attributes', {})}, cls=DecimalEncoder)}
+                return {'statusCode': 200, 'headers': headers, 'body': dumps({'message': 'Details updated.', 'updatedJob': response.get('Attributes', {})}, drop_none=False)}
 
         else:
             return {'statusCode': 400, 'headers': headers, 'body': json.dumps({'message': f"Invalid action: {action}"})}
 
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        log("An error occurred", level="ERROR", error=str(e))
         return {'statusCode': 500, 'headers': headers, 'body': json.dumps({'message': f'An internal server error occurred: {str(e)}'})}
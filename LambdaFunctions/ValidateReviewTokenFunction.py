@@ -2,28 +2,53 @@ import json
 import boto3
 import os
 import jwt  # From the PyJWT library
-from decimal import Decimal
+from common.dynamo import get_item, get_items, projection
+from common.instrumentation import instrument, instrument_client, log, timed_stage
+from common.job_aliases import resolve_job_ids
+from common.lexicon import group_entities, skill_match
+from common.models import Job, Resume, ReviewToken
+from common.responses import json_response
+from common.signing import resume_url
 
 # --- Configuration from Environment Variables ---
 JWT_SECRET_ARN = os.environ.get('JWT_SECRET_ARN')
 TOKEN_TABLE_NAME = os.environ.get('TOKEN_TABLE_NAME')
 CANDIDATE_TABLE_NAME = os.environ.get('CANDIDATE_TABLE_NAME')
+JOB_TABLE_NAME = os.environ.get('JOB_TABLE_NAME')
+
+# Only what the review page shows: no extracted text reference, duplicate flags or index attributes
+REVIEW_FIELDS = (
+    'resume_id', 'first_name', 'last_name', 'email', 'phone', 'gender', 'address', 'work_pref',
+    'experience', 'grad_marks', 'grad_year', 'marks12', 'pass12', 'linkedin', 'status', 'jobId',
+    'submitted_at', 'skills', 'entities', 'filename',
+)
+JOB_FIELDS = ('job_id', 'jobTitle', 'department', 'skills', 'requirements')
 
 # --- Initialize AWS Clients ---
-dynamodb = boto3.resource('dynamodb')
-secrets_manager_client = boto3.client('secretsmanager')
+secrets_manager_client = instrument_client(boto3.client('secretsmanager'))
 
-class DecimalEncoder(json.JSONEncoder):
-    """
-    Helper class to convert a DynamoDB item's Decimal types to JSON-compatible floats or ints.
-    """
-    def default(self, o):
-        if isinstance(o, Decimal):
-            if o % 1 > 0:
-                return float(o)
-            else:
-                return int(o)
-        return super(DecimalEncoder, self).default(o)
+def find_moved_job(job_id):
+    """The job behind an ID that has since changed department, or None."""
+    current_id = resolve_job_ids([job_id]).get(job_id)
+    if not current_id:
+        return None
+    return get_item(JOB_TABLE_NAME, {'job_id': current_id}, model=Job, **projection(JOB_FIELDS))
+
+def reviewer_view(candidate, job):
+    """The candidate's hot fields, the job context and the precomputed skill match."""
+    skills, matched_skills, match_percentage = skill_match(candidate.skills, job.skills if job else [])
+    view = {field: candidate.get(field) for field in REVIEW_FIELDS if field not in ('filename', 'entities', 'skills')}
+    view.update({
+        'skills': skills,
+        'entities': group_entities(candidate.entities),
+        'jobId': job.job_id if job else candidate.jobId,  # The current ID, if the job has moved
+        'department': job.department if job else None,
+        'job': {field: job.get(field) for field in JOB_FIELDS} if job else None,
+        'matched_skills': matched_skills,
+        'match_percentage': match_percentage,
+        'resume_url': resume_url(candidate.filename),
+    })
+    return view
 
 def get_jwt_secret():
     """
@@ -31,16 +56,19 @@ def get_jwt_secret():
     for the lifetime of the Lambda execution context to improve performance.
     """
     if 'jwt_secret' not in globals():
-        print("Fetching JWT secret from Secrets Manager...")
+        log("Fetching JWT secret from Secrets Manager")
         secret_value = secrets_manager_client.get_secret_value(SecretId=JWT_SECRET_ARN)
         globals()['jwt_secret'] = secret_value['SecretString']
     return globals()['jwt_secret']
 
+@instrument("ValidateReviewTokenFunction")
 def lambda_handler(event, context):
     """
-    This function validates a secure JWT and fetches the corresponding 
-    candidate's data from DynamoDB. It allows the token to be used multiple times
-    until it expires.
+    This function validates a secure JWT and returns the reviewer view of the
+    corresponding candidate: hot fields, the job's title, skills and requirements, the
+    matched skills and a freshly signed resume link. The token, candidate and job are
+    read in one batched request. It allows the token to be used multiple times until
+    it expires.
     """
     headers = {
         'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
@@ -65,41 +93,49 @@ def lambda_handler(event, context):
         try:
             payload = jwt.decode(token, jwt_secret, algorithms=['HS256'])
             resume_id = payload.get('resume_id')
+            job_id = payload.get('job_id')  # Absent from links sent before job context was added
         except jwt.ExpiredSignatureError:
             return {'statusCode': 401, 'headers': headers, 'body': json.dumps({'error': 'This review link has expired.'})}
         except jwt.InvalidTokenError:
             return {'statusCode': 401, 'headers': headers, 'body': json.dumps({'error': 'This review link is invalid or has been tampered with.'})}
 
-        # 3. Check if the token exists in our database. This acts as a revocation check.
-        token_table = dynamodb.Table(TOKEN_TABLE_NAME)
-        response = token_table.get_item(Key={'token': token})
-        
-        token_item = response.get('Item')
-        if not token_item:
+        # 3. One batched read: the token (revocation check), the candidate and the job
+        reads = {
+            'token': (TOKEN_TABLE_NAME, {'token': token}, ReviewToken, ('token',)),
+            'candidate': (CANDIDATE_TABLE_NAME, {'resume_id': resume_id}, Resume, REVIEW_FIELDS),
+        }
+        if job_id:
+            reads['job'] = (JOB_TABLE_NAME, {'job_id': job_id}, Job, JOB_FIELDS)
+        log("Fetching review data", level="DEBUG", resume_id=resume_id, job_id=job_id)
+        with timed_stage("ReviewFetch"):
+            found = get_items(reads)
+
+        if not found['token']:
             return {'statusCode': 404, 'headers': headers, 'body': json.dumps({'error': 'This review link is invalid or has been revoked.'})}
-            
+
         # --- The one-time-use logic has been removed from here ---
         # We no longer check for 'pending' status or update it to 'used'.
 
-        # 4. Fetch the full candidate data from the main candidate table
-        print(f"Fetching data for candidate with resume_id: {resume_id}")
-        candidate_table = dynamodb.Table(CANDIDATE_TABLE_NAME)
-        candidate_response = candidate_table.get_item(Key={'resume_id': resume_id})
-        
-        candidate_data = candidate_response.get('Item')
-        if not candidate_data:
+        candidate = found['candidate']
+        if not candidate:
              return {'statusCode': 404, 'headers': headers, 'body': json.dumps({'error': 'Could not find the specified candidate data.'})}
 
-        # 5. Return the candidate data successfully
-        print("Successfully fetched candidate data. Returning to client.")
-        return {
-            'statusCode': 200,
-            'headers': headers,
-            'body': json.dumps(candidate_data, cls=DecimalEncoder)
-        }
+        # 4. Older links carry no job_id, and a job may have moved since the link was sent
+        job = found.get('job')
+        if not job and (job_id or candidate.jobId):
+            with timed_stage("JobFallback"):
+                if job_id:
+                    job = find_moved_job(job_id)
+                else:
+                    job_id = str(candidate.jobId).strip()
+                    job = get_item(JOB_TABLE_NAME, {'job_id': job_id}, model=Job, **projection(JOB_FIELDS)) \
+                        or find_moved_job(job_id)
+
+        # 5. Return the reviewer view with a freshly signed resume link
+        return json_response(200, reviewer_view(candidate, job), event, headers=headers)
 
     except Exception as e:
-        print(f"An unhandled error occurred: {str(e)}")
+        log("An unhandled error occurred", level="ERROR", error=str(e))
         return {
             'statusCode': 500,
             'headers': headers,
@@ -0,0 +1,4 @@
+"""
+Code shared by the Lambda functions. Deployed as a Lambda layer (zip the folder
+under python/common/) and attached to every function.
+"""
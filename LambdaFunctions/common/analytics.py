@@ -0,0 +1,266 @@
+import os
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from common import dynamo
+from common.instrumentation import log, put_metric
+from common.stats import UNASSIGNED_JOB, UNKNOWN_STATUS
+
+# --- Configuration from Environment Variables ---
+# Partition key `month` (YYYY-MM), sort key `rollup_key` (day#job#status#gender#match)
+ANALYTICS_TABLE = os.environ.get("ANALYTICS_TABLE")
+JOB_TABLE = os.environ.get("JOB_TABLE")
+
+UNKNOWN = "Unknown"
+MATCH_BUCKETS = ((80, "80-100"), (60, "60-80"), (40, "40-60"), (20, "20-40"), (0, "0-20"))
+DIMENSIONS = ('job_id', 'department', 'status', 'gender', 'match_bucket')
+
+# `datetime` is the form's en-IN string, formatted in Asia/Kolkata; `submitted_at` is UTC ISO-8601
+SUBMISSION_TZ = timezone(timedelta(hours=5, minutes=30))
+SUBMISSION_FORMATS = ('%d/%m/%Y, %I:%M %p', '%d/%m/%Y, %I:%M:%S %p', '%d/%m/%Y, %H:%M:%S', '%d/%m/%Y, %H:%M')
+SUBMITTED_AT_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def submission_day(datetime_str):
+    """The ISO day of a resume's `datetime` ("dd/mm/yyyy, hh:mm am"), or None if unparseable."""
+    if not datetime_str:
+        return None
+    try:
+        return datetime.strptime(str(datetime_str).split(',')[0].strip(), '%d/%m/%Y').date().isoformat()
+    except ValueError:
+        return None
+
+
+def submitted_at_now():
+    return datetime.now(timezone.utc).strftime(SUBMITTED_AT_FORMAT)
+
+
+def submitted_at(datetime_str):
+    """The sortable UTC `submitted_at` for a resume's `datetime` string, or None if unparseable."""
+    if not datetime_str:
+        return None
+    text = ' '.join(str(datetime_str).replace('\u202f', ' ').split())
+    for fmt in SUBMISSION_FORMATS:
+        try:
+            local = datetime.strptime(text, fmt).replace(tzinfo=SUBMISSION_TZ)
+        except ValueError:
+            continue
+        return local.astimezone(timezone.utc).strftime(SUBMITTED_AT_FORMAT)
+    return None
+
+
+def match_bucket(resume_skills, job_skills):
+    """Same skill-overlap percentage getResumeEntities reports, bucketed in steps of 20."""
+    job_set = {s.lower() for s in job_skills or [] if isinstance(s, str)}
+    if not job_set:
+        return "0-20"
+    resume_set = {s.lower() for s in resume_skills or [] if isinstance(s, str)}
+    percentage = len(resume_set & job_set) / len(job_set) * 100
+    return next(label for floor, label in MATCH_BUCKETS if percentage >= floor)
+
+
+def frozen_dimensions(skills, job):
+    """
+    The department and match bucket an application is counted under, written on the
+    resume item when it is processed so later job edits do not move it between cells.
+    """
+    job = job or {}
+    return {'department': job.get('department') or UNKNOWN, 'match_bucket': match_bucket(skills, job.get('skills'))}
+
+
+def is_frozen(item):
+    return bool(item.get('department') and item.get('match_bucket'))
+
+
+def rollup_key(item, jobs):
+    """
+    The rollup cell an application counts towards: a tuple of (day, job_id, department,
+    status, gender, match_bucket), or None when the item has no usable submission day.
+    The department and match bucket come from the item itself; only items written before
+    they were frozen fall back to the job's current values.
+    """
+    if not item:
+        return None
+    day = submission_day(item.get('datetime'))
+    if not day:
+        return None
+    job_id = str(item.get('jobId') or '').strip() or UNASSIGNED_JOB
+    frozen = item if is_frozen(item) else frozen_dimensions(item.get('skills'), jobs.get(job_id))
+    return (
+        day,
+        job_id,
+        frozen['department'],
+        item.get('status') or UNKNOWN_STATUS,
+        item.get('gender') or UNKNOWN,
+        frozen['match_bucket'],
+    )
+
+
+def load_jobs(job_ids):
+    """department and skills for every job referenced by a batch, in one batch_get."""
+    job_ids = [job_id for job_id in set(job_ids) if job_id and job_id != UNASSIGNED_JOB]
+    if not job_ids:
+        return {}
+    jobs = dynamo.batch_get(JOB_TABLE, [{'job_id': job_id} for job_id in job_ids],
+                            **dynamo.projection(('job_id', 'department', 'skills')))
+    return {job['job_id']: job for job in jobs}
+
+
+def referenced_jobs(images):
+    """load_jobs for every jobId in a batch of (old, new) stream images."""
+    return load_jobs(str(image.get('jobId') or '').strip() for pair in images for image in pair if image)
+
+
+def unfrozen_jobs(images):
+    """load_jobs for the images rollup_key cannot key on their own (written before the freeze)."""
+    return load_jobs(str(image.get('jobId') or '').strip() for pair in images for image in pair
+                     if image and not is_frozen(image))
+
+
+def rollup_deltas(images, jobs):
+    """Net rollup changes for the (old, new) images of a stream batch (see status_deltas)."""
+    deltas = Counter()
+    skipped = 0
+    for old, new in images:
+        old_key, new_key = rollup_key(old, jobs), rollup_key(new, jobs)
+        if new and not new_key:
+            skipped += 1
+        if old_key == new_key:
+            continue
+        if old_key:
+            deltas[old_key] -= 1
+        if new_key:
+            deltas[new_key] += 1
+    if skipped:
+        put_metric("RollupSkipped", skipped)
+    return deltas
+
+
+def _item_key(cell):
+    day = cell[0]
+    return {'month': day[:7], 'rollup_key': '#'.join((day, cell[1], cell[3], cell[4], cell[5]))}
+
+
+def apply_rollup_deltas(deltas):
+    """One atomic ADD per rollup cell; the dimension attributes are written alongside."""
+    analytics_table = dynamo.table(ANALYTICS_TABLE)
+    applied = 0
+    for cell, delta in deltas.items():
+        if not delta:
+            continue
+        day, job_id, department, status, gender, bucket = cell
+        analytics_table.update_item(
+            Key=_item_key(cell),
+            UpdateExpression=('SET #day = :day, job_id = :job, department = :dept, #status = :status, '
+                              'gender = :gender, match_bucket = :bucket ADD applications :d'),
+            ExpressionAttributeNames={'#day': 'day', '#status': 'status'},
+            ExpressionAttributeValues={
+                ':day': day, ':job': job_id, ':dept': department, ':status': status,
+                ':gender': gender, ':bucket': bucket, ':d': delta
+            }
+        )
+        applied += 1
+    put_metric("RollupsUpdated", applied)
+    return applied
+
+
+def rebuild_rollups(resume_table):
+    """
+    Recomputes every rollup cell from the resume table and overwrites the analytics table.
+    Resumes processed before the dimensions were frozen get them written now, from their
+    job's current values, so later changes to the job no longer move them.
+    """
+    resumes = list(dynamo.iter_scan(resume_table, **dynamo.projection(
+        ('resume_id', 'jobId', 'status', 'gender', 'skills', 'datetime', 'department', 'match_bucket'))))
+    unfrozen = [item for item in resumes if not is_frozen(item)]
+    jobs = load_jobs(str(item.get('jobId') or '').strip() for item in unfrozen)
+    for item in unfrozen:
+        frozen = frozen_dimensions(item.get('skills'), jobs.get(str(item.get('jobId') or '').strip()))
+        try:
+            dynamo.table(resume_table).update_item(
+                Key={'resume_id': item['resume_id']},
+                UpdateExpression='SET department = if_not_exists(department, :dept), '
+                                 'match_bucket = if_not_exists(match_bucket, :bucket)',
+                ConditionExpression='attribute_exists(resume_id)',
+                ExpressionAttributeValues={':dept': frozen['department'], ':bucket': frozen['match_bucket']}
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            continue
+        item.update(frozen)
+    counts = Counter(key for key in (rollup_key(item, jobs) for item in resumes) if key)
+
+    fresh = {tuple(_item_key(cell).values()): cell for cell in counts}
+    stale_keys = [
+        {'month': item['month'], 'rollup_key': item['rollup_key']}
+        for item in dynamo.iter_scan(ANALYTICS_TABLE, **dynamo.projection(('month', 'rollup_key')))
+        if (item['month'], item['rollup_key']) not in fresh
+    ]
+    put_items = [
+        {**_item_key(cell), **dict(zip(('day',) + DIMENSIONS, cell)), 'applications': counts[cell]}
+        for cell in counts
+    ]
+    dynamo.batch_write(ANALYTICS_TABLE, put_items=put_items, delete_keys=stale_keys)
+    log("Rebuilt analytics rollups", cells=len(put_items), removed=len(stale_keys))
+    return len(put_items)
+
+
+def months_between(start, end):
+    """Every YYYY-MM from the month of start to the month of end, inclusive."""
+    month = date(start.year, start.month, 1)
+    while month <= end:
+        yield month.strftime('%Y-%m')
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def query_rollups(start, end, filters=None):
+    """
+    Aggregates the rollup cells between two dates (inclusive): one query per month touched,
+    so the cost grows with the date range, not with the number of applications. Negative
+    cells mean the counters drifted; they still count (so totals net out) and are reported
+    as `negative_cells` until a rebuild.
+    """
+    filters = {k: v for k, v in (filters or {}).items() if v}
+    totals = negative = 0
+    daily = Counter()
+    breakdowns = {dimension: Counter() for dimension in DIMENSIONS}
+
+    for month in months_between(start, end):
+        cells = dynamo.iter_query(
+            ANALYTICS_TABLE,
+            KeyConditionExpression=Key('month').eq(month) & Key('rollup_key').between(
+                start.isoformat(), end.isoformat() + '#~')
+        )
+        for cell in cells:
+            count = cell.get('applications', 0)
+            if not count or any(cell.get(k) != v for k, v in filters.items()):
+                continue
+            if count < 0:
+                negative += 1
+            totals += count
+            daily[cell['day']] += count
+            for dimension in DIMENSIONS:
+                breakdowns[dimension][cell.get(dimension) or UNKNOWN] += count
+
+    if negative:
+        log("Negative rollup cells; rebuild the rollups", level="WARNING", cells=negative)
+        put_metric("RollupNegativeCells", negative)
+    return {
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'applications': totals,
+        'daily': [{'day': day, 'applications': daily[day]} for day in sorted(daily)],
+        'by_status': dict(breakdowns['status']),
+        'by_department': dict(breakdowns['department']),
+        'by_gender': dict(breakdowns['gender']),
+        'by_job': dict(breakdowns['job_id']),
+        'match_distribution': dict(breakdowns['match_bucket']),
+        'negative_cells': negative,
+    }
+
+
+def default_range(days):
+    end = date.today()
+    return end - timedelta(days=days - 1), end
@@ -0,0 +1,218 @@
+import gzip
+import io
+import json
+import os
+from collections import defaultdict
+from datetime import date, datetime
+import boto3
+from common import dynamo
+from common.analytics import months_between, submission_day
+from common.instrumentation import instrument_client, log, put_metric
+
+# Optional: Parquet when pyarrow is bundled in the layer, gzip-compressed columnar JSON otherwise
+try:
+    import pyarrow
+    import pyarrow.parquet as parquet
+except ImportError:
+    pyarrow = None
+
+# --- Configuration from Environment Variables ---
+ARCHIVE_BUCKET = os.environ.get("ARCHIVE_BUCKET")
+ARCHIVE_PREFIX = os.environ.get("ARCHIVE_PREFIX", "archive/applications/")
+# Partition key `resume_id`: where each archived application now lives
+ARCHIVE_INDEX_TABLE = os.environ.get("ARCHIVE_INDEX_TABLE")
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", "365"))
+
+PARTITION_KEY = "submitted_date"
+STUB_FIELDS = ('resume_id', 'email', 'jobId', 'status')
+COLUMNAR_JSON_FORMAT = "columnar-json/1"
+
+s3 = instrument_client(boto3.client('s3'))
+
+
+def is_archive_move(old, new):
+    """
+    True for the re-insert of a restored item, and for the removal of an item marked
+    archived_at (as runs before the stub check did). Removals by the current archive
+    are recognised from their stubs by without_archive_moves.
+    """
+    if new is None:
+        return bool(old and old.get('archived_at'))
+    return old is None and bool(new.get('restored_at'))
+
+
+def without_archive_moves(images):
+    """
+    The (old, new) stream images minus the ones the archive itself produces. Counters,
+    rollups and profiles keep counting archived applications, so an archived item's
+    removal (its stub is written before the delete) and a restore are not changes.
+    One batched stub read per batch that removes items.
+    """
+    images = [(old, new) for old, new in images if not is_archive_move(old, new)]
+    removed = {old['resume_id'] for old, new in images if new is None and old and old.get('resume_id')}
+    if not removed or not ARCHIVE_INDEX_TABLE:
+        return images
+    stubs = dynamo.batch_get(ARCHIVE_INDEX_TABLE, [{'resume_id': resume_id} for resume_id in removed],
+                             **dynamo.projection(('resume_id',)))
+    archived = {stub['resume_id'] for stub in stubs}
+    return [(old, new) for old, new in images if new is not None or (old or {}).get('resume_id') not in archived]
+
+
+def partition_prefix(day):
+    return f"{ARCHIVE_PREFIX}{PARTITION_KEY}={day}/"
+
+
+# --- File encoding ---
+def encode_rows(rows):
+    """
+    Encodes rows as one compressed columnar file and returns (body, extension). Columns
+    that do not share one type (free-form form fields) are stored as JSON strings and
+    listed in the file metadata, so every column round-trips unchanged.
+    """
+    columns = sorted({name for row in rows for name in row})
+    if pyarrow:
+        arrays, json_columns = {}, []
+        for name in columns:
+            values = [row.get(name) for row in rows]
+            try:
+                arrays[name] = pyarrow.array(values)
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, TypeError):
+                arrays[name] = pyarrow.array([None if v is None else json.dumps(v) for v in values], pyarrow.string())
+                json_columns.append(name)
+        table = pyarrow.table(arrays).replace_schema_metadata({'json_columns': json.dumps(json_columns)})
+        buffer = io.BytesIO()
+        parquet.write_table(table, buffer, compression='zstd')
+        return buffer.getvalue(), '.parquet'
+
+    payload = {'format': COLUMNAR_JSON_FORMAT, 'rows': len(rows),
+               'columns': {name: [row.get(name) for row in rows] for name in columns}}
+    return gzip.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8')), '.json.gz'
+
+
+def decode_rows(body, key):
+    """The rows of one archive file, with missing (null) attributes dropped."""
+    if key.endswith('.parquet'):
+        if not pyarrow:
+            raise RuntimeError("pyarrow is required to read Parquet archive files")
+        table = parquet.read_table(io.BytesIO(body))
+        json_columns = set(json.loads((table.schema.metadata or {}).get(b'json_columns', b'[]')))
+        rows = table.to_pylist()
+        for row in rows:
+            for name in json_columns:
+                if row.get(name) is not None:
+                    row[name] = json.loads(row[name])
+    else:
+        columns = json.loads(gzip.decompress(body))['columns']
+        names = list(columns)
+        rows = [dict(zip(names, values)) for values in zip(*columns.values())]
+    return [{k: v for k, v in row.items() if v is not None} for row in rows]
+
+
+def read_file(key):
+    return decode_rows(s3.get_object(Bucket=ARCHIVE_BUCKET, Key=key)['Body'].read(), key)
+
+
+# --- Archiving ---
+def archive_cutoff(days=None):
+    """Applications submitted before this ISO day are archived."""
+    return date.fromordinal(date.today().toordinal() - (days or ARCHIVE_AFTER_DAYS)).isoformat()
+
+
+def archive_age_day(item):
+    """
+    The ISO day an application's age counts from: its restore, for one brought back
+    from the archive (so it gets a fresh retention window), its submission otherwise.
+    """
+    if item.get('restored_at'):
+        return str(item['restored_at'])[:10]
+    return submission_day(item.get('datetime'))
+
+
+def archive_items(items, resume_table, run_id):
+    """
+    Moves a page of stale applications out of the hot table: one compressed file per
+    submission day, a small stub per application in ARCHIVE_INDEX_TABLE, then the item
+    is deleted. The file is written first, so a failure part way leaves the item in the
+    hot table to be archived again by the next run. The stub, written before the delete,
+    is what tells the stream consumers this delete apart from a real one.
+    """
+    by_day = defaultdict(list)
+    for item in items:
+        by_day[submission_day(item.get('datetime'))].append(item)
+
+    archived_at = datetime.utcnow().isoformat()
+    stubs = []
+    for day, rows in by_day.items():
+        body, extension = encode_rows(rows)
+        key = f"{partition_prefix(day)}part-{run_id}{extension}"
+        s3.put_object(Bucket=ARCHIVE_BUCKET, Key=key, Body=body)
+        put_metric("ArchiveBytesWritten", len(body))
+        stubs.extend(
+            {**{f: row[f] for f in STUB_FIELDS if row.get(f) is not None},
+             'submitted_date': day, 'archive_key': key, 'archived_at': archived_at}
+            for row in rows
+        )
+
+    dynamo.batch_write(ARCHIVE_INDEX_TABLE, put_items=stubs)
+    dynamo.batch_write(resume_table, delete_keys=[{'resume_id': item['resume_id']} for item in items])
+    put_metric("ApplicationsArchived", len(items))
+    return len(items)
+
+
+# --- Query and restore ---
+def list_files(start, end):
+    """Archive files for the submission days in [start, end]: one LIST per month touched."""
+    keys = []
+    paginator = s3.get_paginator('list_objects_v2')
+    for month in months_between(start, end):
+        for page in paginator.paginate(Bucket=ARCHIVE_BUCKET, Prefix=f"{ARCHIVE_PREFIX}{PARTITION_KEY}={month}"):
+            for obj in page.get('Contents', []):
+                day = obj['Key'][len(ARCHIVE_PREFIX) + len(PARTITION_KEY) + 1:].split('/', 1)[0]
+                if start.isoformat() <= day <= end.isoformat():
+                    keys.append(obj['Key'])
+    return keys
+
+
+def query_archive(start, end, filters=None, limit=1000):
+    """
+    Archived applications submitted between two dates, optionally filtered on any
+    attribute (email, jobId, status...). Only the date partitions in range are read.
+    Rows archived twice by an interrupted run are returned once.
+    """
+    filters = {k: v for k, v in (filters or {}).items() if v}
+    rows = {}
+    for key in list_files(start, end):
+        for row in read_file(key):
+            if all(str(row.get(k, '')).lower() == str(v).lower() for k, v in filters.items()):
+                rows[row['resume_id']] = row
+        if len(rows) >= limit:
+            break
+    return list(rows.values())[:limit]
+
+
+def restore(resume_ids, resume_table):
+    """
+    Puts archived applications back into the hot table (marked restored_at) and drops
+    their stubs. Each archive file is read once however many of its rows are restored.
+    Returns the restored resume_ids.
+    """
+    stubs = dynamo.batch_get(ARCHIVE_INDEX_TABLE, [{'resume_id': resume_id} for resume_id in set(resume_ids)])
+    wanted = defaultdict(set)
+    for stub in stubs:
+        wanted[stub['archive_key']].add(stub['resume_id'])
+
+    restored_at = datetime.utcnow().isoformat()
+    items = []
+    for key, ids in wanted.items():
+        for row in read_file(key):
+            if row['resume_id'] in ids:
+                row.pop('archived_at', None)
+                items.append({**row, 'restored_at': restored_at})
+                ids.discard(row['resume_id'])
+        if ids:
+            log("Archived rows missing from file", level="WARNING", archive_key=key, missing=len(ids))
+
+    dynamo.batch_write(resume_table, put_items=items)
+    dynamo.batch_write(ARCHIVE_INDEX_TABLE, delete_keys=[{'resume_id': item['resume_id']} for item in items])
+    put_metric("ApplicationsRestored", len(items))
+    return [item['resume_id'] for item in items]
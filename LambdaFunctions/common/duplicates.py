@@ -0,0 +1,160 @@
+import hashlib
+import os
+import random
+import re
+import zlib
+from array import array
+from collections import Counter
+from botocore.exceptions import ClientError
+from common import dynamo
+from common.instrumentation import log, put_metric
+
+# Optional: vectorized signatures when numpy is bundled in the layer (same values either way)
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# --- Configuration from Environment Variables ---
+# Partition key `bucket`: "band#<n>#<hash>" items hold a `resume_ids` string set, and
+# "sig#<resume_id>" items hold that resume's MinHash `signature`
+DUPLICATE_INDEX_TABLE = os.environ.get("DUPLICATE_INDEX_TABLE")
+DUPLICATE_THRESHOLD = float(os.environ.get("DUPLICATE_THRESHOLD", "0.8"))  # Estimated Jaccard similarity
+MAX_BUCKET_SIZE = int(os.environ.get("DUPLICATE_MAX_BUCKET_SIZE", "500"))
+MAX_CANDIDATES = 200
+
+# 16 bands of 8 rows: pairs at 0.8 similarity share a band ~95% of the time, pairs at 0.5 ~6%
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 5
+MINHASH_SEED = 1
+
+MERSENNE = (1 << 61) - 1
+MASK64 = (1 << 64) - 1
+MASK32 = (1 << 32) - 1
+_rng = random.Random(MINHASH_SEED)
+_A = [_rng.randrange(1, MERSENNE) for _ in range(NUM_PERM)]
+_B = [_rng.randrange(0, MERSENNE) for _ in range(NUM_PERM)]
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def shingles(text):
+    """crc32 hashes of the overlapping five-word windows of the normalized text."""
+    words = _WORD.findall(str(text or '').lower())
+    if len(words) < SHINGLE_WORDS:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))} if words else set()
+    return {zlib.crc32(' '.join(words[i:i + SHINGLE_WORDS]).encode('utf-8'))
+            for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def signature(text):
+    """
+    The MinHash signature (NUM_PERM 32-bit values) of a resume's text, or None for empty
+    text. Each permutation is (a*x + b) wrapped to 64 bits, mod 2^61-1, so the pure-Python
+    and numpy paths produce identical values.
+    """
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    if numpy is not None:
+        x = numpy.fromiter(hashes, dtype=numpy.uint64, count=len(hashes))
+        a = numpy.array(_A, dtype=numpy.uint64)[:, None]
+        b = numpy.array(_B, dtype=numpy.uint64)[:, None]
+        with numpy.errstate(over='ignore'):
+            values = ((a * x + b) % numpy.uint64(MERSENNE)) & numpy.uint64(MASK32)
+        return [int(v) for v in values.min(axis=1)]
+    return [min((((a * x + b) & MASK64) % MERSENNE) & MASK32 for x in hashes) for a, b in zip(_A, _B)]
+
+
+def band_keys(sig):
+    """One LSH bucket key per band: a short digest of that band's rows."""
+    return [
+        f"band#{band}#" + hashlib.blake2b(array('I', sig[band * ROWS:(band + 1) * ROWS]).tobytes(),
+                                          digest_size=8).hexdigest()
+        for band in range(BANDS)
+    ]
+
+
+def similarity(sig, other):
+    return sum(1 for x, y in zip(sig, other) if x == y) / NUM_PERM
+
+
+def _signature_item(resume_id, sig, email):
+    item = {'bucket': f"sig#{resume_id}", 'resume_id': resume_id, 'signature': array('I', sig).tobytes()}
+    if email:
+        item['email'] = email
+    return item
+
+
+def _decode_signature(blob):
+    values = array('I')
+    values.frombytes(bytes(blob))
+    return list(values)
+
+
+def find_near_duplicates(resume_id, sig):
+    """
+    Already-indexed resumes whose estimated similarity to `sig` reaches DUPLICATE_THRESHOLD,
+    best first, as [{'resume_id', 'email', 'similarity' (percent)}], plus the band keys that
+    already list `resume_id` (for index_signature). Costs one batch read of the BANDS
+    buckets plus one of the candidates' signatures, whatever the pool size. Only the
+    MAX_CANDIDATES sharing the most bands with `sig` are verified, since the band count
+    tracks similarity.
+    """
+    buckets = dynamo.batch_get(DUPLICATE_INDEX_TABLE, [{'bucket': key} for key in band_keys(sig)])
+    present = {bucket['bucket'] for bucket in buckets if resume_id in bucket.get('resume_ids', ())}
+    shared = Counter(rid for bucket in buckets for rid in bucket.get('resume_ids', ()))
+    shared.pop(resume_id, None)
+    put_metric("DuplicateCandidates", len(shared))
+    if not shared:
+        return [], present
+
+    ranked = sorted(shared, key=lambda rid: (-shared[rid], rid))[:MAX_CANDIDATES]
+    stored = dynamo.batch_get(DUPLICATE_INDEX_TABLE, [{'bucket': f"sig#{rid}"} for rid in ranked])
+    matches = []
+    for item in stored:
+        score = similarity(sig, _decode_signature(item['signature']))
+        if score >= DUPLICATE_THRESHOLD:
+            match = {'resume_id': item['resume_id'], 'similarity': round(score * 100)}
+            if item.get('email'):
+                match['email'] = item['email']
+            matches.append(match)
+    matches.sort(key=lambda m: m['similarity'], reverse=True)
+    return matches, present
+
+
+def index_signature(resume_id, sig, email=None, present=()):
+    """
+    Stores the signature and adds the resume to its BANDS buckets, skipping the `present`
+    ones that already list it, so reprocessing an unchanged resume writes nothing. A bucket
+    already at MAX_BUCKET_SIZE (a template shared by hundreds of resumes) is left as it is;
+    the resume stays findable through its other bands.
+    """
+    keys = [key for key in band_keys(sig) if key not in present]
+    if not keys:
+        return
+    dynamo.table(DUPLICATE_INDEX_TABLE).put_item(Item=_signature_item(resume_id, sig, email))
+    full = 0
+    for key in keys:
+        try:
+            dynamo.table(DUPLICATE_INDEX_TABLE).update_item(
+                Key={'bucket': key},
+                UpdateExpression='ADD resume_ids :id',
+                ConditionExpression='attribute_not_exists(resume_ids) OR size(resume_ids) < :max',
+                ExpressionAttributeValues={':id': {resume_id}, ':max': MAX_BUCKET_SIZE}
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            full += 1
+    if full:
+        log("Duplicate buckets full", level="DEBUG", resume_id=resume_id, full=full)
+        put_metric("DuplicateBucketsFull", full)
+
+
+def indexed_ids(resume_ids):
+    """The resume_ids that already have a stored signature."""
+    items = dynamo.batch_get(DUPLICATE_INDEX_TABLE, [{'bucket': f"sig#{rid}"} for rid in set(resume_ids)],
+                             **dynamo.projection(('resume_id',)))
+    return {item['resume_id'] for item in items}
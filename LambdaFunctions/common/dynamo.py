@@ -0,0 +1,302 @@
+import boto3
+import os
+import random
+import time
+from decimal import Decimal
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from common.instrumentation import instrument_client, put_metric
+
+# --- Configuration from Environment Variables ---
+BATCH_MAX_RETRIES = int(os.environ.get("DDB_BATCH_MAX_RETRIES", "8"))
+BACKOFF_BASE_SECONDS = 0.05
+BACKOFF_CAP_SECONDS = 2.0
+BATCH_GET_LIMIT = 100
+BATCH_WRITE_LIMIT = 25
+
+# --- One instrumented resource and one raw client per container ---
+# The resource's own meta.client (de)serializes automatically, so the fast path needs a separate plain client
+resource = instrument_client(boto3.resource('dynamodb'))
+client = instrument_client(boto3.client('dynamodb'))
+_tables = {}
+
+
+class UnprocessedItemsError(Exception):
+    """Raised when a batch call still has unprocessed items after every retry."""
+    def __init__(self, message, unprocessed):
+        super().__init__(message)
+        self.unprocessed = unprocessed
+
+
+def table(name):
+    """Cached boto3 Table for single-item writes (put/update/delete with conditions)."""
+    if name not in _tables:
+        _tables[name] = resource.Table(name)
+    return _tables[name]
+
+
+# --- Fast AttributeValue (de)serialization ---
+def _number(text):
+    if '.' in text or 'e' in text or 'E' in text:
+        return float(text)
+    return int(text)
+
+
+def deserialize(av):
+    """
+    Converts one AttributeValue to Python. Numbers come back as int/float rather than
+    Decimal, so results can be JSON-encoded directly.
+    """
+    (tag, value), = av.items()
+    if tag == 'S':
+        return value
+    if tag == 'N':
+        return _number(value)
+    if tag == 'M':
+        return {k: deserialize(v) for k, v in value.items()}
+    if tag == 'L':
+        return [deserialize(v) for v in value]
+    if tag == 'BOOL':
+        return value
+    if tag == 'NULL':
+        return None
+    if tag == 'SS' or tag == 'BS':
+        return set(value)
+    if tag == 'NS':
+        return {_number(v) for v in value}
+    return value  # 'B'
+
+
+def deserialize_item(item):
+    return {k: deserialize(v) for k, v in item.items()}
+
+
+def stream_images(records):
+    """(old, new) decoded item pairs for DynamoDB stream records; a missing image is None."""
+    images = []
+    for record in records:
+        data = record.get('dynamodb', {})
+        old = deserialize_item(data['OldImage']) if 'OldImage' in data else None
+        new = deserialize_item(data['NewImage']) if 'NewImage' in data else None
+        images.append((old, new))
+    return images
+
+
+def serialize(value):
+    """Converts a Python value (including Decimal, float and sets) to an AttributeValue."""
+    if value is None:
+        return {'NULL': True}
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if isinstance(value, str):
+        return {'S': value}
+    if isinstance(value, (int, Decimal)):
+        return {'N': str(value)}
+    if isinstance(value, float):
+        return {'N': repr(value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {'B': bytes(value)}
+    if isinstance(value, dict):
+        return {'M': {k: serialize(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {'L': [serialize(v) for v in value]}
+    if isinstance(value, (set, frozenset)):
+        sample = next(iter(value), '')
+        if isinstance(sample, str):
+            return {'SS': list(value)}
+        if isinstance(sample, (bytes, bytearray)):
+            return {'BS': [bytes(v) for v in value]}
+        return {'NS': [str(v) for v in value]}
+    raise TypeError(f"Unsupported DynamoDB type: {type(value).__name__}")
+
+
+def serialize_item(item):
+    return {k: serialize(v) for k, v in item.items()}
+
+
+def projection(fields):
+    """ProjectionExpression kwargs for the given attributes, with every name aliased to dodge reserved words."""
+    names = {f"#p{i}": field for i, field in enumerate(fields)}
+    return {'ProjectionExpression': ', '.join(names), 'ExpressionAttributeNames': names}
+
+
+def _build_request(kwargs):
+    """
+    Turns resource-style arguments (boto3 Key/Attr conditions, plain Python values)
+    into low-level client arguments.
+    """
+    request = dict(kwargs)
+    names = dict(request.pop('ExpressionAttributeNames', None) or {})
+    values = dict(request.pop('ExpressionAttributeValues', None) or {})
+    builder = ConditionExpressionBuilder()
+
+    for arg, is_key in (('KeyConditionExpression', True), ('FilterExpression', False)):
+        condition = request.get(arg)
+        if isinstance(condition, ConditionBase):
+            built = builder.build_expression(condition, is_key_condition=is_key)
+            request[arg] = built.condition_expression
+            names.update(built.attribute_name_placeholders)
+            values.update(built.attribute_value_placeholders)
+
+    if names:
+        request['ExpressionAttributeNames'] = names
+    if values:
+        request['ExpressionAttributeValues'] = {k: serialize(v) for k, v in values.items()}
+    request.setdefault('ReturnConsumedCapacity', 'TOTAL')
+    return request
+
+
+def _decode(items, model):
+    if model:
+        return [model.from_attribute_values(item) for item in items]
+    return [deserialize_item(item) for item in items]
+
+
+def read_page(operation, table_name, model=None, **kwargs):
+    """
+    One scan or query page: (decoded items, LastEvaluatedKey). The key stays in raw
+    AttributeValue form, so it is JSON-safe to hand to a re-invocation as ExclusiveStartKey.
+    """
+    request = _build_request(kwargs)
+    request['TableName'] = table_name
+    call = client.scan if operation == 'scan' else client.query
+    response = call(**request)
+    put_metric("ItemsScanned", response.get('ScannedCount', 0))
+    return _decode(response.get('Items', []), model), response.get('LastEvaluatedKey')
+
+
+def iter_pages(operation, table_name, model=None, **kwargs):
+    """Yields one decoded page at a time from a scan or query, following LastEvaluatedKey."""
+    while True:
+        items, last_key = read_page(operation, table_name, model, **kwargs)
+        yield items
+        if not last_key:
+            return
+        kwargs['ExclusiveStartKey'] = last_key
+
+
+def iter_scan(table_name, model=None, **kwargs):
+    """Paginated scan. Accepts resource-style arguments; yields models (or plain dicts)."""
+    for page in iter_pages('scan', table_name, model, **kwargs):
+        yield from page
+
+
+def iter_query(table_name, model=None, **kwargs):
+    """Paginated query. Accepts resource-style arguments; yields models (or plain dicts)."""
+    for page in iter_pages('query', table_name, model, **kwargs):
+        yield from page
+
+
+def get_item(table_name, key, model=None, ProjectionExpression=None, ExpressionAttributeNames=None):
+    """Single-item read through the fast decoder. Returns None when the item is missing."""
+    request = {'TableName': table_name, 'Key': serialize_item(key), 'ReturnConsumedCapacity': 'TOTAL'}
+    if ProjectionExpression:
+        request['ProjectionExpression'] = ProjectionExpression
+    if ExpressionAttributeNames:
+        request['ExpressionAttributeNames'] = ExpressionAttributeNames
+    item = client.get_item(**request).get('Item')
+    if item is None:
+        return None
+    return model.from_attribute_values(item) if model else deserialize_item(item)
+
+
+def _backoff(attempt):
+    time.sleep(random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))))
+
+
+def _chunks(values, size):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _run_batch_get(request):
+    """Yields (table name, raw items) for a BatchGetItem request, retrying UnprocessedKeys."""
+    attempt = 0
+    while request:
+        response = client.batch_get_item(RequestItems=request, ReturnConsumedCapacity='TOTAL')
+        yield from response.get('Responses', {}).items()
+        request = response.get('UnprocessedKeys') or None
+        if request:
+            if attempt >= BATCH_MAX_RETRIES:
+                raise UnprocessedItemsError(f"batch_get on {', '.join(request)} left keys unprocessed", request)
+            put_metric("BatchRetries")
+            _backoff(attempt)
+            attempt += 1
+
+
+def batch_get(table_name, keys, model=None, ProjectionExpression=None, ExpressionAttributeNames=None):
+    """
+    Reads many items by key in chunks of 100, retrying UnprocessedKeys with jittered
+    exponential backoff. Duplicate keys are fetched once. Order is not preserved.
+    """
+    unique_keys = list({tuple(sorted(k.items())): k for k in keys}.values())
+    results = []
+    for chunk in _chunks(unique_keys, BATCH_GET_LIMIT):
+        table_request = {'Keys': [serialize_item(k) for k in chunk]}
+        if ProjectionExpression:
+            table_request['ProjectionExpression'] = ProjectionExpression
+        if ExpressionAttributeNames:
+            table_request['ExpressionAttributeNames'] = ExpressionAttributeNames
+        for _, items in _run_batch_get({table_name: table_request}):
+            results.extend(_decode(items, model))
+    return results
+
+
+def get_items(reads):
+    """
+    Single-item reads from several tables in one BatchGetItem round trip. `reads` maps
+    a label to (table name, key, model or None, projected fields or None), one key per
+    table. Returns {label: item, or None when it is missing}.
+    """
+    request, labels = {}, {}
+    for label, (table_name, key, model, fields) in reads.items():
+        if table_name in request:
+            raise ValueError(f"get_items reads one key per table; {table_name} given twice")
+        request[table_name] = {'Keys': [serialize_item(key)], **(projection(fields) if fields else {})}
+        labels[table_name] = (label, model)
+
+    results = dict.fromkeys(reads)
+    for table_name, items in _run_batch_get(request):
+        label, model = labels[table_name]
+        for item in _decode(items, model):
+            results[label] = item
+    return results
+
+
+def transact_write(operations):
+    """
+    TransactWriteItems with resource-style arguments: Item, Key and ExpressionAttributeValues
+    are plain Python values. Each operation is {'Put' | 'Update' | 'Delete' | 'ConditionCheck': {...}}.
+    """
+    transact_items = []
+    for operation in operations:
+        (kind, params), = operation.items()
+        params = dict(params)
+        for arg in ('Item', 'Key', 'ExpressionAttributeValues'):
+            if arg in params:
+                params[arg] = serialize_item(params[arg])
+        transact_items.append({kind: params})
+    return client.transact_write_items(TransactItems=transact_items, ReturnConsumedCapacity='TOTAL')
+
+
+def batch_write(table_name, put_items=(), delete_keys=()):
+    """
+    Writes and deletes in chunks of 25, retrying UnprocessedItems with jittered
+    exponential backoff. Accepts plain dicts or models for put_items.
+    """
+    operations = [{'PutRequest': {'Item': serialize_item(item.to_item() if hasattr(item, 'to_item') else item)}}
+                  for item in put_items]
+    operations += [{'DeleteRequest': {'Key': serialize_item(key)}} for key in delete_keys]
+
+    for chunk in _chunks(operations, BATCH_WRITE_LIMIT):
+        request = {table_name: chunk}
+        attempt = 0
+        while request:
+            response = client.batch_write_item(RequestItems=request, ReturnConsumedCapacity='TOTAL')
+            request = response.get('UnprocessedItems') or None
+            if request:
+                if attempt >= BATCH_MAX_RETRIES:
+                    raise UnprocessedItemsError(f"batch_write on {table_name} left items unprocessed", request)
+                put_metric("BatchRetries")
+                _backoff(attempt)
+                attempt += 1
+    return len(operations)
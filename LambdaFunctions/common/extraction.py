@@ -0,0 +1,201 @@
+import io
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import zipfile
+from xml.etree import ElementTree
+from pypdf import PdfReader
+from common.instrumentation import log, put_metric
+from common.lexicon import detect_language, find_dates, find_terms
+
+# --- PDF limits ---
+PREFLIGHT_SNIFF_BYTES = 1024  # %PDF- header must appear within the first 1 KB
+PDF_MAX_BYTES = int(os.environ.get("PDF_MAX_BYTES", str(10 * 1024 * 1024)))  # Textract's synchronous limit
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", "10"))
+MIN_TEXT_LAYER_CHARS = int(os.environ.get("MIN_TEXT_LAYER_CHARS", "200"))
+
+# --- Word document extraction ---
+DOC_CONVERTER_CMD = os.environ.get("DOC_CONVERTER_CMD", "antiword")  # Any command that prints a .doc file's text to stdout
+DOC_CONVERTER_TIMEOUT = int(os.environ.get("DOC_CONVERTER_TIMEOUT", "30"))
+DOCX_MAGIC = b'PK\x03\x04'
+DOC_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# --- Skill and entity extraction ---
+# local: dictionary automaton and local language detection only, no API calls
+# hybrid: local skills, plus one Comprehend detect_entities call merged into the entities
+# comprehend: the original three-call stage, skills taken from short key phrases
+EXTRACTION_ENGINE = os.environ.get("EXTRACTION_ENGINE", "local")
+ENTITY_TYPES = ("PERSON", "ORGANIZATION", "DATE", "LOCATION")
+MAX_SKILL_WORDS = 3
+COMPREHEND_LANGUAGES = ('en', 'es', 'fr', 'de', 'it', 'pt', 'ar', 'hi', 'ja', 'ko', 'zh')
+COMPREHEND_MAX_BYTES = 100000  # Synchronous detect_entities request limit
+
+
+def check_pdf_header(head_bytes, total_size):
+    """Magic-byte and size checks that need only the first kilobyte. Raises ValueError."""
+    if b'%PDF-' not in head_bytes[:PREFLIGHT_SNIFF_BYTES]:
+        raise ValueError("File is not a valid PDF.")
+    if total_size > PDF_MAX_BYTES:
+        raise ValueError(f"PDF is larger than {PDF_MAX_BYTES // (1024 * 1024)} MB.")
+
+
+def pdf_lines(pdf_bytes):
+    """
+    Opens the PDF locally, enforces the page limits and returns the embedded text layer
+    as a list of non-empty lines (empty for image-only scans). Raises ValueError for
+    files that should be rejected.
+    """
+    try:
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        if reader.is_encrypted and not reader.decrypt(""):
+            raise ValueError("PDF is password protected.")
+        page_count = len(reader.pages)
+        if page_count == 0:
+            raise ValueError("PDF has no pages.")
+        if page_count > PDF_MAX_PAGES:
+            raise ValueError(f"PDF has {page_count} pages; the limit is {PDF_MAX_PAGES}.")
+        page_texts = [page.extract_text() or '' for page in reader.pages]
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"PDF is corrupt or unreadable: {str(e)}")
+
+    lines = [line.strip() for page_text in page_texts for line in page_text.splitlines() if line.strip()]
+    log("pdf text layer", level="DEBUG", size_bytes=len(pdf_bytes), pages=page_count, lines=len(lines))
+    return lines
+
+
+def has_text_layer(lines):
+    """True when the embedded text is substantial enough to skip OCR."""
+    return sum(len(line) for line in lines) >= MIN_TEXT_LAYER_CHARS
+
+
+def join_lines(lines):
+    """Matches the Textract output shape: non-empty lines joined by single spaces."""
+    return ' '.join(lines)
+
+
+def textract_lines(response):
+    """The LINE blocks of a Textract detect_document_text response."""
+    return [block["Text"] for block in response.get("Blocks", []) if block["BlockType"] == "LINE"]
+
+
+def extract_docx_text(fileobj):
+    """Streams word/document.xml out of the DOCX zip and joins its paragraphs."""
+    paragraphs = []
+    try:
+        with zipfile.ZipFile(fileobj) as docx:
+            with docx.open('word/document.xml') as xml_stream:
+                for _, elem in ElementTree.iterparse(xml_stream):
+                    if elem.tag == f'{WORD_NS}p':
+                        text = ''.join(node.text or '' for node in elem.iter(f'{WORD_NS}t')).strip()
+                        if text:
+                            paragraphs.append(text)
+                        elem.clear()
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+        raise ValueError(f"DOCX is corrupt or unreadable: {str(e)}")
+    return ' '.join(paragraphs)
+
+
+def extract_doc_text(fileobj):
+    """Legacy .doc files go through a local converter (antiword by default) shipped in a Lambda layer."""
+    with tempfile.NamedTemporaryFile(suffix='.doc') as tmp:
+        shutil.copyfileobj(fileobj, tmp)
+        tmp.flush()
+        result = subprocess.run(
+            shlex.split(DOC_CONVERTER_CMD) + [tmp.name],
+            capture_output=True,
+            timeout=DOC_CONVERTER_TIMEOUT
+        )
+    if result.returncode != 0:
+        raise ValueError(f"DOC conversion failed: {result.stderr.decode('utf-8', errors='ignore').strip()}")
+    text = result.stdout.decode('utf-8', errors='ignore')
+    return ' '.join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def extract_word_fileobj(fileobj, file_ext):
+    """Checks the magic bytes of a seekable DOC/DOCX file object and extracts its text."""
+    magic = fileobj.read(8)
+    fileobj.seek(0)
+
+    if file_ext == '.docx':
+        if not magic.startswith(DOCX_MAGIC):
+            raise ValueError("File is not a valid DOCX document.")
+        return extract_docx_text(fileobj)
+
+    if not magic.startswith(DOC_MAGIC):
+        raise ValueError("File is not a valid DOC document.")
+    return extract_doc_text(fileobj)
+
+
+def local_analysis(text):
+    """(entities, skills) from the curated dictionaries and a date pattern, in milliseconds."""
+    entities, skills = [], []
+    for entity_type, name in find_terms(text):
+        if entity_type == 'SKILL':
+            skills.append(name)
+        else:
+            entities.append({"Text": name, "Type": entity_type})
+    entities.extend({"Text": date, "Type": "DATE"} for date in find_dates(text))
+    return entities, skills
+
+
+def comprehend_analysis(comprehend, text):
+    """
+    The original Comprehend stage: dominant language, then entities and key phrases.
+    Skills are the short key phrases (at most three words).
+    """
+    lang_response = comprehend.detect_dominant_language(Text=text)
+    dominant_lang = lang_response['Languages'][0]['LanguageCode'] if lang_response['Languages'] else 'en'
+
+    entities = comprehend.detect_entities(Text=text, LanguageCode=dominant_lang).get('Entities', [])
+    key_phrases = comprehend.detect_key_phrases(Text=text, LanguageCode=dominant_lang).get('KeyPhrases', [])
+
+    extracted_entities = [{"Text": ent["Text"], "Type": ent["Type"]} for ent in entities if ent["Type"] in ENTITY_TYPES]
+    extracted_skills = [phrase["Text"] for phrase in key_phrases if len(phrase["Text"].split()) <= MAX_SKILL_WORDS]
+    return extracted_entities, extracted_skills
+
+
+def enrich_entities(comprehend, text, entities):
+    """
+    Adds Comprehend's entities (people, and anything outside the dictionaries) to the
+    local ones. Skipped for languages Comprehend does not support; a failed call keeps
+    the local result.
+    """
+    language = detect_language(text)
+    if language not in COMPREHEND_LANGUAGES:
+        put_metric("EnrichmentSkipped")
+        return entities
+    try:
+        found = comprehend.detect_entities(
+            Text=text.encode('utf-8')[:COMPREHEND_MAX_BYTES].decode('utf-8', 'ignore'), LanguageCode=language
+        ).get('Entities', [])
+    except Exception as e:
+        log("Comprehend enrichment failed", level="WARNING", error=str(e))
+        return entities
+    seen = {(ent["Text"].lower(), ent["Type"]) for ent in entities}
+    for ent in found:
+        if ent["Type"] in ENTITY_TYPES and (ent["Text"].lower(), ent["Type"]) not in seen:
+            seen.add((ent["Text"].lower(), ent["Type"]))
+            entities.append({"Text": ent["Text"], "Type": ent["Type"]})
+    return entities
+
+
+def analyze_text(comprehend, text, engine=None):
+    """
+    The skill and entity stage shared by resume and job parsing, returning (entities,
+    skills). `engine` defaults to EXTRACTION_ENGINE; `comprehend` is only called by the
+    hybrid and comprehend engines.
+    """
+    engine = engine or EXTRACTION_ENGINE
+    if engine == 'comprehend':
+        return comprehend_analysis(comprehend, text)
+
+    entities, skills = local_analysis(text)
+    if engine == 'hybrid':
+        entities = enrich_entities(comprehend, text, entities)
+    put_metric("DictionarySkills", len(skills))
+    return entities, skills
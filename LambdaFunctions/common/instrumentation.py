@@ -0,0 +1,150 @@
+import json
+import os
+import random
+import time
+import functools
+from contextlib import contextmanager
+
+# --- Configuration from Environment Variables ---
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "AIResumePortal")
+# Fraction of invocations that emit the EMF metrics record (1.0 = every invocation)
+METRICS_SAMPLE_RATE = float(os.environ.get("METRICS_SAMPLE_RATE", "1.0"))
+# Fraction of invocations that emit per-stage debug log lines. Errors and cold starts are always logged.
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", "0.1"))
+
+_cold_start = True
+_current = None
+
+
+class Invocation:
+    """Per-invocation metrics record. Only one is active at a time per Lambda container."""
+    __slots__ = ('function_name', 'request_id', 'cold_start', 'started', 'stages', 'counters',
+                 'log_sampled', 'metrics_sampled')
+
+    def __init__(self, function_name, request_id, cold_start):
+        self.function_name = function_name
+        self.request_id = request_id
+        self.cold_start = cold_start
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self.log_sampled = cold_start or random.random() < LOG_SAMPLE_RATE
+        self.metrics_sampled = random.random() < METRICS_SAMPLE_RATE
+
+    def add(self, name, value):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+
+def log(message, level="INFO", **fields):
+    """Writes one structured JSON log line. DEBUG lines are only written for sampled invocations."""
+    if level == "DEBUG" and not (_current and _current.log_sampled):
+        return
+    record = {"level": level, "message": message}
+    if _current:
+        record["function"] = _current.function_name
+        record["request_id"] = _current.request_id
+    record.update(fields)
+    print(json.dumps(record, separators=(',', ':'), default=str))
+
+
+def put_metric(name, value=1):
+    """Adds to a per-invocation counter (items scanned, bytes returned, emails sent, ...)."""
+    if _current:
+        _current.add(name, value)
+
+
+@contextmanager
+def timed_stage(name):
+    """Times a block of handler code and records it as <name>Latency in the invocation metrics."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if _current:
+            _current.stages[name] = _current.stages.get(name, 0) + elapsed_ms
+        log("stage finished", level="DEBUG", stage=name, latency_ms=round(elapsed_ms, 2))
+
+
+def _after_aws_call(parsed=None, model=None, **kwargs):
+    if not _current or not isinstance(parsed, dict):
+        return
+    _current.add("AWSCalls", 1)
+    if model is not None:
+        _current.add(f"{model.service_model.service_id.replace(' ', '')}Calls", 1)
+    _current.add("Retries", parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0))
+    consumed = parsed.get('ConsumedCapacity')
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    for capacity in consumed or []:
+        _current.add("ConsumedCapacity", capacity.get('CapacityUnits', 0))
+
+
+def instrument_client(client):
+    """
+    Hooks a boto3 client (or resource) so every API call is counted along with its
+    retry attempts and any ConsumedCapacity the response reports.
+    """
+    events = client.meta.client.meta.events if hasattr(client.meta, 'client') else client.meta.events
+    events.register('after-call.*.*', _after_aws_call)
+    return client
+
+
+def _emit_metrics(invocation, duration_ms):
+    metrics = [{"Name": "Duration", "Unit": "Milliseconds"}, {"Name": "ColdStart", "Unit": "Count"}]
+    record = {
+        "FunctionName": invocation.function_name,
+        "RequestId": invocation.request_id,
+        "Duration": round(duration_ms, 2),
+        "ColdStart": 1 if invocation.cold_start else 0,
+    }
+    for stage, elapsed_ms in invocation.stages.items():
+        metrics.append({"Name": f"{stage}Latency", "Unit": "Milliseconds"})
+        record[f"{stage}Latency"] = round(elapsed_ms, 2)
+    for name, value in invocation.counters.items():
+        metrics.append({"Name": name, "Unit": "Bytes" if name.endswith("Bytes") else "Count"})
+        record[name] = value
+    record["_aws"] = {
+        "Timestamp": int(time.time() * 1000),
+        "CloudWatchMetrics": [{
+            "Namespace": METRICS_NAMESPACE,
+            "Dimensions": [["FunctionName"]],
+            "Metrics": metrics
+        }]
+    }
+    print(json.dumps(record, separators=(',', ':'), default=str))
+
+
+def instrument(function_name):
+    """
+    Decorator for lambda_handler. Tracks the cold-start flag, total latency, stage
+    timings and counters for the invocation, and emits one embedded-metric-format
+    record when the handler returns.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            global _cold_start, _current
+            request_id = getattr(context, 'aws_request_id', None)
+            _current = invocation = Invocation(function_name, request_id, _cold_start)
+            _cold_start = False
+            try:
+                response = handler(event, context)
+                if isinstance(response, dict):
+                    status_code = response.get('statusCode')
+                    if isinstance(response.get('body'), str):
+                        invocation.add("ResponseBytes", len(response['body']))
+                    if isinstance(status_code, int) and status_code >= 500:
+                        invocation.add("Errors", 1)
+                return response
+            except Exception as e:
+                invocation.add("Errors", 1)
+                log("unhandled exception", level="ERROR", error=str(e))
+                raise
+            finally:
+                duration_ms = (time.perf_counter() - invocation.started) * 1000
+                if invocation.metrics_sampled:
+                    _emit_metrics(invocation, duration_ms)
+                _current = None
+        return wrapper
+    return decorator
@@ -0,0 +1,52 @@
+import os
+from datetime import datetime, timezone
+from common import dynamo
+
+# --- Configuration from Environment Variables ---
+# Table keyed by old_job_id, written when a department change gives a job a new job_id
+JOB_ALIAS_TABLE = os.environ.get("JOB_ALIAS_TABLE")
+MAX_ALIAS_HOPS = 5
+
+
+def alias_put(old_job_id, new_job_id):
+    """The TransactWriteItems Put recording that old_job_id now lives at new_job_id."""
+    return {'Put': {
+        'TableName': JOB_ALIAS_TABLE,
+        'Item': {
+            'old_job_id': old_job_id,
+            'new_job_id': new_job_id,
+            'migrated': False,
+            'created_at': datetime.now(timezone.utc).isoformat()
+        }
+    }}
+
+
+def mark_migrated(old_job_id, moved):
+    """Flags the alias once every applicant has been rewritten to the new job_id."""
+    if not JOB_ALIAS_TABLE:
+        return
+    dynamo.table(JOB_ALIAS_TABLE).update_item(
+        Key={'old_job_id': old_job_id},
+        UpdateExpression='SET migrated = :t, migrated_at = :at ADD applicants_moved :n',
+        ExpressionAttributeValues={':t': True, ':at': datetime.now(timezone.utc).isoformat(), ':n': moved}
+    )
+
+
+def resolve_job_ids(job_ids):
+    """
+    Maps old job_ids to their current ones, following chains of department changes.
+    Only IDs that have an alias appear in the result; one batch_get per hop.
+    """
+    if not JOB_ALIAS_TABLE:
+        return {}
+    resolved = {}
+    current = {job_id: job_id for job_id in job_ids}
+    for _ in range(MAX_ALIAS_HOPS):
+        if not current:
+            break
+        aliases = dynamo.batch_get(JOB_ALIAS_TABLE, [{'old_job_id': job_id} for job_id in set(current.values())],
+                                   **dynamo.projection(('old_job_id', 'new_job_id')))
+        next_hop = {alias['old_job_id']: alias['new_job_id'] for alias in aliases}
+        current = {original: next_hop[job_id] for original, job_id in current.items() if job_id in next_hop}
+        resolved.update(current)
+    return resolved
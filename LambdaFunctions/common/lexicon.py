@@ -0,0 +1,296 @@
+import json
+import os
+import re
+from collections import deque
+from common.locations import GAZETTEER
+
+# Optional: a JSON file in the layer that extends the built-in dictionaries,
+# {"skills": {"Canonical": ["alias", ...]}, "organizations": {...}}
+EXTRACTION_DICTIONARY = os.environ.get("EXTRACTION_DICTIONARY")
+
+# --- Curated dictionaries ---
+# Canonical name: spellings matched case-insensitively on word boundaries (the canonical
+# name itself always matches). Single letters and everyday words ("go", "r") are left out,
+# and spellings that double as ordinary words or abbreviations are listed in EXACT_CASE.
+SKILLS = {
+    'Python': (), 'Java': (), 'JavaScript': ('JS', 'java script', 'ecmascript'), 'TypeScript': (),
+    'C++': ('cpp',), 'C#': ('c sharp',), 'Golang': ('go lang',), 'Rust': (), 'Kotlin': (), 'Swift': (),
+    'PHP': (), 'Ruby': (), 'Scala': (), 'MATLAB': (), 'R Programming': ('r language', 'rstudio'),
+    'Dart': (), 'Perl': (), 'Bash': ('shell scripting', 'shell script'), 'PowerShell': (),
+    'HTML': ('html5',), 'CSS': ('css3',), 'Tailwind CSS': ('tailwind', 'tailwindcss'), 'Bootstrap': (),
+    'SASS': ('scss',), 'React': ('react.js', 'reactjs'), 'React Native': (), 'Angular': ('angularjs', 'angular.js'),
+    'Vue.js': ('vue', 'vuejs'), 'Next.js': ('nextjs',), 'Redux': (), 'jQuery': (),
+    'Node.js': ('nodejs', 'node js'), 'Express.js': ('expressjs',), 'Django': (), 'Flask': (),
+    'FastAPI': ('fast api',), 'Spring Boot': ('springboot', 'spring framework'), 'Hibernate': (), '.NET': ('dotnet', 'asp.net'),
+    'Laravel': (), 'Ruby on Rails': ('RoR',), 'GraphQL': (), 'REST APIs': ('rest api', 'restful'),
+    'Microservices': ('microservice',), 'Flutter': (), 'Android': ('android development',), 'iOS': (),
+    'SQL': (), 'MySQL': (), 'PostgreSQL': ('postgres',), 'MongoDB': ('mongo',), 'Redis': (), 'Oracle': (),
+    'SQL Server': ('mssql', 'ms sql'), 'SQLite': (), 'DynamoDB': ('dynamo db',), 'Cassandra': (),
+    'Elasticsearch': ('elastic search',), 'Firebase': (), 'Snowflake': (),
+    'AWS': ('amazon web services',), 'Azure': ('microsoft azure',), 'GCP': ('google cloud', 'google cloud platform'),
+    'AWS Lambda': (), 'Amazon S3': ('s3',), 'EC2': (), 'Docker': (), 'Kubernetes': ('k8s',),
+    'Terraform': (), 'Ansible': (), 'Jenkins': (), 'CI/CD': ('ci cd', 'continuous integration'),
+    'GitHub Actions': (), 'Git': ('github', 'gitlab', 'bitbucket'), 'Linux': ('unix', 'ubuntu'), 'Nginx': (),
+    'Kafka': ('apache kafka',), 'RabbitMQ': (), 'Spark': ('apache spark', 'pyspark'), 'Hadoop': (), 'Airflow': (),
+    'Machine Learning': ('ML',), 'Deep Learning': (), 'Artificial Intelligence': ('AI',),
+    'Natural Language Processing': ('nlp',), 'Computer Vision': ('opencv',), 'Generative AI': ('genai', 'llm', 'llms'),
+    'TensorFlow': (), 'PyTorch': (), 'Keras': (), 'scikit-learn': ('sklearn', 'scikit learn'), 'Pandas': (),
+    'NumPy': (), 'Matplotlib': (), 'Data Analysis': ('data analytics',), 'Data Science': (),
+    'Data Visualization': (), 'Statistics': (), 'Excel': ('ms excel', 'microsoft excel', 'advanced excel'),
+    'Power BI': ('powerbi',), 'Tableau': (), 'Looker': (), 'ETL': (),
+    'Selenium': (), 'Cypress': (), 'JUnit': (), 'PyTest': (), 'Postman': (), 'Jira': (),
+    'Manual Testing': (), 'Automation Testing': ('test automation',),
+    'Figma': (), 'Adobe XD': (), 'Photoshop': ('adobe photoshop',), 'Illustrator': ('adobe illustrator',),
+    'Canva': (), 'UI/UX': ('ui ux', 'ux design', 'ui design', 'user experience'),
+    'SEO': ('search engine optimization',), 'SEM': (), 'Google Analytics': (), 'Digital Marketing': (),
+    'Social Media Marketing': ('smm',), 'Content Writing': ('copywriting',), 'Email Marketing': (),
+    'Salesforce': (), 'SAP': (), 'Tally': ('tally erp',), 'Accounting': (), 'Financial Analysis': (),
+    'Recruitment': ('talent acquisition',), 'Payroll': (), 'Supply Chain': ('supply chain management',),
+    'Embedded Systems': ('embedded c',), 'IoT': ('internet of things',), 'VLSI': (), 'AutoCAD': (),
+    'PCB Design': (), 'Arduino': (), 'Raspberry Pi': (),
+    'Agile': ('scrum',), 'Project Management': (), 'Communication': ('communication skills',),
+    'Leadership': (), 'Teamwork': ('team player',), 'Negotiation': (), 'Problem Solving': (),
+    'Time Management': (), 'Customer Service': (), 'Sales': (), 'Business Development': (),
+}
+
+_CAMPUSES = {
+    'IIT': ('Indian Institute of Technology', ('Bombay', 'Delhi', 'Madras', 'Kanpur', 'Kharagpur', 'Roorkee',
+                                               'Guwahati', 'Hyderabad', 'Indore', 'BHU', 'Dhanbad', 'Ropar',
+                                               'Mandi', 'Patna', 'Jodhpur', 'Gandhinagar', 'Bhubaneswar')),
+    'NIT': ('National Institute of Technology', ('Trichy', 'Warangal', 'Surathkal', 'Calicut', 'Rourkela',
+                                                 'Kurukshetra', 'Jaipur', 'Allahabad', 'Nagpur', 'Durgapur',
+                                                 'Jalandhar', 'Hamirpur', 'Silchar', 'Patna', 'Delhi')),
+    'IIIT': ('International Institute of Information Technology', ('Hyderabad', 'Bangalore')),
+    'IIM': ('Indian Institute of Management', ('Ahmedabad', 'Bangalore', 'Calcutta', 'Lucknow', 'Indore',
+                                               'Kozhikode')),
+}
+ORGANIZATIONS = {
+    **{f"{short} {campus}": (f"{long.lower()} {campus.lower()}", f"{short.lower()}-{campus.lower()}",
+                             f"{short.lower()}, {campus.lower()}")
+       for short, (long, campuses) in _CAMPUSES.items() for campus in campuses},
+    'IIIT Delhi': ('indraprastha institute of information technology',),
+    'Delhi University': ('university of delhi',), 'Jawaharlal Nehru University': ('jnu',),
+    'Jamia Millia Islamia': ('jamia',), 'Delhi Technological University': ('dtu', 'delhi college of engineering'),
+    'Netaji Subhas University of Technology': ('nsut', 'nsit', 'netaji subhas institute of technology'),
+    'GGSIPU': ('guru gobind singh indraprastha university', 'ip university', 'ipu'),
+    'AKTU': ('dr. a.p.j. abdul kalam technical university', 'abdul kalam technical university', 'uptu'),
+    'Amity University': ('amity',), 'BITS Pilani': ('birla institute of technology and science',),
+    'VIT': ('vellore institute of technology', 'vit university'), 'SRM University': ('srm institute of science and technology', 'srm'),
+    'Manipal Institute of Technology': ('manipal university', 'manipal'), 'Anna University': (),
+    'University of Mumbai': ('mumbai university',), 'Savitribai Phule Pune University': ('pune university', 'sppu'),
+    'Jadavpur University': (), 'Banaras Hindu University': ('bhu',), 'Aligarh Muslim University': ('AMU',),
+    'Thapar Institute of Engineering and Technology': ('thapar university', 'thapar'),
+    'Chandigarh University': (), 'Lovely Professional University': ('lpu',), 'KIIT': ('kalinga institute of industrial technology',),
+    'Christ University': (), 'Symbiosis International University': ('Symbiosis',),
+    'Tata Consultancy Services': ('tcs',), 'Infosys': (), 'Wipro': (), 'HCLTech': ('hcl', 'hcl technologies'),
+    'Tech Mahindra': (), 'Accenture': (), 'Cognizant': (), 'Capgemini': (), 'Deloitte': (), 'EY': ('ernst & young',),
+    'KPMG': (), 'PwC': ('pricewaterhousecoopers',), 'IBM': (), 'Oracle Corporation': (), 'Microsoft': (),
+    'Google': (), 'Amazon': (), 'Meta': ('facebook',), 'Adobe': (), 'Samsung': (), 'Flipkart': (), 'Paytm': (),
+    'Zomato': (), 'Swiggy': (), 'Ola': (), 'Reliance Industries': ('Reliance', 'Jio'), 'Tata Motors': (),
+    'Mahindra & Mahindra': (), 'Larsen & Toubro': ('l&t', 'larsen and toubro'), 'HDFC Bank': ('hdfc',),
+    'ICICI Bank': ('icici',), 'State Bank of India': ('sbi',), 'Airtel': ('bharti airtel',), 'Byju\'s': ('byjus',),
+    'Lava International': ('lava mobiles', 'Lava'), 'Dixon Technologies': ('dixon',),
+}
+
+# Spellings that are also everyday words ("6th sem", "guard rails", "ai team") or short
+# abbreviations only match in exactly this case. Capitalized words ("Excel", "Swift") also
+# start sentences and headings, so there they only match as list items ("Swift, Kotlin")
+EXACT_CASE = {
+    'JS', 'ML', 'AI', 'RoR', 'SEM', 'SAP', 'Rust', 'Swift', 'Dart', 'Spark', 'Excel', 'Flask', 'Tally',
+    'Postman', 'Looker', 'EY', 'Meta', 'Ola', 'Reliance', 'Jio', 'Lava', 'AMU', 'Symbiosis',
+}
+
+# Cities from the location gazetteer, reported under their first spelling
+LOCATIONS = {aliases[0].title(): aliases[1:] for _, aliases, _ in GAZETTEER.values()}
+
+# --- Local language detection ---
+# Letters in these scripts settle the language outright; Latin text is scored by stopword hits
+SCRIPTS = (
+    ('hi', 0x0900, 0x097F), ('bn', 0x0980, 0x09FF), ('pa', 0x0A00, 0x0A7F), ('gu', 0x0A80, 0x0AFF),
+    ('ta', 0x0B80, 0x0BFF), ('te', 0x0C00, 0x0C7F), ('kn', 0x0C80, 0x0CFF), ('ml', 0x0D00, 0x0D7F),
+    ('ar', 0x0600, 0x06FF), ('zh', 0x4E00, 0x9FFF),
+)
+STOPWORDS = {
+    'en': {'the', 'and', 'of', 'to', 'in', 'with', 'for', 'on', 'at', 'is', 'as', 'my', 'i', 'from', 'a'},
+    'es': {'el', 'la', 'de', 'y', 'en', 'los', 'las', 'con', 'para', 'por', 'del', 'una', 'un'},
+    'fr': {'le', 'la', 'les', 'de', 'et', 'des', 'en', 'du', 'pour', 'avec', 'une', 'dans', 'au'},
+    'de': {'der', 'die', 'das', 'und', 'in', 'mit', 'von', 'zu', 'für', 'den', 'im', 'ich', 'bei'},
+    'pt': {'o', 'a', 'de', 'e', 'do', 'da', 'em', 'com', 'para', 'os', 'no', 'na', 'uma'},
+    'it': {'il', 'la', 'di', 'e', 'in', 'con', 'per', 'del', 'della', 'che', 'una', 'un', 'nel'},
+}
+LANGUAGE_SAMPLE_CHARS = 4000
+MIN_SCRIPT_SHARE = 0.3
+
+_TOKEN = re.compile(r'[^\W\d_]+')
+_SPACE = re.compile(r'\s+')
+# What a sentence or bullet starts after, and what ends a list item
+_SENTENCE_STARTS = '.!?\n•▪*-–'
+_LIST_ENDS = ',;|/\n'
+_MONTHS = r'jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?'
+_DATE = re.compile(rf'\b(?:(?:{_MONTHS})\.?,?\s+)?(?:19[6-9]\d|20[0-4]\d)\b', re.IGNORECASE)
+
+
+class Automaton:
+    """
+    Aho-Corasick matcher over a fixed set of lowercase patterns: one pass over the text
+    finds every occurrence of every pattern, however many patterns there are.
+    """
+    __slots__ = ('_goto', '_fail', '_out')
+
+    def __init__(self, patterns):
+        goto, out = [{}], [[]]
+        for pattern, value in patterns:
+            node = 0
+            for char in pattern:
+                child = goto[node].get(char)
+                if child is None:
+                    child = len(goto)
+                    goto[node][char] = child
+                    goto.append({})
+                    out.append([])
+                node = child
+            out[node].append((len(pattern), value))
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0) if node else 0
+                out[child] = out[child] + out[fail[child]]
+        self._goto, self._fail, self._out = goto, fail, out
+
+    def matches(self, text):
+        """(start, end, value) for every occurrence, in order of end position."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, value in out[node]:
+                yield end - length, end, value
+
+
+def _patterns(entity_type, dictionary):
+    for canonical, aliases in dictionary.items():
+        for spelling in {canonical, *aliases}:
+            yield _SPACE.sub(' ', spelling.lower()), (entity_type, canonical, spelling if spelling in EXACT_CASE else None)
+
+
+def _load_extensions():
+    if not EXTRACTION_DICTIONARY:
+        return {}, {}
+    with open(EXTRACTION_DICTIONARY, encoding='utf-8') as f:
+        extra = json.load(f)
+    return extra.get('skills', {}), extra.get('organizations', {})
+
+
+_automaton = None
+
+
+def automaton():
+    """The dictionary automaton, built on first use and kept for the container's lifetime."""
+    global _automaton
+    if _automaton is None:
+        extra_skills, extra_orgs = _load_extensions()
+        _automaton = Automaton([
+            *_patterns('SKILL', {**SKILLS, **extra_skills}),
+            *_patterns('ORGANIZATION', {**ORGANIZATIONS, **extra_orgs}),
+            *_patterns('LOCATION', LOCATIONS),
+        ])
+    return _automaton
+
+
+def _sentence_initial(text, start):
+    """Whether `start` opens the text, a sentence, a line or a bullet (whitespace is collapsed)."""
+    i = start - 1 if start and text[start - 1] == ' ' else start
+    return i == 0 or text[i - 1] in _SENTENCE_STARTS
+
+
+def _list_item(text, end):
+    """Whether the match ending at `end` ends the text, a line or a list item."""
+    i = end + 1 if end < len(text) and text[end] == ' ' else end
+    return i == len(text) or text[i] in _LIST_ENDS
+
+
+def _case_matches(cased, start, end, spelling):
+    if cased[start:end] != spelling:
+        return False
+    return not spelling.istitle() or not _sentence_initial(cased, start) or _list_item(cased, end)
+
+
+def find_terms(text):
+    """
+    Dictionary terms in the text as (type, canonical name) pairs in order of first
+    appearance. Matches must sit on word boundaries, and where they overlap the longest
+    wins ("react native" over "react", "iit delhi" over "delhi"). EXACT_CASE spellings
+    must also match the text's case, and capitalized ones at the start of a sentence,
+    line or bullet only count as list items ("Excel in teams." does not match).
+    """
+    # Whitespace runs collapse to one character, a line break where the run had one
+    spaced = _SPACE.sub(lambda match: '\n' if '\n' in match.group(0) else ' ', str(text or ''))
+    normalized = spaced.replace('\n', ' ').lower()
+    # lower() keeps offsets for all but a few non-Latin letters; if it moved them, skip the case check
+    cased = spaced if len(spaced) == len(normalized) else None
+    found = sorted(
+        (start, -end, value[:2]) for start, end, value in automaton().matches(normalized)
+        if (start == 0 or not normalized[start - 1].isalnum())
+        and (end == len(normalized) or not normalized[end].isalnum())
+        and (value[2] is None or cased is None or _case_matches(cased, start, end, value[2]))
+    )
+    terms, covered_to = [], 0
+    for start, neg_end, value in found:
+        if start < covered_to:
+            continue
+        covered_to = -neg_end
+        if value not in terms:
+            terms.append(value)
+    return terms
+
+
+def find_dates(text):
+    """Years and month-year mentions ("2019", "Aug 2021"), as written, first occurrence only."""
+    return list(dict.fromkeys(_SPACE.sub(' ', match.group(0)) for match in _DATE.finditer(str(text or ''))))
+
+
+def detect_language(text):
+    """
+    ISO 639-1 code of the text's language from its first LANGUAGE_SAMPLE_CHARS: a
+    non-Latin script holding MIN_SCRIPT_SHARE of the letters, else the best stopword
+    score. Falls back to 'en'.
+    """
+    sample = str(text or '')[:LANGUAGE_SAMPLE_CHARS]
+    letters = [ord(char) for char in sample if char.isalpha()]
+    if letters:
+        for code, low, high in SCRIPTS:
+            if sum(1 for point in letters if low <= point <= high) >= MIN_SCRIPT_SHARE * len(letters):
+                return code
+
+    tokens = _TOKEN.findall(sample.lower())
+    scores = {code: sum(1 for token in tokens if token in words) for code, words in STOPWORDS.items()}
+    best = max(scores, key=scores.get)
+    return best if scores[best] else 'en'
+
+
+def group_entities(entities):
+    """Stored entity dicts grouped by type for display, each text listed once."""
+    grouped = {entity_type: [] for entity_type in ('PERSON', 'LOCATION', 'ORGANIZATION', 'DATE')}
+    for entity in entities or []:
+        entity = entity if isinstance(entity, dict) else {}
+        text, entity_type = entity.get('Text'), entity.get('Type')
+        if text and entity_type in grouped and text not in grouped[entity_type]:
+            grouped[entity_type].append(text)
+    return grouped
+
+
+def skill_match(resume_skills, job_skills):
+    """(lowercased resume skills, skills shared with the job, percentage of the job's skills covered)."""
+    resume_set = {s.lower() for s in resume_skills or [] if isinstance(s, str)}
+    job_set = {s.lower() for s in job_skills or [] if isinstance(s, str)}
+    matched = list(resume_set & job_set)
+    return list(resume_set), matched, round(len(matched) / len(job_set) * 100, 2) if job_set else 0
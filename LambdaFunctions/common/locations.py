@@ -0,0 +1,213 @@
+import re
+from boto3.dynamodb.conditions import Attr, Key
+from common import dynamo
+from common.analytics import submitted_at
+
+# Location index attributes, computed once when a resume or job is written. The GSIs on
+# both tables use `city_code` as partition key and `<work_mode>#<time>` as sort key, so a
+# city plus an optional work mode is one indexed query, newest first. A second sparse GSI
+# keyed on `work_mode` serves work-mode-only requests, and on jobs a third, keyed on
+# `remote_code`, holds every job a remote candidate can take.
+CITY_INDEX = "city_code-index"
+MODE_INDEX = "work_mode-index"
+REMOTE_INDEX = "remote_code-index"
+RESUME_SORT_KEY = "mode_submitted"
+JOB_SORT_KEY = "mode_posted"
+REMOTE_CITY = "REMOTE"
+# Sort-key time for items with no date, so they stay in the index (oldest)
+UNDATED = "0000-00-00T00:00:00Z"
+# Job flag that makes an on-site or hybrid job match remote searches too
+REMOTE_FLAG = "allowRemote"
+
+# --- Offline gazetteer ---
+# City code: (region code, names and common spellings, PIN code prefixes)
+GAZETTEER = {
+    'DEL': ('DL', ('delhi', 'new delhi', 'dilli'), ('110',)),
+    'NOIDA': ('UP', ('noida', 'greater noida'), ('2013', '2033')),
+    'GZB': ('UP', ('ghaziabad',), ('2010',)),
+    'LKO': ('UP', ('lucknow',), ('226',)),
+    'GGN': ('HR', ('gurugram', 'gurgaon'), ('122',)),
+    'FBD': ('HR', ('faridabad',), ('121',)),
+    'BOM': ('MH', ('mumbai', 'bombay', 'navi mumbai', 'thane'), ('400', '4006', '4007')),
+    'PNQ': ('MH', ('pune', 'pimpri', 'chinchwad'), ('411',)),
+    'NAG': ('MH', ('nagpur',), ('440',)),
+    'BLR': ('KA', ('bengaluru', 'bangalore'), ('560',)),
+    'MYS': ('KA', ('mysuru', 'mysore'), ('570',)),
+    'HYD': ('TG', ('hyderabad', 'secunderabad', 'cyberabad'), ('500',)),
+    'MAA': ('TN', ('chennai', 'madras'), ('600',)),
+    'CJB': ('TN', ('coimbatore',), ('641',)),
+    'CCU': ('WB', ('kolkata', 'calcutta', 'howrah'), ('700', '711')),
+    'AMD': ('GJ', ('ahmedabad', 'gandhinagar'), ('380', '382')),
+    'STV': ('GJ', ('surat',), ('395',)),
+    'BDQ': ('GJ', ('vadodara', 'baroda'), ('390',)),
+    'JAI': ('RJ', ('jaipur',), ('302',)),
+    'IXC': ('CH', ('chandigarh', 'mohali', 'panchkula'), ('160', '1341')),
+    'IDR': ('MP', ('indore',), ('452',)),
+    'BHO': ('MP', ('bhopal',), ('462',)),
+    'COK': ('KL', ('kochi', 'cochin', 'ernakulam'), ('682',)),
+    'TRV': ('KL', ('thiruvananthapuram', 'trivandrum'), ('695',)),
+    'VTZ': ('AP', ('visakhapatnam', 'vizag'), ('530',)),
+    'BBI': ('OD', ('bhubaneswar',), ('751',)),
+    'PAT': ('BR', ('patna',), ('800',)),
+}
+REGION_NAMES = {
+    'DL': ('delhi',), 'UP': ('uttar pradesh',), 'HR': ('haryana',), 'MH': ('maharashtra',),
+    'KA': ('karnataka',), 'TG': ('telangana',), 'TN': ('tamil nadu',), 'WB': ('west bengal',),
+    'GJ': ('gujarat',), 'RJ': ('rajasthan',), 'CH': ('chandigarh tricity', 'tricity'), 'MP': ('madhya pradesh',),
+    'KL': ('kerala',), 'AP': ('andhra pradesh',), 'OD': ('odisha', 'orissa'), 'BR': ('bihar',),
+}
+WORK_MODES = {
+    'on-site': 'onsite', 'onsite': 'onsite', 'office': 'onsite', 'in office': 'onsite',
+    'remote': 'remote', 'work from home': 'remote', 'wfh': 'remote',
+    'hybrid': 'hybrid',
+}
+REMOTE_NAMES = ('remote', 'anywhere', 'work from home', 'wfh')
+
+_ALIASES = {alias: code for code, (_, aliases, _) in GAZETTEER.items() for alias in aliases}
+_PIN_PREFIXES = sorted(((prefix, code) for code, (_, _, prefixes) in GAZETTEER.items() for prefix in prefixes),
+                       key=lambda pair: -len(pair[0]))
+_MAX_ALIAS_WORDS = max(len(alias.split()) for alias in _ALIASES)
+_WORD = re.compile(r'[a-z]+')
+_PIN = re.compile(r'\b(\d{3})\s?(\d{3})\b')
+
+
+def resolve_city(text):
+    """
+    The gazetteer city code for a free-text address or job location, or None. Matches
+    the last city name in the text (addresses end with the city), then falls back to
+    the PIN code. "Remote"-style job locations resolve to REMOTE.
+    """
+    if not text:
+        return None
+    lowered = str(text).lower()
+    if lowered.strip() in _ALIASES:
+        return _ALIASES[lowered.strip()]
+    if lowered.strip() in REMOTE_NAMES:
+        return REMOTE_CITY
+
+    words = _WORD.findall(lowered)
+    for end in range(len(words), 0, -1):
+        for size in range(min(_MAX_ALIAS_WORDS, end), 0, -1):
+            code = _ALIASES.get(' '.join(words[end - size:end]))
+            if code:
+                return code
+
+    for match in _PIN.finditer(lowered):
+        pin = match.group(1) + match.group(2)
+        code = next((code for prefix, code in _PIN_PREFIXES if pin.startswith(prefix)), None)
+        if code:
+            return code
+    return None
+
+
+def resolve_region(text):
+    """A region code from a code ("KA") or a state name ("Karnataka"), or None."""
+    value = str(text or '').strip()
+    if value.upper() in REGION_NAMES:
+        return value.upper()
+    return next((code for code, names in REGION_NAMES.items() if value.lower() in names), None)
+
+
+def region_cities(region):
+    return [code for code, (region_code, _, _) in GAZETTEER.items() if region_code == region]
+
+
+def work_mode(text):
+    """onsite, remote or hybrid for the job form's workMode and the resume form's work_pref."""
+    return WORK_MODES.get(str(text or '').strip().lower())
+
+
+def index_attributes(place, mode, timestamp, sort_key):
+    """
+    The location attributes to store on an item; empty when the place is not in the
+    gazetteer, which keeps the item out of the sparse city index. Items without a
+    timestamp are indexed as UNDATED rather than dropped.
+    """
+    city = resolve_city(place)
+    if not city:
+        return {}
+    attributes = {'city_code': city, 'work_mode': work_mode(mode) or 'any'}
+    if city != REMOTE_CITY:
+        attributes['region_code'] = GAZETTEER[city][0]
+    attributes[sort_key] = f"{attributes['work_mode']}#{timestamp or UNDATED}"
+    return attributes
+
+
+def stale_attributes(attributes, sort_key):
+    """Location attributes an updated item must drop because its new place no longer yields them."""
+    return [name for name in ('city_code', 'region_code', 'work_mode', 'remote_code', sort_key) if name not in attributes]
+
+
+def resume_location(item):
+    # Older resumes predate submitted_at; their display datetime gives the same value
+    timestamp = item.get('submitted_at') or submitted_at(item.get('datetime'))
+    return index_attributes(item.get('address'), item.get('work_pref'), timestamp, RESUME_SORT_KEY)
+
+
+def job_location(item):
+    """index_attributes for a job, plus `remote_code` for remote jobs and jobs that allowRemote."""
+    attributes = index_attributes(item.get('location'), item.get('workMode'), item.get('postedDate'), JOB_SORT_KEY)
+    if attributes and (attributes['city_code'] == REMOTE_CITY or attributes['work_mode'] == 'remote'
+                       or item.get(REMOTE_FLAG) is True):
+        attributes['remote_code'] = REMOTE_CITY
+    return attributes
+
+
+def _query(table_name, model, index, condition, filter_expression, kwargs):
+    query = {'IndexName': index, 'KeyConditionExpression': condition, 'ScanIndexForward': False, **kwargs}
+    if filter_expression is not None:
+        query['FilterExpression'] = filter_expression
+    return list(dynamo.iter_query(table_name, model=model, **query))
+
+
+def location_query(table_name, sort_key, params, model=None, filter_expression=None, remote_index=None, **kwargs):
+    """
+    Items in the requested `city` (name or code) or `region`, optionally one `work_mode`:
+    one GSI query per city, newest first within each work mode. A `work_mode` alone is
+    one query on MODE_INDEX. Returns None when the request names neither, and [] for a
+    location outside the gazetteer.
+
+    With `remote_index` (jobs), remote searches read that index instead, so jobs that
+    allow remote work match too: `city=remote` and `work_mode=remote` query it directly,
+    and `work_mode=remote` within a city or region filters it by city_code.
+    """
+    mode = work_mode(params.get('work_mode'))
+    if params.get('city'):
+        city = params['city'].upper() if params['city'].upper() in GAZETTEER else resolve_city(params['city'])
+        cities = [city] if city else []
+    elif params.get('region'):
+        cities = region_cities(resolve_region(params['region']))
+    elif mode:
+        cities = None
+    else:
+        return None
+
+    def combined(condition):
+        return condition if filter_expression is None else condition & filter_expression
+
+    if remote_index and (cities == [REMOTE_CITY] or (mode == 'remote' and cities != [])):
+        condition = Key('remote_code').eq(REMOTE_CITY)
+        if mode and mode != 'remote':
+            condition = condition & Key(sort_key).begins_with(f"{mode}#")
+        city_filter = None
+        if cities and cities != [REMOTE_CITY]:
+            city_filter = Attr('city_code').is_in(cities)
+        return _query(table_name, model, remote_index, condition,
+                      filter_expression if city_filter is None else combined(city_filter), kwargs)
+
+    if cities is None:
+        return _query(table_name, model, MODE_INDEX, Key('work_mode').eq(mode), filter_expression, kwargs)
+
+    items = []
+    for city in cities:
+        condition = Key('city_code').eq(city)
+        if mode:
+            condition = condition & Key(sort_key).begins_with(f"{mode}#")
+        items.extend(_query(table_name, model, CITY_INDEX, condition, filter_expression, kwargs))
+    return items
+
+
+def work_mode_filter(params):
+    """FilterExpression narrowing another index's query (e.g. one job's applicants) to one work mode."""
+    mode = work_mode(params.get('work_mode'))
+    return Attr('work_mode').eq(mode) if mode else None
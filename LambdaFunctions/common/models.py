@@ -0,0 +1,100 @@
+from common.dynamo import deserialize
+
+
+class Record:
+    """
+    Base for the slotted table records. Known attributes live in __slots__; anything
+    else on the item is kept in `extra` so a read-modify-write never drops data.
+    """
+    __slots__ = ('extra',)
+    FIELDS = ()
+    _FIELD_SET = frozenset()
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            setattr(self, field, values.pop(field, None))
+        self.extra = values
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+
+    @classmethod
+    def from_item(cls, item):
+        """Builds a record from a resource-API (already deserialized) item."""
+        return cls(**item)
+
+    @classmethod
+    def from_attribute_values(cls, av_item):
+        """Decodes a raw client item straight into slots, without an intermediate dict."""
+        record = cls.__new__(cls)
+        for field in cls.FIELDS:
+            setattr(record, field, None)
+        extra = {}
+        fields = cls._FIELD_SET
+        for name, av in av_item.items():
+            if name in fields:
+                setattr(record, name, deserialize(av))
+            else:
+                extra[name] = deserialize(av)
+        record.extra = extra
+        return record
+
+    def get(self, name, default=None):
+        """dict-style access, so records can replace plain items in existing code."""
+        if name in self._FIELD_SET:
+            value = getattr(self, name)
+        else:
+            value = self.extra.get(name)
+        return default if value is None else value
+
+    def to_item(self):
+        """The item to write back: every non-None field plus the extra attributes."""
+        item = {field: getattr(self, field) for field in self.FIELDS if getattr(self, field) is not None}
+        item.update(self.extra)
+        return item
+
+    def to_dict(self, fields=None):
+        """JSON-ready view, optionally limited to a subset of fields."""
+        if fields is None:
+            return self.to_item()
+        return {field: self.get(field) for field in fields if self.get(field) is not None}
+
+
+class Resume(Record):
+    """One application (one uploaded resume) in the resume table, keyed by resume_id."""
+    FIELDS = (
+        'resume_id', 'filename', 'first_name', 'last_name', 'email', 'phone', 'gender',
+        'work_pref', 'address', 'experience', 'age', 'pass12', 'grad_year', 'marks12',
+        'grad_marks', 'linkedin', 'status', 'jobId', 'jobTitle', 'datetime', 'submitted_at',
+        'skills', 'entities', 'extracted_text_key', 'duplicate_of', 'department', 'match_bucket',
+    )
+    __slots__ = FIELDS
+
+
+class Job(Record):
+    """One job posting in the job table, keyed by job_id."""
+    FIELDS = (
+        'job_id', 'jobTitle', 'department', 'location', 'workType', 'workMode',
+        'experienceLevel', 'minExperience', 'maxExperience', 'minSalary', 'maxSalary',
+        'currency', 'jobDescription', 'responsibilities', 'requirements', 'qualifications',
+        'skills', 'benefits', 'applicationDeadline', 'positionsAvailable', 'reportingTo',
+        'contactEmail', 'isUrgent', 'allowRemote', 'travelRequired', 'backgroundCheckRequired',
+        'postedDate', 'status',
+    )
+    __slots__ = FIELDS
+
+
+class ReviewToken(Record):
+    """A review-link JWT in the review token table, keyed by token and expired via ttl."""
+    FIELDS = ('token', 'resume_id', 'job_id', 'status', 'ttl')
+    __slots__ = FIELDS
+
+
+class CandidateProfile(Record):
+    """One person in the candidate profile table, keyed by normalized email, merged across applications."""
+    FIELDS = (
+        'email', 'first_name', 'last_name', 'skills', 'departments', 'job_ids', 'resume_ids', 'application_count',
+        'latest_resume_id', 'latest_filename', 'last_applied', 'updated_at',
+    )
+    __slots__ = FIELDS
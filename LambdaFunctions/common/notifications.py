@@ -0,0 +1,132 @@
+import os
+import time
+from datetime import date
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from botocore.exceptions import ClientError
+from common import dynamo
+
+# --- Configuration from Environment Variables ---
+NOTIFICATION_CAPS_TABLE = os.environ.get("NOTIFICATION_CAPS_TABLE")  # Partition key `cap_key` (email#day), ttl enabled
+NOTIFY_MAX_PER_DAY = int(os.environ.get("NOTIFY_MAX_PER_DAY", "2"))
+
+CURRENCY_SYMBOLS = {'INR': '₹', 'USD': '$', 'EUR': '€', 'GBP': '£'}
+
+
+def format_salary(min_s, max_s, currency):
+    if not min_s or not max_s:
+        return "Not Disclosed"
+
+    def format_number(num):
+        try:
+            num = int(num)
+            if num >= 10000000:
+                return f'{(num / 10000000):.1f} Cr'
+            if num >= 100000:
+                return f'{(num / 100000):.1f} L'
+            if num >= 1000:
+                return f'{(num / 1000):.1f} K'
+            return str(num)
+        except (ValueError, TypeError):
+            return ""
+
+    symbol = CURRENCY_SYMBOLS.get(currency, '')
+    return f'{symbol}{format_number(min_s)} - {symbol}{format_number(max_s)}'
+
+
+def job_cards_html(jobs):
+    """The job-card list shared by the daily digest and the new-job notifications."""
+    job_list_html = ""
+    for job in jobs:
+        salary_str = format_salary(job.get('minSalary'), job.get('maxSalary'), job.get('currency'))
+        positions_str = f"{job.get('positionsAvailable', '1')} position(s)"
+
+        job_list_html += f"""
+        <div style="border-bottom: 1px solid #eeeeee; padding-bottom: 15px; margin-bottom: 15px;">
+            <h3 style="margin: 0; font-size: 18px; color: #333;">{job.get('jobTitle', 'N/A')}</h3>
+            <p style="margin: 5px 0; color: #555;">
+                {job.get('department', 'N/A')} | {job.get('location', 'N/A')}
+            </p>
+            <div style="margin-top: 10px; font-size: 14px; color: #666;">
+                <span style="margin-right: 15px; white-space: nowrap;">💼 {job.get('workType', '')} • {job.get('workMode', '')}</span>
+                <span style="margin-right: 15px; white-space: nowrap; font-weight: bold; color: #2E8B57;">{salary_str}</span>
+                <span style="white-space: nowrap;">👥 {positions_str}</span>
+            </div>
+        </div>
+        """
+    return job_list_html
+
+
+def build_jobs_email(sender, to_address, subject, candidate_name, intro, jobs, listings_url):
+    """A MIME message greeting the candidate, listing the jobs and linking to the careers page."""
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = subject
+    msg['From'] = sender
+    msg['To'] = to_address
+
+    html_body = f"""
+    <html><body style="font-family: sans-serif; color: #333;">
+        <h2>Hi {candidate_name},</h2>
+        <p>{intro}</p>
+        <div style="border: 1px solid #dddddd; border-radius: 8px; padding: 15px; margin: 20px 0;">{job_cards_html(jobs)}</div>
+        <p>To view more details and apply, please visit our careers page:</p>
+        <p style="margin: 25px 0;"><a href="{listings_url}" style="background-color: #264143; color: white; padding: 12px 20px; text-decoration: none; border-radius: 5px; display: inline-block;">View All Jobs</a></p>
+        <p>Best regards,<br>The HR Team</p>
+    </body></html>
+    """
+
+    msg.attach(MIMEText(html_body, 'html'))
+    return msg
+
+
+# --- Per-candidate frequency caps ---
+def cap_key(email):
+    return f"{email}#{date.today().isoformat()}"
+
+
+def capped_emails(emails):
+    """The candidates who already reached today's cap, in batched reads of 100."""
+    if not NOTIFICATION_CAPS_TABLE or not emails:
+        return set()
+    counters = dynamo.batch_get(NOTIFICATION_CAPS_TABLE, [{'cap_key': cap_key(email)} for email in emails],
+                                **dynamo.projection(('cap_key', 'sent')))
+    return {c['cap_key'].rsplit('#', 1)[0] for c in counters if c.get('sent', 0) >= NOTIFY_MAX_PER_DAY}
+
+
+def take_quota(email):
+    """
+    Counts one notification against the candidate's daily cap, or returns False when the
+    cap is reached. The conditional ADD is atomic, so concurrent senders cannot both slip
+    past it.
+    """
+    if not NOTIFICATION_CAPS_TABLE:
+        return True
+    try:
+        dynamo.table(NOTIFICATION_CAPS_TABLE).update_item(
+            Key={'cap_key': cap_key(email)},
+            UpdateExpression='ADD sent :one SET #ttl = :ttl',
+            ConditionExpression='attribute_not_exists(sent) OR sent < :cap',
+            ExpressionAttributeNames={'#ttl': 'ttl'},
+            ExpressionAttributeValues={':one': 1, ':cap': NOTIFY_MAX_PER_DAY, ':ttl': int(time.time()) + 2 * 86400}
+        )
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return False
+        raise
+
+
+def release_quota(email):
+    """Gives back a unit taken by take_quota when the send then failed, so the retry is not charged twice."""
+    if not NOTIFICATION_CAPS_TABLE:
+        return
+    try:
+        dynamo.table(NOTIFICATION_CAPS_TABLE).update_item(
+            Key={'cap_key': cap_key(email)},
+            UpdateExpression='ADD sent :minus_one',
+            ConditionExpression='sent > :zero',
+            ExpressionAttributeValues={':minus_one': -1, ':zero': 0}
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
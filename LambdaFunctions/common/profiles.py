@@ -0,0 +1,218 @@
+import os
+from collections import defaultdict
+from datetime import datetime
+from botocore.exceptions import ClientError
+from common import dynamo
+from common.analytics import load_jobs, submission_day
+from common.instrumentation import log, put_metric
+
+# --- Configuration from Environment Variables ---
+# Partition key `email` (stripped, lower-cased)
+PROFILE_TABLE = os.environ.get("PROFILE_TABLE")
+
+RESUME_FIELDS = ('resume_id', 'email', 'first_name', 'last_name', 'skills', 'jobId', 'filename', 'datetime')
+
+
+def normalize_email(email):
+    return str(email or '').strip().lower()
+
+
+def _skills(item):
+    return {s.strip().lower() for s in (item or {}).get('skills') or [] if isinstance(s, str) and s.strip()}
+
+
+def _job_id(item):
+    return str((item or {}).get('jobId') or '').strip()
+
+
+class _Change:
+    """What one stream batch (or a rebuild) contributes to one candidate's profile."""
+    __slots__ = ('first_name', 'last_name', 'skills', 'departments', 'job_ids', 'resume_ids', 'removed_ids',
+                 'latest')
+
+    def __init__(self):
+        self.first_name = self.last_name = None
+        self.skills, self.departments, self.job_ids = set(), set(), set()
+        self.resume_ids, self.removed_ids = set(), set()  # Applications added and removed
+        self.latest = None  # (day, resume_id, filename) of the newest application seen
+
+    def add_application(self, item, jobs):
+        self.first_name = item.get('first_name') or self.first_name
+        self.last_name = item.get('last_name') or self.last_name
+        job_id = _job_id(item)
+        if job_id:
+            self.job_ids.add(job_id)
+            department = (jobs.get(job_id) or {}).get('department')
+            if department:
+                self.departments.add(department)
+        day = submission_day(item.get('datetime'))
+        if day and (self.latest is None or day >= self.latest[0]):
+            self.latest = (day, item.get('resume_id'), item.get('filename'))
+
+
+def profile_changes(images, jobs):
+    """
+    {email: change} for a batch of (old, new) resume images. Uploads add an application
+    and may move the latest resume; processing only merges newly extracted skills; a job
+    migration adds the new job and department; removals are recorded by resume_id.
+    """
+    changes = defaultdict(_Change)
+    for old, new in images:
+        if new is None:
+            if old and normalize_email(old.get('email')) and old.get('resume_id'):
+                changes[normalize_email(old.get('email'))].removed_ids.add(old['resume_id'])
+            continue
+        email = normalize_email(new.get('email'))
+        if not email:
+            continue
+        added_skills = _skills(new) - _skills(old)
+        new_application = old is None or _job_id(old) != _job_id(new)
+        if not added_skills and not new_application:
+            continue  # Status changes and re-processing leave the profile as it is
+        change = changes[email]
+        change.skills |= added_skills
+        if old is None and new.get('resume_id'):
+            change.resume_ids.add(new['resume_id'])
+        if new_application:
+            change.add_application(new, jobs)
+    return changes
+
+
+def _count_application(profile_table, email, resume_id, delta):
+    """
+    Adds (+1) or removes (-1) one resume_id in the profile's resume_ids set, moving
+    application_count with it. The condition makes a replayed stream batch a no-op.
+    Returns the updated profile, or None when the change was already applied.
+    """
+    try:
+        return profile_table.update_item(
+            Key={'email': email},
+            UpdateExpression=('ADD resume_ids :rid, application_count :delta' if delta > 0
+                              else 'DELETE resume_ids :rid ADD application_count :delta'),
+            ConditionExpression=('attribute_not_exists(resume_ids) OR NOT contains(resume_ids, :id)' if delta > 0
+                                 else 'contains(resume_ids, :id)'),
+            ExpressionAttributeValues={':rid': {resume_id}, ':id': resume_id, ':delta': delta},
+            ReturnValues='ALL_NEW'
+        )['Attributes']
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+    return None
+
+
+def refresh_profile(email, resume_ids, resume_table):
+    """
+    Recomputes a candidate's merged skills, departments, jobs and latest resume from
+    their remaining applications in the hot table, after one was removed. Like a
+    rebuild, archived applications no longer contribute their skills.
+    """
+    resumes = dynamo.batch_get(resume_table, [{'resume_id': resume_id} for resume_id in resume_ids],
+                               **dynamo.projection(RESUME_FIELDS))
+    change = profile_changes([(None, item) for item in resumes],
+                             load_jobs(_job_id(item) for item in resumes)).get(email) or _Change()
+    sets, removes = ['updated_at = :now'], []
+    values = {':now': datetime.utcnow().isoformat()}
+    for field, value in (('skills', change.skills), ('departments', change.departments), ('job_ids', change.job_ids)):
+        if value:
+            sets.append(f"{field} = :{field}")
+            values[f":{field}"] = value
+        else:
+            removes.append(field)
+    if change.latest:
+        sets.append('last_applied = :day, latest_resume_id = :rid, latest_filename = :file')
+        values.update(zip((':day', ':rid', ':file'), change.latest))
+    dynamo.table(PROFILE_TABLE).update_item(
+        Key={'email': email},
+        UpdateExpression='SET ' + ', '.join(sets) + (' REMOVE ' + ', '.join(removes) if removes else ''),
+        ConditionExpression='attribute_exists(email)',
+        ExpressionAttributeValues=values
+    )
+
+
+def apply_profile_changes(changes, resume_table):
+    """
+    Per candidate: one ADD/SET update merging names and sets, one conditional update per
+    added or removed application, and a conditional update that only moves the
+    latest-resume fields forward. Every step is idempotent, so a replayed batch changes
+    nothing. A removal then recomputes the merged fields from the remaining applications.
+    """
+    profile_table = dynamo.table(PROFILE_TABLE)
+    now = datetime.utcnow().isoformat()
+    updated = 0
+    for email, change in changes.items():
+        sets = ['updated_at = :now']
+        adds = []
+        values = {':now': now}
+        for field, value in (('first_name', change.first_name), ('last_name', change.last_name)):
+            if value:
+                sets.append(f"{field} = :{field}")
+                values[f":{field}"] = value
+        for field, value in (('skills', change.skills), ('departments', change.departments),
+                             ('job_ids', change.job_ids)):
+            if value:  # DynamoDB rejects empty sets
+                adds.append(f"{field} :{field}")
+                values[f":{field}"] = value
+
+        if len(sets) > 1 or adds:
+            expression = 'SET ' + ', '.join(sets) + (' ADD ' + ', '.join(adds) if adds else '')
+            profile_table.update_item(Key={'email': email}, UpdateExpression=expression, ExpressionAttributeValues=values)
+        for resume_id in change.resume_ids:
+            _count_application(profile_table, email, resume_id, 1)
+        updated += 1
+
+        if change.latest:
+            day, resume_id, filename = change.latest
+            try:
+                profile_table.update_item(
+                    Key={'email': email},
+                    UpdateExpression='SET last_applied = :day, latest_resume_id = :rid, latest_filename = :file',
+                    ConditionExpression='attribute_not_exists(last_applied) OR last_applied <= :day',
+                    ExpressionAttributeValues={':day': day, ':rid': resume_id, ':file': filename}
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+
+        remaining = None
+        for resume_id in change.removed_ids:
+            profile = _count_application(profile_table, email, resume_id, -1)
+            if profile is not None:
+                remaining = profile.get('resume_ids') or set()
+        if remaining is not None:
+            refresh_profile(email, remaining, resume_table)
+    put_metric("ProfilesUpdated", updated)
+    return updated
+
+
+def rebuild_profiles(resume_table):
+    """Recomputes every profile from the resume table and overwrites the profile table."""
+    resumes = list(dynamo.iter_scan(resume_table, **dynamo.projection(RESUME_FIELDS)))
+    jobs = load_jobs(_job_id(item) for item in resumes)
+    changes = profile_changes([(None, item) for item in resumes], jobs)
+
+    now = datetime.utcnow().isoformat()
+    put_items = []
+    for email, change in changes.items():
+        item = {
+            'email': email,
+            'first_name': change.first_name,
+            'last_name': change.last_name,
+            'skills': change.skills or None,
+            'departments': change.departments or None,
+            'job_ids': change.job_ids or None,
+            'resume_ids': change.resume_ids or None,
+            'application_count': len(change.resume_ids),
+            'updated_at': now,
+        }
+        if change.latest:
+            item['last_applied'], item['latest_resume_id'], item['latest_filename'] = change.latest
+        put_items.append({k: v for k, v in item.items() if v is not None})
+
+    stale_keys = [
+        {'email': item['email']}
+        for item in dynamo.iter_scan(PROFILE_TABLE, **dynamo.projection(('email',)))
+        if item['email'] not in changes
+    ]
+    dynamo.batch_write(PROFILE_TABLE, put_items=put_items, delete_keys=stale_keys)
+    log("Rebuilt candidate profiles", profiles=len(put_items), removed=len(stale_keys))
+    return len(put_items)
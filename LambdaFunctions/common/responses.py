@@ -0,0 +1,101 @@
+import base64
+import gzip
+import json
+import os
+from decimal import Decimal
+
+# Optional speedups: used when bundled in the layer, plain stdlib otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# --- Configuration from Environment Variables ---
+MIN_COMPRESS_BYTES = int(os.environ.get("MIN_COMPRESS_BYTES", "1024"))  # Smaller bodies are not worth the CPU
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "5"))
+
+
+def to_plain(value, drop_none=True):
+    """
+    Converts a DynamoDB result tree to JSON-native types in one pass: Decimals become
+    int/float, sets become lists and (by default) None-valued keys are dropped. The
+    encoder then never needs a per-object default() callback.
+    """
+    if isinstance(value, dict):
+        return {k: to_plain(v, drop_none) for k, v in value.items() if not (drop_none and v is None)}
+    if isinstance(value, (list, tuple, set)):
+        return [to_plain(v, drop_none) for v in value]
+    if isinstance(value, Decimal):
+        return int(value) if value % 1 == 0 else float(value)
+    return value
+
+
+def dumps(payload, drop_none=True):
+    """Compact JSON serialization of a (possibly Decimal-bearing) payload."""
+    data = to_plain(payload, drop_none)
+    if orjson:
+        return orjson.dumps(data).decode('utf-8')
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+
+def _get_header(event, name):
+    for key, value in ((event or {}).get('headers') or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def negotiate_encoding(event):
+    """Picks br or gzip from the request's Accept-Encoding header, honouring q=0 exclusions."""
+    accepted = {}
+    for part in (_get_header(event, 'accept-encoding') or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if not coding:
+            continue
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+
+    if brotli and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def json_response(status_code, payload, event=None, headers=None, drop_none=True):
+    """
+    Builds an API Gateway proxy response with a compact JSON body. When the client
+    accepts it and the body is large enough, the body is br/gzip-compressed and
+    returned base64-encoded.
+    """
+    body = dumps(payload, drop_none)
+    response_headers = {'Content-Type': 'application/json', **(headers or {})}
+
+    encoding = negotiate_encoding(event)
+    if encoding and len(body) >= MIN_COMPRESS_BYTES:
+        raw = body.encode('utf-8')
+        if encoding == 'br':
+            compressed = brotli.compress(raw, quality=BROTLI_QUALITY)
+        else:
+            compressed = gzip.compress(raw, compresslevel=GZIP_LEVEL)
+        response_headers['Content-Encoding'] = encoding
+        response_headers['Vary'] = 'Accept-Encoding'
+        return {
+            'statusCode': status_code,
+            'headers': response_headers,
+            'body': base64.b64encode(compressed).decode('ascii'),
+            'isBase64Encoded': True
+        }
+
+    return {'statusCode': status_code, 'headers': response_headers, 'body': body}
@@ -0,0 +1,92 @@
+import hashlib
+import hmac
+import os
+import time
+from datetime import datetime, timezone
+from urllib.parse import quote
+import boto3
+
+# --- Configuration from Environment Variables ---
+RESUME_BUCKET = os.environ.get("RESUME_BUCKET")
+RESUME_URL_EXPIRY = int(os.environ.get("RESUME_URL_EXPIRY", "900"))  # Every URL handed out stays valid at least this long
+EXPIRY_BUCKET_SECONDS = int(os.environ.get("EXPIRY_BUCKET_SECONDS", "300"))
+REGION = os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION") or "ap-south-1"
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+
+# Credentials are resolved once per container; refreshable role credentials renew themselves
+_credentials = boto3.Session().get_credentials()
+_signing_keys = {}
+_memo = {}
+_memo_bucket = None
+
+
+def _signing_key(secret_key, day):
+    """The derived SigV4 key for one day; reused for every URL signed that day."""
+    cache_key = (secret_key, day)
+    if cache_key not in _signing_keys:
+        _signing_keys.clear()
+        key = ('AWS4' + secret_key).encode('utf-8')
+        for part in (day, REGION, 's3', 'aws4_request'):
+            key = hmac.new(key, part.encode('utf-8'), hashlib.sha256).digest()
+        _signing_keys[cache_key] = key
+    return _signing_keys[cache_key]
+
+
+def _presign(bucket, key, credentials, now, expires_in):
+    """A SigV4 query-string presigned GET, computed locally (the same URL boto3's generate_presigned_url builds)."""
+    amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+    day = amz_date[:8]
+    host = f"{bucket}.s3.{REGION}.amazonaws.com"
+    scope = f"{day}/{REGION}/s3/aws4_request"
+    params = {
+        'X-Amz-Algorithm': ALGORITHM,
+        'X-Amz-Credential': f"{credentials.access_key}/{scope}",
+        'X-Amz-Date': amz_date,
+        'X-Amz-Expires': str(expires_in),
+        'X-Amz-SignedHeaders': 'host',
+    }
+    if credentials.token:
+        params['X-Amz-Security-Token'] = credentials.token
+    query = '&'.join(f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted(params.items()))
+    path = '/' + quote(key, safe='/-_.~')
+
+    canonical_request = f"GET\n{path}\n{query}\nhost:{host}\n\nhost\nUNSIGNED-PAYLOAD"
+    string_to_sign = '\n'.join((ALGORITHM, amz_date, scope, hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()))
+    signature = hmac.new(_signing_key(credentials.secret_key, day), string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+    return f"https://{host}{path}?{query}&X-Amz-Signature={signature}"
+
+
+def resume_urls(keys, bucket=None):
+    """
+    Short-lived GET URLs for many S3 keys at once: {key: url}. Signing is local (no
+    network call) and memoized per container for the current expiry bucket, so the
+    same key read twice within a few minutes is signed once. URLs are signed for
+    RESUME_URL_EXPIRY plus the bucket width, so every URL served stays valid for at
+    least RESUME_URL_EXPIRY.
+    """
+    global _memo_bucket
+    bucket = bucket or RESUME_BUCKET
+    window = int(time.time()) // EXPIRY_BUCKET_SECONDS
+    if window != _memo_bucket:
+        _memo.clear()
+        _memo_bucket = window
+
+    urls = {}
+    pending = [key for key in dict.fromkeys(keys) if key]
+    credentials = None
+    now = None
+    for key in pending:
+        cached = _memo.get((bucket, key))
+        if cached is None:
+            if credentials is None:
+                credentials = _credentials.get_frozen_credentials()
+                now = datetime.now(timezone.utc)
+            cached = _memo[(bucket, key)] = _presign(bucket, key, credentials, now, RESUME_URL_EXPIRY + EXPIRY_BUCKET_SECONDS)
+        urls[key] = cached
+    return urls
+
+
+def resume_url(key, bucket=None):
+    """A short-lived GET URL for one S3 key, or None when the key is missing."""
+    return resume_urls([key], bucket).get(key) if key else None
@@ -0,0 +1,96 @@
+import os
+from collections import Counter
+from boto3.dynamodb.conditions import Key
+from common import dynamo
+from common.instrumentation import log, put_metric
+
+# --- Configuration from Environment Variables ---
+# Table keyed by job_id (partition) and status (sort) holding an applicant_count per pair
+JOB_STATS_TABLE = os.environ.get("JOB_STATS_TABLE")
+
+UNASSIGNED_JOB = "UNASSIGNED"
+UNKNOWN_STATUS = "Not Available"
+
+
+def counter_key(item):
+    """The (job_id, status) pair an application counts towards, or None for a missing image."""
+    if not item:
+        return None
+    job_id = str(item.get('jobId') or '').strip() or UNASSIGNED_JOB
+    return job_id, item.get('status') or UNKNOWN_STATUS
+
+
+def status_deltas(images):
+    """
+    Net counter changes for the (old, new) images of a resume-table stream batch. An insert
+    adds one, a removal subtracts one and a modify only moves the count when jobId or status
+    changed, so text/entity updates from the processor cost nothing.
+    """
+    deltas = Counter()
+    for old, new in images:
+        old_key, new_key = counter_key(old), counter_key(new)
+        if old_key == new_key:
+            continue
+        if old_key:
+            deltas[old_key] -= 1
+        if new_key:
+            deltas[new_key] += 1
+    return deltas
+
+
+def apply_deltas(deltas):
+    """Applies the net changes with one atomic ADD per (job_id, status) pair."""
+    stats_table = dynamo.table(JOB_STATS_TABLE)
+    applied = 0
+    for (job_id, status), delta in deltas.items():
+        if not delta:
+            continue
+        stats_table.update_item(
+            Key={'job_id': job_id, 'status': status},
+            UpdateExpression='ADD applicant_count :d',
+            ExpressionAttributeValues={':d': delta}
+        )
+        applied += 1
+    put_metric("CountersUpdated", applied)
+    return applied
+
+
+def rebuild_counts(resume_table):
+    """
+    Recounts every (job_id, status) pair from the resume table and overwrites the stats
+    table. Used for the initial backfill and to repair drift after a replayed stream batch.
+    """
+    counts = Counter()
+    for item in dynamo.iter_scan(resume_table, **dynamo.projection(('jobId', 'status'))):
+        counts[counter_key(item)] += 1
+
+    stale_keys = [
+        {'job_id': item['job_id'], 'status': item['status']}
+        for item in dynamo.iter_scan(JOB_STATS_TABLE, **dynamo.projection(('job_id', 'status')))
+        if (item['job_id'], item['status']) not in counts
+    ]
+    put_items = [
+        {'job_id': job_id, 'status': status, 'applicant_count': count}
+        for (job_id, status), count in counts.items()
+    ]
+    dynamo.batch_write(JOB_STATS_TABLE, put_items=put_items, delete_keys=stale_keys)
+    log("Rebuilt job stats", pairs=len(put_items), removed=len(stale_keys))
+    return len(put_items)
+
+
+def read_counts(job_id=None):
+    """Per-job applicant totals and status breakdowns, for one job or every job."""
+    if job_id:
+        items = dynamo.iter_query(JOB_STATS_TABLE, KeyConditionExpression=Key('job_id').eq(job_id))
+    else:
+        items = dynamo.iter_scan(JOB_STATS_TABLE)
+
+    jobs = {}
+    for item in items:
+        count = item.get('applicant_count', 0)
+        if count <= 0:
+            continue
+        stats = jobs.setdefault(item['job_id'], {'total': 0, 'statuses': {}})
+        stats['statuses'][item['status']] = count
+        stats['total'] += count
+    return jobs
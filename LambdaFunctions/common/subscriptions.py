@@ -0,0 +1,105 @@
+import os
+import time
+from datetime import datetime
+from boto3.dynamodb.conditions import Key
+from common import dynamo
+from common.analytics import load_jobs
+from common.instrumentation import log, put_metric
+
+# --- Configuration from Environment Variables ---
+# Partition key `topic` ("dept#<department>" / "skill#<skill>"), sort key `email`
+SUBSCRIPTIONS_TABLE = os.environ.get("SUBSCRIPTIONS_TABLE")
+SUBSCRIPTION_MAX_SKILLS = int(os.environ.get("SUBSCRIPTION_MAX_SKILLS", "30"))
+SUBSCRIPTION_TTL_DAYS = int(os.environ.get("SUBSCRIPTION_TTL_DAYS", "365"))  # Same one-year window as the daily digest
+
+
+def department_topic(department):
+    department = str(department or '').strip().lower()
+    return f"dept#{department}" if department else None
+
+
+def skill_topic(skill):
+    skill = str(skill or '').strip().lower() if isinstance(skill, str) else ''
+    return f"skill#{skill}" if skill else None
+
+
+def job_topics(job):
+    """Every topic a job is announced on: its department and each of its skills."""
+    topics = {department_topic(job.get('department'))}
+    topics.update(skill_topic(skill) for skill in job.get('skills') or [])
+    topics.discard(None)
+    return topics
+
+
+def candidate_topics(item, jobs):
+    """
+    The topics an application subscribes its candidate to: the department of the job
+    applied for and the candidate's extracted skills (at most SUBSCRIPTION_MAX_SKILLS).
+    """
+    if not item or not item.get('email'):
+        return set()
+    job = jobs.get(str(item.get('jobId') or '').strip()) or {}
+    topics = {department_topic(job.get('department'))}
+    topics.update(skill_topic(skill) for skill in (item.get('skills') or [])[:SUBSCRIPTION_MAX_SKILLS])
+    topics.discard(None)
+    return topics
+
+
+def subscription_puts(images, jobs):
+    """
+    Index entries for the topics a stream batch adds. Only topics missing from the old
+    image are written, so status changes and re-processing cost nothing; each write
+    refreshes the entry's ttl, letting subscriptions of inactive candidates expire.
+    """
+    expires = int(time.time()) + SUBSCRIPTION_TTL_DAYS * 86400
+    now = datetime.utcnow().isoformat()
+    entries = {}
+    for old, new in images:
+        added = candidate_topics(new, jobs) - candidate_topics(old, jobs)
+        email = (new or {}).get('email', '').strip().lower()
+        for topic in added:
+            entries[(topic, email)] = {
+                'topic': topic,
+                'email': email,
+                'first_name': new.get('first_name') or 'there',
+                'updated_at': now,
+                'ttl': expires,
+            }
+    return list(entries.values())
+
+
+def write_subscriptions(entries):
+    if entries:
+        dynamo.batch_write(SUBSCRIPTIONS_TABLE, put_items=entries)
+    put_metric("SubscriptionsWritten", len(entries))
+    return len(entries)
+
+
+def backfill_subscriptions(resume_table):
+    """Indexes every existing application, for the initial rollout of the index."""
+    resumes = list(dynamo.iter_scan(resume_table, **dynamo.projection(('email', 'first_name', 'jobId', 'skills'))))
+    jobs = load_jobs(str(item.get('jobId') or '').strip() for item in resumes)
+    written = write_subscriptions(subscription_puts([(None, item) for item in resumes], jobs))
+    log("Backfilled subscriptions", resumes=len(resumes), entries=written)
+    return written
+
+
+def find_subscribers(topics):
+    """
+    {email: {'first_name', 'topics'}} for everyone subscribed to any of the topics: one
+    query per topic, so the cost follows the matching subscribers, not the resume table.
+    """
+    now = int(time.time())
+    subscribers = {}
+    for topic in topics:
+        entries = dynamo.iter_query(
+            SUBSCRIPTIONS_TABLE,
+            KeyConditionExpression=Key('topic').eq(topic),
+            **dynamo.projection(('email', 'first_name', 'ttl'))
+        )
+        for entry in entries:
+            if entry.get('ttl') and entry['ttl'] < now:
+                continue  # Expired but not yet removed by TTL
+            subscriber = subscribers.setdefault(entry['email'], {'first_name': entry.get('first_name'), 'topics': set()})
+            subscriber['topics'].add(topic)
+    return subscribers
@@ -1,74 +1,134 @@
-import json
-import boto3
 import os
-from boto3.dynamodb.types import TypeDeserializer
-
-deserializer = TypeDeserializer()
-dynamodb = boto3.client('dynamodb')
-
+from datetime import date, timedelta
+from itertools import islice
+from boto3.dynamodb.conditions import Attr, Key
+from common.dynamo import batch_get, iter_query, iter_scan, projection
+from common.instrumentation import instrument, log, put_metric, timed_stage
+from common.job_aliases import resolve_job_ids
+from common.lexicon import group_entities, skill_match
+from common.locations import RESUME_SORT_KEY, location_query, work_mode_filter
+from common.models import Job, Resume
+from common.responses import json_response
+from common.signing import resume_urls
+
+RESUME_FIELDS = (
+    'resume_id', 'email', 'first_name', 'last_name', 'gender', 'age', 'marks12', 'pass12',
+    'phone', 'grad_marks', 'grad_year', 'skills', 'linkedin', 'status', 'work_pref',
+    'filename', 'address', 'datetime', 'jobId', 'experience', 'entities', 'submitted_at',
+    'duplicate_of',
+)
+RESUME_RECENCY_INDEX = os.environ.get("RESUME_RECENCY_INDEX", "jobId-submitted_at-index")
+MAX_NEWEST = 1000
+
+def newest_applicants(resume_table, params):
+    """
+    ?job_id= reads one job's applicants newest first from the (jobId, submitted_at) GSI,
+    optionally limited to `since` (ISO date/time) or the last `days`, and to `limit` rows.
+    """
+    since = params.get('since')
+    if not since and params.get('days'):
+        since = (date.today() - timedelta(days=int(params['days']))).isoformat()
+    condition = Key('jobId').eq(params['job_id'])
+    if since:
+        condition = condition & Key('submitted_at').gte(since)
+    limit = min(int(params.get('limit') or MAX_NEWEST), MAX_NEWEST)
+    mode_filter = work_mode_filter(params)
+    kwargs = {'FilterExpression': mode_filter} if mode_filter is not None else {}
+    items = iter_query(resume_table, model=Resume, IndexName=RESUME_RECENCY_INDEX, KeyConditionExpression=condition,
+                       ScanIndexForward=False, Limit=limit, **kwargs, **projection(RESUME_FIELDS))
+    return list(islice(items, limit))
+
+def query_resumes(resume_table, params):
+    """
+    Indexed reads: `city`/`region` (plus optional `work_mode` and `job_id`) from the location
+    index, else `job_id` from the recency index, else `work_mode` from the work-mode index.
+    None when the request needs a full read.
+    """
+    if params.get('job_id') and not (params.get('city') or params.get('region')):
+        return newest_applicants(resume_table, params)
+    job_filter = Attr('jobId').eq(params['job_id']) if params.get('job_id') else None
+    located = location_query(resume_table, RESUME_SORT_KEY, params, model=Resume, filter_expression=job_filter,
+                             **projection(RESUME_FIELDS))
+    return located
+
+def collapse_duplicates(resumes):
+    """
+    Drops resumes flagged as near-duplicates of another resume in the same result, so
+    each document is listed once. Of a pair flagged both ways, the lower resume_id stays.
+    """
+    flagged = {resume.resume_id: {d.get('resume_id') for d in resume.duplicate_of or ()} for resume in resumes}
+    kept = [
+        resume for resume in resumes
+        if not any(resume.resume_id not in flagged[rid] or rid < resume.resume_id
+                   for rid in flagged[resume.resume_id] & flagged.keys())
+    ]
+    put_metric("DuplicatesCollapsed", len(resumes) - len(kept))
+    return kept
+
+@instrument("getResumeEntities")
 def lambda_handler(event, context):
     resume_table = os.environ.get("DDB1_NAME")  # Resume metadata table
     job_table = os.environ.get("DDB2_NAME")      # Job posting metadata table
 
-    # Fetch all resumes
-    response = dynamodb.scan(TableName=resume_table)
-    results = []
-
-    for item in response.get('Items', []):
-        resume_data = {k: deserializer.deserialize(v) for k, v in item.items()}
-        entities = resume_data.get('entities', [])
-        resume_skills = resume_data.get("skills", [])
-
-        # Normalize resume skills (to lowercase for matching)
-        resume_skills_set = set([s.lower() for s in resume_skills if isinstance(s, str)])
-
-        # Classify entities
-        grouped = {
-            "PERSON": [],
-            "LOCATION": [],
-            "ORGANIZATION": [],
-            "DATE": []
-        }
+    # Location and job filters come from the GSIs; otherwise fetch all resumes
+    # (every page, only the attributes we return)
+    params = (event or {}).get('queryStringParameters') or {}
+    try:
+        with timed_stage("ResumeQuery"):
+            resumes = query_resumes(resume_table, params)
+    except ValueError:
+        return json_response(400, {"error": "days and limit must be numbers"}, event,
+                             headers={"Access-Control-Allow-Origin": "*"})
+    if resumes is None:
+        with timed_stage("ResumeScan"):
+            resumes = list(iter_scan(resume_table, model=Resume, **projection(RESUME_FIELDS)))
+    put_metric("ResumesScanned", len(resumes))
+    if params.get('collapse_duplicates', '').lower() in ('1', 'true', 'yes'):
+        resumes = collapse_duplicates(resumes)
+
+    # Fetch every referenced job once, in batches, instead of one get_item per resume
+    job_ids = {str(resume.jobId).strip() for resume in resumes if resume.jobId}
+    jobs_by_id = {}
+    try:
+        with timed_stage("JobLookup"):
+            jobs = batch_get(job_table, [{'job_id': job_id} for job_id in job_ids], model=Job,
+                             **projection(('job_id', 'department', 'skills')))
+        jobs_by_id = {job.job_id: job for job in jobs}
+
+        # Jobs whose department changed live under a new ID; resolve the old IDs through the
+        # alias table until the background migration has rewritten those applicants
+        missing = job_ids - jobs_by_id.keys()
+        if missing:
+            aliases = resolve_job_ids(missing)
+            moved_jobs = batch_get(job_table, [{'job_id': new_id} for new_id in set(aliases.values())], model=Job,
+                                   **projection(('job_id', 'department', 'skills')))
+            moved_by_id = {job.job_id: job for job in moved_jobs}
+            jobs_by_id.update({old_id: moved_by_id[new_id] for old_id, new_id in aliases.items() if new_id in moved_by_id})
+        log("Fetched job metadata", level="DEBUG", requested=len(job_ids), found=len(jobs_by_id))
+    except Exception as e:
+        log("Failed to get job metadata", level="WARNING", error=str(e))
+
+    # Short-lived download links for the whole page, signed locally in one pass
+    with timed_stage("UrlSigning"):
+        urls = resume_urls(resume.filename for resume in resumes)
 
-        for ent in entities:
-            entity = ent if isinstance(ent, dict) else {}
-            text = entity.get("Text")
-            typ = entity.get("Type")
-            if text and typ and typ in grouped:
-                if text not in grouped[typ]:
-                    grouped[typ].append(text)
+    results = []
 
+    for resume_data in resumes:
         # Job data fetch
         job_id = resume_data.get("jobId")
         department = None
         job_skills = []
 
         if job_id:
-            try:
-                job_id_cleaned = str(job_id).strip()
-                print(f"Fetching job metadata for jobId: '{job_id_cleaned}'")
-
-                job_response = dynamodb.get_item(
-                    TableName=job_table,
-                    Key={'job_id': {'S': job_id_cleaned}}
-                )
-
-                job_item = job_response.get('Item')
-                print("Raw job_item from DynamoDB:", job_item)
-
-                if job_item:
-                    job_data = {k: deserializer.deserialize(v) for k, v in job_item.items()}
-                    department = job_data.get('department')
-                    job_skills = job_data.get('skills', [])
-            except Exception as e:
-                print(f"Failed to get job metadata for jobId {job_id}: {str(e)}")
-
-        # Normalize job skills
-        job_skills_set = set([s.lower() for s in job_skills if isinstance(s, str)])
+            job_data = jobs_by_id.get(str(job_id).strip())
+            if job_data:
+                job_id = job_data.job_id  # The current ID, if the job has moved
+                department = job_data.department
+                job_skills = job_data.skills or []
 
-        # Skill match logic
-        matched_skills = list(resume_skills_set & job_skills_set)
-        match_percentage = (len(matched_skills) / len(job_skills_set)) * 100 if job_skills_set else 0
+        # Skill match logic (case-insensitive)
+        resume_skills, matched_skills, match_percentage = skill_match(resume_data.get("skills"), job_skills)
 
         # Append result
         results.append({
@@ -83,26 +143,21 @@ def lambda_handler(event, context):
             "phone": resume_data.get("phone"),
             "grad_marks": resume_data.get("grad_marks"),
             "grad_year": resume_data.get("grad_year"),
-            "skills": list(resume_skills_set),
+            "skills": resume_skills,
             "matched_skills": matched_skills,
-            "match_percentage": round(match_percentage, 2),
+            "match_percentage": match_percentage,
             "linkedin": resume_data.get("linkedin"),
             "status": resume_data.get("status"),
             "work_pref": resume_data.get("work_pref"),
-            "resume_url": resume_data.get("resume_url"),
+            "resume_url": urls.get(resume_data.filename),
             "address": resume_data.get("address"),
             "datetime": resume_data.get("datetime"),
+            "submitted_at": resume_data.get("submitted_at"),
+            "duplicate_of": resume_data.get("duplicate_of") or [],
             "jobId": job_id,
             "experience": resume_data.get("experience"),
             "department": department,
-            "entities": grouped,
+            "entities": group_entities(resume_data.get('entities')),
         })
 
-    return {
-        "statusCode": 200,
-        "body": json.dumps(results),
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*"
-        }
-    }
\ No newline at end of file
+    return json_response(200, results, event, headers={"Access-Control-Allow-Origin": "*"})
\ No newline at end of file
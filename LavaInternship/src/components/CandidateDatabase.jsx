@@ -20,6 +20,10 @@ const formatGender = (genderCode) => {
     return 'N/A';
 };
 
+const EXPORT_API = 'https://k2kqvumlg6.execute-api.ap-south-1.amazonaws.com/exportCandidates';
+const EXPORT_POLL_MS = 3000;
+const EXPORT_TIMEOUT_MS = 15 * 60 * 1000; // Give up polling an export that never finishes
+
 const CandidateDatabase = () => {
     const [allCandidates, setAllCandidates] = useState([]);
     const [filteredCandidates, setFilteredCandidates] = useState([]);
@@ -35,6 +39,8 @@ const CandidateDatabase = () => {
     });
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
+    const [exporting, setExporting] = useState(false);
+    const [exportError, setExportError] = useState(null);
 
     useEffect(() => {
         const fetchCandidates = async () => {
@@ -100,6 +106,41 @@ const CandidateDatabase = () => {
         });
     };
 
+    // The export is built server-side from the same filters; the browser only polls for the download link
+    const exportCandidates = async () => {
+        setExporting(true);
+        setExportError(null);
+        try {
+            const { data } = await axios.post(EXPORT_API, {
+                format: 'csv',
+                filters: {
+                    search: filters.search,
+                    gender: filters.gender,
+                    department: filters.jobType,
+                    experience: filters.experience
+                }
+            });
+            let result = data;
+            const deadline = Date.now() + EXPORT_TIMEOUT_MS;
+            while (result.status === 'running') {
+                if (Date.now() > deadline) {
+                    throw new Error('Export is taking too long, please try again later');
+                }
+                await new Promise(resolve => setTimeout(resolve, EXPORT_POLL_MS));
+                ({ data: result } = await axios.get(EXPORT_API, { params: { export_id: data.export_id } }));
+            }
+            if (result.status !== 'ready') {
+                throw new Error(result.error || 'Export failed');
+            }
+            window.location.href = result.url;
+        } catch (err) {
+            console.error("Error exporting candidates:", err);
+            setExportError("Failed to export candidates.");
+        } finally {
+            setExporting(false);
+        }
+    };
+
     return (
         <div className="h-screen w-full flex flex-col bg-[#dda5a5] font-['Segoe_UI']">
             <Navbar />
@@ -167,7 +208,16 @@ const CandidateDatabase = () => {
                                         ))}
                                     </select>
                                 </div>
-                                <div className="lg:col-start-5">
+                                <div className="lg:col-start-4">
+                                    <button
+                                        onClick={exportCandidates}
+                                        disabled={exporting}
+                                        className="w-full px-6 py-2 bg-[#264143] text-white rounded-lg hover:bg-[#1b2f30] transition-colors font-semibold disabled:opacity-60"
+                                    >
+                                        {exporting ? 'Exporting...' : 'Export CSV'}
+                                    </button>
+                                </div>
+                                <div>
                                     <button
                                         onClick={resetFilters}
                                         className="w-full px-6 py-2 bg-gray-200 text-gray-700 rounded-lg hover:bg-gray-300 transition-colors font-semibold"
@@ -176,6 +226,7 @@ const CandidateDatabase = () => {
                                     </button>
                                 </div>
                             </div>
+                            {exportError && <p className="text-red-500 mt-4">{exportError}</p>}
                         </div>
 
                         <div className="mb-4 text-lg font-semibold text-gray-800">
@@ -198,6 +249,7 @@ const CandidateDatabase = () => {
                                             <th className="px-6 py-4 text-left text-sm font-semibold text-gray-700 uppercase tracking-wider">Age</th>
                                             <th className="px-6 py-4 text-left text-sm font-semibold text-gray-700 uppercase tracking-wider">Status</th>
                                             <th className="px-6 py-4 text-left text-sm font-semibold text-gray-700 uppercase tracking-wider">Submitted At</th>
+                                            <th className="px-6 py-4 text-left text-sm font-semibold text-gray-700 uppercase tracking-wider">Resume</th>
                                         </tr>
                                     </thead>
                                     <tbody className="bg-white divide-y divide-gray-200">
@@ -214,6 +266,12 @@ const CandidateDatabase = () => {
                                                 <td className="px-6 py-4 whitespace-nowrap text-gray-600">
                                                     {candidate.datetime && parseCandidateDate(candidate.datetime) ? parseCandidateDate(candidate.datetime).toLocaleDateString() : 'N/A'}
                                                 </td>
+                                                <td className="px-6 py-4 whitespace-nowrap text-gray-600">
+                                                    {/* Short-lived link signed by the API on every load */}
+                                                    {candidate.resume_url ? (
+                                                        <a href={candidate.resume_url} target="_blank" rel="noopener noreferrer" className="text-blue-600 hover:underline">View</a>
+                                                    ) : 'N/A'}
+                                                </td>
                                             </tr>
                                         ))}
                                     </tbody>
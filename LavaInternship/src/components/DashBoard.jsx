@@ -9,6 +9,7 @@ import {
 } from 'recharts';
 import Navbar from './Navbar';
 
+const ANALYTICS_API = 'https://k2kqvumlg6.execute-api.ap-south-1.amazonaws.com/analytics'; // GetDashboardAnalyticsFunction: daily rollup aggregates
 const COLORS = ['#264143', '#DE5499', '#E99F4C', '#4ECDC4', '#45B7D1', '#96CEB4'];
 
 const HRDashboard = () => {
@@ -64,37 +65,13 @@ const HRDashboard = () => {
     return new Date(year, month - 1, day);
   };
 
-  // --- UPDATED LOGIC FOR PIE CHARTS ---
-  // This function now filters data for the last 30 days before calculating stats for pie charts.
-  const processStats = (data) => {
-    const thirtyDaysAgo = new Date();
-    thirtyDaysAgo.setDate(thirtyDaysAgo.getDate() - 30);
+  const toChartData = (counts) => Object.entries(counts || {}).map(([name, value]) => ({ name, value }));
 
-    const recentData = data.filter(candidate => {
-      const candidateDate = parseCandidateDate(candidate.datetime);
-      return candidateDate && candidateDate >= thirtyDaysAgo;
-    });
-
-    const departmentCount = recentData.reduce((acc, curr) => {
-      const dept = curr.department || 'Unknown';
-      acc[dept] = (acc[dept] || 0) + 1;
-      return acc;
-    }, {});
-    setDepartmentData(Object.entries(departmentCount).map(([name, value]) => ({ name, value })));
-
-    const genderCount = recentData.reduce((acc, curr) => {
-      const gender = curr.gender || 'Unknown';
-      acc[gender] = (acc[gender] || 0) + 1;
-      return acc;
-    }, {});
-    setGenderData(Object.entries(genderCount).map(([name, value]) => ({ name, value })));
-
-    const statusCount = recentData.reduce((acc, curr) => {
-      const status = curr.status || 'Not Available';
-      acc[status] = (acc[status] || 0) + 1;
-      return acc;
-    }, {});
-    setStatusData(Object.entries(statusCount).map(([name, value]) => ({ name, value })));
+  // Pie charts come from the server-side rollups for the last 30 days
+  const processStats = (analytics) => {
+    setDepartmentData(toChartData(analytics.by_department));
+    setGenderData(toChartData(analytics.by_gender));
+    setStatusData(toChartData(analytics.by_status));
   };
 
   const extractFilterOptions = (data) => {
@@ -112,8 +89,8 @@ const HRDashboard = () => {
     });
   };
 
-  // This function remains unchanged for the bar chart logic.
-  const processSubmissionStats = (data) => {
+  // Bar chart buckets are summed from the daily rollups of the last 90 days
+  const processSubmissionStats = (daily) => {
     const now = new Date();
     const oneWeekAgo = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000);
     const twoWeeksAgo = new Date(now.getTime() - 14 * 24 * 60 * 60 * 1000);
@@ -122,14 +99,13 @@ const HRDashboard = () => {
 
     const submissions = { lastWeek: 0, lastTwoWeeks: 0, lastMonth: 0, lastThreeMonths: 0 };
 
-    data.forEach(candidate => {
-      const candidateDate = parseCandidateDate(candidate.datetime);
-      if (!candidateDate) return;
+    daily.forEach(({ day, applications }) => {
+      const dayDate = new Date(`${day}T00:00:00`);
 
-      if (candidateDate >= oneWeekAgo) submissions.lastWeek++;
-      else if (candidateDate >= twoWeeksAgo) submissions.lastTwoWeeks++;
-      else if (candidateDate >= oneMonthAgo) submissions.lastMonth++;
-      else if (candidateDate >= threeMonthsAgo) submissions.lastThreeMonths++;
+      if (dayDate >= oneWeekAgo) submissions.lastWeek += applications;
+      else if (dayDate >= twoWeeksAgo) submissions.lastTwoWeeks += applications;
+      else if (dayDate >= oneMonthAgo) submissions.lastMonth += applications;
+      else if (dayDate >= threeMonthsAgo) submissions.lastThreeMonths += applications;
     });
 
     const chartData = [
@@ -178,12 +154,24 @@ const HRDashboard = () => {
   };
 
   useEffect(() => {
+    // Charts load from the cheap rollup endpoint and render without waiting for the candidate list
+    const fetchAnalytics = async () => {
+      try {
+        const [recent, quarter] = await Promise.all([
+          axios.get(ANALYTICS_API, { params: { days: 30 } }),
+          axios.get(ANALYTICS_API, { params: { days: 90 } })
+        ]);
+        processStats(recent.data);
+        processSubmissionStats(quarter.data.daily || []);
+      } catch (err) {
+        console.error("❌ Error fetching dashboard analytics:", err);
+      }
+    };
+
     const fetchCandidates = async () => {
       try {
         const { data } = await axios.get('https://k2kqvumlg6.execute-api.ap-south-1.amazonaws.com/getResume');
         setCandidates(data);
-        processStats(data); // This will now process stats for the last 30 days for pie charts
-        processSubmissionStats(data); // This remains unchanged for the bar chart
         extractFilterOptions(data);
         const initialFiltered = data.filter(c => c.status !== "Rejected");
         setFilteredCandidates(initialFiltered);
@@ -192,6 +180,7 @@ const HRDashboard = () => {
       }
     };
 
+    fetchAnalytics();
     fetchCandidates();
   }, []);
 
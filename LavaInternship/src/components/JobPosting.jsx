@@ -68,25 +68,12 @@ const JobPostingForm = () => {
                 status: 'Active'
             };
 
-            // 1. Post the job to your primary database
+            // Post the job to your primary database
             await axios.post('https://7otecyotv1.execute-api.ap-south-1.amazonaws.com/PostJob', processedData);
 
+            // JobPostingFunction publishes a JobsPosted event; matching candidates are notified from there
             console.log('Job posted successfully to the database.');
 
-            // 2. **NEW: Trigger the email notification Lambda**
-            try {
-                // **IMPORTANT: REPLACE** with your new email notification Lambda's API Gateway URL
-                const NOTIFICATION_LAMBDA_URL = "https://YOUR-NEW-API-GATEWAY-URL.execute-api.ap-south-1.amazonaws.com/default/sendJobNotification";
-                
-                await axios.post(NOTIFICATION_LAMBDA_URL, processedData);
-                console.log('Successfully triggered email notifications to candidates.');
-
-            } catch (emailError) {
-                // This catch block ensures that if the email notification fails,
-                // it won't prevent the rest of the success logic from running.
-                console.error('Could not send notification emails:', emailError);
-            }
-
             setSubmitSuccess(true);
             setTimeout(() => {
                 setSubmitSuccess(false);
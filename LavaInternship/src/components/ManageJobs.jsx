@@ -6,7 +6,7 @@ import { X } from 'lucide-react';
 
 // Live API Endpoints
 const GET_JOBS_API = 'https://4vj8gtysxi.execute-api.ap-south-1.amazonaws.com/JobListings';
-const GET_RESUMES_API = 'https://k2kqvumlg6.execute-api.ap-south-1.amazonaws.com/getResume';
+const GET_JOB_STATS_API = 'https://4vj8gtysxi.execute-api.ap-south-1.amazonaws.com/jobstats'; // GetJobStatsFunction: materialized applicant counters
 const UPDATE_JOB_API = 'https://jd8992ps66.execute-api.ap-south-1.amazonaws.com/updatejobstatus';
 
 // --- Job Edit Modal Component ---
@@ -153,18 +153,17 @@ const ManageJobs = () => {
         setLoading(true);
         setError(null);
         try {
-            const [jobsResponse, resumesResponse] = await Promise.all([
-                axios.get(GET_JOBS_API),
-                axios.get(GET_RESUMES_API)
-            ]);
-            const resumes = resumesResponse.data;
-            const submissionCounts = resumes.reduce((acc, resume) => {
-                if (resume.jobId) acc[resume.jobId] = (acc[resume.jobId] || 0) + 1;
-                return acc;
-            }, {});
+            // The counts are optional: a stats failure shows zeros instead of hiding the job list
+            const statsRequest = axios.get(GET_JOB_STATS_API)
+                .then(response => response.data.jobs || {})
+                .catch(err => {
+                    console.error("Error fetching job stats:", err);
+                    return {};
+                });
+            const [jobsResponse, jobStats] = await Promise.all([axios.get(GET_JOBS_API), statsRequest]);
             const rawJobData = jobsResponse.data.data;
             const flattenedJobs = Object.values(rawJobData).flat();
-            const jobsWithCounts = flattenedJobs.map(job => ({ ...job, submissionCount: submissionCounts[job.job_id] || 0 }));
+            const jobsWithCounts = flattenedJobs.map(job => ({ ...job, submissionCount: jobStats[job.job_id]?.total || 0, statusCounts: jobStats[job.job_id]?.statuses || {} }));
             const sortedJobs = jobsWithCounts.sort((a, b) => new Date(b.postedDate) - new Date(a.postedDate));
             setJobs(sortedJobs);
             setFilteredJobs(sortedJobs);
@@ -118,6 +118,29 @@ const ReviewerPage = () => {
                         )}
                     </div>
 
+                    {/* Job Context */}
+                    {candidate.job && (
+                        <div className="bg-[#f6eaea] rounded-lg p-4">
+                            <h3 className="font-semibold text-[#264143] mb-1">Applied For: {candidate.job.jobTitle}</h3>
+                            {candidate.job.skills?.length > 0 && (
+                                <div className="flex flex-wrap gap-2 mt-2">
+                                    {candidate.job.skills.map((skill, idx) => (
+                                        <span key={idx} className="border border-[#264143] text-[#264143] text-xs px-2 py-1 rounded-full">
+                                            {skill}
+                                        </span>
+                                    ))}
+                                </div>
+                            )}
+                            {candidate.job.requirements?.length > 0 && (
+                                <ul className="list-disc list-inside text-sm text-gray-600 mt-3 space-y-1">
+                                    {candidate.job.requirements.map((requirement, idx) => (
+                                        <li key={idx}>{requirement}</li>
+                                    ))}
+                                </ul>
+                            )}
+                        </div>
+                    )}
+
                     {/* Skills */}
                     <div>
                         <h3 className="font-semibold text-[#264143] mb-2">Skills</h3>
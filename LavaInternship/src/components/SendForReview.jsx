@@ -30,7 +30,8 @@ const SendForReview = ({ candidate }) => {
                 reviewer_email: reviewerEmail,
                 cc_emails: ccEmailsArray, // Pass the CC emails to the API
                 candidate_name: `${candidate.first_name} ${candidate.last_name}`,
-                department: candidate.department
+                department: candidate.department,
+                job_id: candidate.jobId
             });
 
             setMessage({ type: 'success', text: response.data.message || 'Review link sent successfully!' });
@@ -4,6 +4,11 @@ import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import Navbar from './Navbar'; // Assuming you have a Navbar component
 
+// --- Configuration ---
+const POST_JOB_API = 'https://7otecyotv1.execute-api.ap-south-1.amazonaws.com/PostJob';
+// ParseJobPdfFunction, on the same API as PostJob (with multipart/form-data as a binary media type)
+const PARSE_JOB_PDF_API = 'https://7otecyotv1.execute-api.ap-south-1.amazonaws.com/parse-job-pdf';
+
 // Helper icon for the upload box
 const UploadIcon = () => (
     <svg className="w-12 h-12 mx-auto text-gray-400" stroke="currentColor" fill="none" viewBox="0 0 48 48" aria-hidden="true">
@@ -11,6 +16,14 @@ const UploadIcon = () => (
     </svg>
 );
 
+// Lists become comma- or newline-separated text, matching how onSubmit splits them again
+const toFormValues = (job) => ({
+    ...job,
+    skills: (job.skills || []).join(', '),
+    requirements: (job.requirements || []).join('\n'),
+    responsibilities: (job.responsibilities || []).join('\n'),
+});
+
 const ImportJob = () => {
     const [isParsing, setIsParsing] = useState(false);
     const [isSubmitting, setIsSubmitting] = useState(false);
@@ -80,19 +93,14 @@ const ImportJob = () => {
         formData.append('jobPdf', file);
 
         try {
-            // **IMPORTANT**: You need to create this backend endpoint.
-            // It should accept a PDF, process it with Textract, and return structured JSON.
-            const PARSE_API_URL = "https://YOUR-API-GATEWAY-URL/parse-job-pdf";
-            
-            const response = await axios.post(PARSE_API_URL, formData, {
+            const response = await axios.post(PARSE_JOB_PDF_API, formData, {
                 headers: {
                     'Content-Type': 'multipart/form-data',
                 },
             });
             
-            // The backend should ideally return data that matches the form structure
-            // e.g., { jobTitle: "Software Engineer", skills: "React, Node.js", ... }
-            setParsedData(response.data);
+            // The backend returns the JobPostingFunction schema; the form edits lists as text
+            setParsedData(toFormValues(response.data.job));
 
         } catch (error) {
             console.error('Error parsing PDF:', error);
@@ -120,7 +128,7 @@ const ImportJob = () => {
                 status: 'Active'
             };
 
-            await axios.post('https://7otecyotv1.execute-api.ap-south-1.amazonaws.com/PostJob', processedData);
+            await axios.post(POST_JOB_API, processedData);
 
             setSubmitSuccess(true);
             setTimeout(() => {
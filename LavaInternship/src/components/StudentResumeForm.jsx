@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import { useSearchParams, useNavigate } from "react-router-dom";
 
 const StudentResumeForm = () => {
@@ -19,6 +19,8 @@ const StudentResumeForm = () => {
     "https://70vamjew18.execute-api.ap-south-1.amazonaws.com/upload-url";
   const [toastVisible, setToastVisible] = useState(false);
   const [errors, setErrors] = useState({});
+  // One key per distinct submission: a double-click or retry of the same form reuses it
+  const submission = useRef({ payload: null, key: null });
 
   // Validation functions
   const validateEmail = (email) => /^[^\s@]+@[^\s@]+\.[^\s@]+$/.test(email);
@@ -36,12 +38,12 @@ const StudentResumeForm = () => {
       };
     }
     const sizeInMB = file.size / (1024 * 1024);
-    if (sizeInMB > 3) {
+    if (sizeInMB > 10) {
       return {
         valid: false,
         message: `File size is ${sizeInMB.toFixed(
           2
-        )} MB. Maximum allowed is 3 MB`,
+        )} MB. Maximum allowed is 10 MB`,
       };
     }
     return { valid: true, message: "" };
@@ -105,6 +107,41 @@ const StudentResumeForm = () => {
     validateField("resume", null, file);
   };
 
+  // Uploads each part to its presigned URL (retrying a failed part on its own), then completes the upload
+  const uploadInParts = async (file, result) => {
+    const { upload_id, part_size, part_urls } = result.multipart;
+    const parts = [];
+    for (let i = 0; i < part_urls.length; i++) {
+      const chunk = file.slice(i * part_size, (i + 1) * part_size);
+      let partRes = null;
+      for (let attempt = 0; attempt < 3 && !partRes?.ok; attempt++) {
+        try {
+          partRes = await fetch(part_urls[i], { method: "PUT", body: chunk });
+        } catch (err) {
+          console.warn(`Retrying part ${i + 1}:`, err);
+        }
+      }
+      if (!partRes?.ok) throw new Error(`Failed to upload part ${i + 1}`);
+      parts.push({ PartNumber: i + 1, ETag: partRes.headers.get("ETag") });
+    }
+
+    // A 503 leaves the uploaded parts in place, so completing can simply be retried
+    let completeRes = null;
+    for (let attempt = 0; attempt < 3 && (!completeRes || completeRes.status === 503); attempt++) {
+      completeRes = await fetch(apiEndpoint, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+          action: "complete_upload",
+          s3_key: result.s3_key,
+          upload_id,
+          parts,
+        }),
+      });
+    }
+    if (!completeRes.ok) throw new Error("Failed to complete upload");
+  };
+
   const handleSubmit = async (e) => {
     e.preventDefault();
 
@@ -135,6 +172,7 @@ const StudentResumeForm = () => {
       linkedIn: e.target.linkedIn.value.trim(),
       address: e.target.address.value.trim(),
       resume: file?.name || "",
+      resumeSize: file?.size || 0,
       jobId: jobInfo.jobId,
       jobTitle: jobInfo.jobTitle,
       submittedAt: submittedAt,
@@ -162,28 +200,50 @@ const StudentResumeForm = () => {
       return;
     }
 
+    const { submittedAt: _, ...payload } = formData;
+    const payloadKey = JSON.stringify(payload);
+    if (submission.current.payload !== payloadKey) {
+      submission.current = { payload: payloadKey, key: crypto.randomUUID() };
+    }
+
     try {
       const res = await fetch(apiEndpoint, {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: {
+          "Content-Type": "application/json",
+          "Idempotency-Key": submission.current.key,
+        },
         body: JSON.stringify(formData),
       });
 
       const result = await res.json();
       if (!res.ok) throw new Error(result.error || "Upload failed");
-      if (!result.upload_url) throw new Error("No upload URL received");
-
-      await fetch(result.upload_url, {
-        method: "PUT",
-        headers: { "Content-Type": file.type },
-        body: file,
-      });
+      if (result.already_uploaded) {
+        // A retry of a submission whose resume already arrived; nothing left to upload
+      } else if (result.multipart) {
+        await uploadInParts(file, result);
+      } else {
+        if (!result.upload_url) throw new Error("No upload URL received");
+
+        // S3 enforces the size limit and content type from the POST policy
+        const uploadForm = new FormData();
+        Object.entries(result.upload_fields).forEach(([key, value]) =>
+          uploadForm.append(key, value)
+        );
+        uploadForm.append("file", file);
+        const uploadRes = await fetch(result.upload_url, {
+          method: "POST",
+          body: uploadForm,
+        });
+        if (!uploadRes.ok) throw new Error("Resume upload was rejected");
+      }
 
       setToastVisible(true);
       setTimeout(() => setToastVisible(false), 3000);
       localStorage.removeItem("applicationJobId");
       localStorage.removeItem("applicationJobTitle");
       e.target.reset();
+      submission.current = { payload: null, key: null };
       setErrors({});
     } catch (err) {
       console.error("🚨 Submission error:", err);
@@ -485,7 +545,7 @@ const StudentResumeForm = () => {
             {/* Resume Upload */}
             <div className="md:col-span-2">
               <label className="block font-semibold text-gray-700 mb-1">
-                Upload Resume (PDF/DOC, Max 3MB) *
+                Upload Resume (PDF/DOC, Max 10MB) *
               </label>
               <input
                 type="file"
@@ -501,7 +561,7 @@ const StudentResumeForm = () => {
                 <p className="text-red-500 text-xs mt-1">{errors.resume}</p>
               ) : (
                 <p className="text-xs text-gray-600 mt-1">
-                  Only PDF, DOC, or DOCX files under 3MB are allowed.
+                  Only PDF, DOC, or DOCX files under 10MB are allowed.
                 </p>
               )}
             </div>
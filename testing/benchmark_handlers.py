@@ -0,0 +1,620 @@
+"""
+Benchmark harness for the Lambda handlers.
+
+Runs each lambda_handler in-process against local stand-ins (moto for DynamoDB, S3, SQS,
+SNS and Secrets Manager, fakes for Textract and Comprehend, and an in-memory SMTP
+sink) over a synthetic candidate pool, then reports p50/p95/p99 latency, DynamoDB
+calls, consumed capacity, response bytes and peak memory per handler.
+
+Usage:
+    pip install "moto[all]" boto3 PyJWT pypdf
+    python testing/benchmark_handlers.py --scale 10k
+    python testing/benchmark_handlers.py --scale 10k --save-baseline
+    python testing/benchmark_handlers.py --scale 10k --handlers getResumeEntities DailyJobRecommendationsFunction
+
+Pass --dynamodb-endpoint http://localhost:8000 to run DynamoDB calls against
+DynamoDB Local instead of moto. Comparing against the saved baseline exits with
+status 1 when any metric regresses by more than --tolerance.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import base64
+import importlib
+import smtplib
+import tracemalloc
+import contextlib
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# --- Configuration ---
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "LambdaFunctions")
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+RESUME_TABLE = "bench-resumes"
+JOB_TABLE = "bench-jobs"
+TOKEN_TABLE = "bench-review-tokens"
+JOB_STATS_TABLE = "bench-job-stats"
+ANALYTICS_TABLE = "bench-analytics"
+SUBSCRIPTIONS_TABLE = "bench-subscriptions"
+NOTIFICATION_CAPS_TABLE = "bench-notification-caps"
+PROFILE_TABLE = "bench-candidate-profiles"
+DUPLICATE_INDEX_TABLE = "bench-duplicate-index"
+BUCKET = "bench-resume-bucket"
+JWT_SECRET_NAME = "bench-jwt-secret"
+JWT_SECRET = "benchmark-secret-used-only-for-local-runs"
+
+SCALES = {"1k": 1000, "10k": 10000, "100k": 100000}
+DEPARTMENTS = ["Engineering", "Marketing", "Sales", "Finance", "Design", "Operations"]
+SKILLS = ["python", "java", "react", "aws", "sql", "excel", "figma", "seo", "negotiation",
+          "docker", "kubernetes", "tableau", "communication", "leadership", "node.js", "git"]
+STATUSES = ["Uploaded", "Under Review", "Advanced by HOD", "Advanced for Interview", "Rejected"]
+CITIES = ["Noida", "Mumbai", "Bengaluru", "Pune", "Hyderabad", "Delhi"]
+
+# Defaults every handler expects at import time
+BASE_ENV = {
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_SESSION_TOKEN": "testing",
+    "AWS_DEFAULT_REGION": "ap-south-1",
+    "METRICS_SAMPLE_RATE": "1.0",
+    "LOG_SAMPLE_RATE": "0",
+    "SMTP_HOST": "localhost",
+    "SMTP_PORT": "587",
+    "SMTP_USER": "bench",
+    "SMTP_PASSWORD": "bench",
+    "SMTP_EMAIL": "hr@example.com",
+    "SENDER_EMAIL": "hr@example.com",
+    "APP_PASS": "bench",
+    "JOB_LISTINGS_URL": "http://localhost:5173/job-listings",
+    "FRONTEND_REVIEW_URL": "http://localhost:5173/review",
+    "JOB_STATS_TABLE": JOB_STATS_TABLE,
+    "ANALYTICS_TABLE": ANALYTICS_TABLE,
+    "JOB_TABLE": JOB_TABLE,
+    "SUBSCRIPTIONS_TABLE": SUBSCRIPTIONS_TABLE,
+    "NOTIFICATION_CAPS_TABLE": NOTIFICATION_CAPS_TABLE,
+    "RESUME_BUCKET": BUCKET,
+    "PROFILE_TABLE": PROFILE_TABLE,
+}
+
+
+# --- Local stand-ins ---
+class SmtpSink:
+    """Drop-in for smtplib.SMTP that accepts every message and only counts it."""
+    messages = 0
+    bytes_sent = 0
+
+    def __init__(self, host=None, port=None, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def starttls(self, *args, **kwargs):
+        pass
+
+    def login(self, *args, **kwargs):
+        pass
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        SmtpSink.messages += 1
+        SmtpSink.bytes_sent += len(msg)
+
+    def send_message(self, msg, *args, **kwargs):
+        self.sendmail(None, None, msg.as_string())
+
+    def quit(self):
+        pass
+
+
+class FakeTextract:
+    """Returns a single synthetic LINE block; only reached for PDFs without a text layer."""
+    class exceptions:
+        class UnsupportedDocumentException(Exception):
+            pass
+
+    def detect_document_text(self, Document):
+        return {"Blocks": [{"BlockType": "LINE", "Text": "Synthetic OCR line"}], "DocumentMetadata": {"Pages": 1}}
+
+
+class FakeComprehend:
+    """Deterministic stand-in for the three Comprehend calls the processor makes."""
+    def detect_dominant_language(self, Text):
+        return {"Languages": [{"LanguageCode": "en", "Score": 0.99}]}
+
+    def detect_entities(self, Text, LanguageCode):
+        words = Text.split()
+        return {"Entities": [{"Text": w, "Type": "ORGANIZATION", "Score": 0.9} for w in words[:10:3]]}
+
+    def detect_key_phrases(self, Text, LanguageCode):
+        return {"KeyPhrases": [{"Text": s, "Score": 0.9} for s in SKILLS if s in Text.lower()]}
+
+
+class FakeContext:
+    def __init__(self, function_name):
+        self.function_name = function_name
+        self.aws_request_id = str(uuid.uuid4())
+
+    def get_remaining_time_in_millis(self):
+        return 900000
+
+
+# --- Synthetic Data Generators ---
+def generate_jobs(count, rng):
+    now = datetime.now(timezone.utc)
+    jobs = []
+    for _ in range(count):
+        department = rng.choice(DEPARTMENTS)
+        jobs.append({
+            "job_id": f"{department.upper()}-{uuid.UUID(int=rng.getrandbits(128)).hex[:8]}",
+            "jobTitle": f"{department} Associate",
+            "department": department,
+            "location": rng.choice(CITIES),
+            "workType": "Full-time",
+            "workMode": rng.choice(["Onsite", "Hybrid", "Remote"]),
+            "minSalary": Decimal(rng.randrange(300000, 800000, 50000)),
+            "maxSalary": Decimal(rng.randrange(800000, 2000000, 50000)),
+            "currency": "INR",
+            "jobDescription": "Synthetic job description. " * 20,
+            "responsibilities": ["Own deliverables", "Collaborate with the team"],
+            "requirements": ["Bachelor's degree"],
+            "skills": rng.sample(SKILLS, 5),
+            "positionsAvailable": Decimal(rng.randint(1, 5)),
+            "postedDate": (now - timedelta(hours=rng.randint(0, 96))).isoformat(),
+            "status": "Active",
+        })
+    return jobs
+
+
+def generate_resumes(count, jobs, rng):
+    now = datetime.now()
+    resumes = []
+    for i in range(count):
+        job = rng.choice(jobs)
+        submitted = now - timedelta(days=rng.randint(0, 540), minutes=rng.randint(0, 1440))
+        skills = rng.sample(SKILLS, rng.randint(3, 8))
+        resume_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        resumes.append({
+            "resume_id": resume_id,
+            "filename": f"uploads/{submitted.strftime('%Y%m%d_%H%M%S')}_{resume_id[:8]}.pdf",
+            "first_name": f"Candidate{i}",
+            "last_name": "Bench",
+            "email": f"candidate{i % max(1, count // 3)}@example.com",
+            "phone": "9876543210",
+            "gender": rng.choice(["Male", "Female"]),
+            "work_pref": rng.choice(["Onsite", "Hybrid", "Remote"]),
+            "address": f"{rng.randint(1, 999)} Test Street, {rng.choice(CITIES)}",
+            "experience": rng.choice(["0-1 Year", "1-3 Years", "3-5 Years"]),
+            "age": str(rng.randint(20, 45)),
+            "status": rng.choice(STATUSES),
+            "jobId": job["job_id"],
+            "jobTitle": job["jobTitle"],
+            "datetime": submitted.strftime("%d/%m/%Y, %I:%M %p"),
+            "skills": skills,
+            "entities": [{"Text": "Example University", "Type": "ORGANIZATION"},
+                         {"Text": rng.choice(CITIES), "Type": "LOCATION"}],
+        })
+    return resumes
+
+
+def make_text_pdf(text):
+    """
+    Builds a minimal one-page PDF with a real text layer, so the local extraction path is
+    exercised. A string is wrapped at 90 characters; a list is laid out one line each.
+    """
+    lines = text if isinstance(text, list) else [text[i:i + 90] for i in range(0, len(text), 90)]
+    escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines]
+    content = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(f"({line}) '" for line in escaped) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return out
+
+
+def seed_environment(resume_count, rng):
+    """Creates the tables, bucket and secret, and loads the synthetic data set."""
+    import boto3
+
+    dynamodb = boto3.resource("dynamodb")
+    for name, key in [(RESUME_TABLE, "resume_id"), (JOB_TABLE, "job_id"), (TOKEN_TABLE, "token")]:
+        dynamodb.create_table(
+            TableName=name,
+            KeySchema=[{"AttributeName": key, "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": key, "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+    for name, key in [(NOTIFICATION_CAPS_TABLE, "cap_key"), (PROFILE_TABLE, "email"), (DUPLICATE_INDEX_TABLE, "bucket")]:
+        dynamodb.create_table(
+            TableName=name,
+            KeySchema=[{"AttributeName": key, "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": key, "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+    for name, hash_key, range_key in [(JOB_STATS_TABLE, "job_id", "status"), (ANALYTICS_TABLE, "month", "rollup_key"),
+                                      (SUBSCRIPTIONS_TABLE, "topic", "email")]:
+        dynamodb.create_table(
+            TableName=name,
+            KeySchema=[{"AttributeName": hash_key, "KeyType": "HASH"}, {"AttributeName": range_key, "KeyType": "RANGE"}],
+            AttributeDefinitions=[{"AttributeName": hash_key, "AttributeType": "S"},
+                                  {"AttributeName": range_key, "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+    jobs = generate_jobs(max(20, resume_count // 20), rng)
+    resumes = generate_resumes(resume_count, jobs, rng)
+
+    with dynamodb.Table(JOB_TABLE).batch_writer() as batch:
+        for job in jobs:
+            batch.put_item(Item=job)
+    with dynamodb.Table(RESUME_TABLE).batch_writer() as batch:
+        for resume in resumes:
+            batch.put_item(Item=resume)
+
+    # Materialized counters, rollups, profiles and subscriptions, built the same way production backfills them
+    for consumer in ("ResumeStreamStatsFunction", "ResumeStreamProfilesFunction"):
+        rebuild = load_handler(consumer, {"RESUME_TABLE": RESUME_TABLE})
+        rebuild.lambda_handler({"action": "rebuild"}, FakeContext(consumer))
+
+    s3 = boto3.client("s3")
+    s3.create_bucket(Bucket=BUCKET, CreateBucketConfiguration={"LocationConstraint": "ap-south-1"})
+    resume_text = ("Experienced engineer skilled in " + ", ".join(SKILLS) + ". Worked at Example Corp. ") * 6
+    s3.put_object(Bucket=BUCKET, Key=resumes[0]["filename"], Body=make_text_pdf(resume_text),
+                  ContentType="application/pdf")
+
+    secret_arn = boto3.client("secretsmanager").create_secret(Name=JWT_SECRET_NAME, SecretString=JWT_SECRET)["ARN"]
+    topic_arn = boto3.client("sns").create_topic(Name="bench-hr-topic")["TopicArn"]
+    queue_url = boto3.client("sqs").create_queue(QueueName="bench-job-notifications")["QueueUrl"]
+
+    token = None
+    try:
+        import jwt
+        token = jwt.encode({"resume_id": resumes[1]["resume_id"], "job_id": resumes[1]["jobId"],
+                            "reviewer_email": "hod@example.com", "exp": int(time.time()) + 86400},
+                           JWT_SECRET, algorithm="HS256")
+        dynamodb.Table(TOKEN_TABLE).put_item(Item={"token": token, "resume_id": resumes[1]["resume_id"],
+                                                   "job_id": resumes[1]["jobId"], "status": "pending",
+                                                   "ttl": int(time.time()) + 86400})
+    except ImportError:
+        pass
+
+    return {"jobs": jobs, "resumes": resumes, "secret_arn": secret_arn, "topic_arn": topic_arn, "queue_url": queue_url,
+            "token": token,
+            "job_pdf": make_text_pdf(JOB_DESCRIPTION_LINES)}
+
+
+def jobs_posted_event(jobs, count=3):
+    """The SNS delivery of a JobsPosted message, as JobPostingFunction publishes it."""
+    message = json.dumps({"event": "JobsPosted", "job_ids": [job["job_id"] for job in jobs[:count]]})
+    return {"Records": [{"EventSource": "aws:sns", "Sns": {"Subject": "JobsPosted", "Message": message}}]}
+
+
+def notification_queue_event(count=10):
+    """An SQS batch of personalized notifications, as JobNotificationFanoutFunction queues them."""
+    job = {"job_id": "ENGINEERING-bench", "jobTitle": "Engineering Associate", "department": "Engineering",
+           "location": "Noida", "workType": "Full-time", "workMode": "Hybrid", "minSalary": 600000,
+           "maxSalary": 1200000, "currency": "INR", "positionsAvailable": 2}
+    return {"Records": [{"messageId": str(i), "body": json.dumps({
+        "email": f"candidate{i}@example.com", "first_name": f"Candidate{i}", "jobs": [job]})} for i in range(count)]}
+
+
+def resume_queue_event(key):
+    """One SQS message carrying the S3 upload notification, as the resume queue delivers it."""
+    notification = {"Records": [{"eventSource": "aws:s3", "s3": {"bucket": {"name": BUCKET}, "object": {"key": key}}}]}
+    return {"Records": [{"messageId": str(uuid.uuid4()), "receiptHandle": "bench", "body": json.dumps(notification),
+                         "attributes": {"ApproximateReceiveCount": "1"}, "eventSource": "aws:sqs",
+                         "eventSourceARN": "arn:aws:sqs:ap-south-1:123456789012:bench-resume-queue"}]}
+
+
+def status_stream_event(resumes, count=100):
+    """A DynamoDB stream batch of status changes, as the resume table would emit it."""
+    records = []
+    for resume in resumes[:count]:
+        old_image = {"resume_id": {"S": resume["resume_id"]}, "jobId": {"S": resume["jobId"]},
+                     "status": {"S": resume["status"]}}
+        new_image = dict(old_image, status={"S": "Advanced by HOD"})
+        records.append({"eventName": "MODIFY", "dynamodb": {"OldImage": old_image, "NewImage": new_image}})
+    return {"Records": records}
+
+
+def application_stream_event(resumes, count=100):
+    """A DynamoDB stream batch of new applications. Replaying it, as later iterations do, must change nothing."""
+    fields = ("resume_id", "email", "first_name", "last_name", "jobId", "filename", "datetime")
+    records = []
+    for resume in resumes[:count]:
+        new_image = {field: {"S": str(resume[field])} for field in fields if resume.get(field)}
+        if resume.get("skills"):
+            new_image["skills"] = {"L": [{"S": skill} for skill in resume["skills"]]}
+        records.append({"eventName": "INSERT", "dynamodb": {"NewImage": new_image}})
+    return {"Records": records}
+
+
+JOB_DESCRIPTION_LINES = [
+    "Senior Data Engineer", "Department: Engineering", "Location: Noida", "Experience: 3-6 years",
+    "Salary: 12 - 18 LPA", "Full-time, Hybrid", "About the Role",
+    "You will build and operate the batch and streaming pipelines behind our hiring analytics.",
+    "Responsibilities:", "- Design reliable ETL pipelines on AWS", "- Own data quality checks and alerting",
+    "- Mentor junior engineers", "Requirements:", "- 3+ years with Python and SQL",
+    "- Experience with Spark or a similar engine", "Skills: Python, SQL, Spark, Airflow, AWS",
+    "Benefits:", "- Health insurance", "- Learning budget", "Contact: careers@example.com",
+]
+
+
+def multipart_event(field, filename, payload, content_type="application/pdf"):
+    """An API Gateway event carrying one file as multipart/form-data, base64-encoded like a binary media type."""
+    boundary = "----benchboundary"
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: {content_type}\r\n\r\n").encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+    return {"body": base64.b64encode(body).decode("ascii"), "isBase64Encoded": True,
+            "headers": {"content-type": f"multipart/form-data; boundary={boundary}", "accept-encoding": "gzip"}}
+
+
+# --- Handler Registry ---
+def api_event(body=None, query=None, headers=None):
+    # Browsers always advertise compression, so the benchmark does too
+    return {"body": json.dumps(body) if body is not None else None,
+            "queryStringParameters": query or {},
+            "headers": headers or {"accept-encoding": "gzip, deflate, br"}}
+
+
+HANDLERS = {
+    "getResumeEntities": {
+        "env": lambda d: {"DDB1_NAME": RESUME_TABLE, "DDB2_NAME": JOB_TABLE},
+        "event": lambda d, i: api_event(),
+    },
+    "GetJobStatsFunction": {
+        "env": lambda d: {},
+        "event": lambda d, i: api_event(),
+    },
+    "ResumeStreamStatsFunction": {
+        "env": lambda d: {"RESUME_TABLE": RESUME_TABLE},
+        "event": lambda d, i: status_stream_event(d["resumes"]),
+    },
+    "ResumeStreamProfilesFunction": {
+        "env": lambda d: {"RESUME_TABLE": RESUME_TABLE},
+        "event": lambda d, i: application_stream_event(d["resumes"]),
+    },
+    "GetCandidateProfilesFunction": {
+        "env": lambda d: {},
+        "event": lambda d, i: api_event(),
+    },
+    "GetDashboardAnalyticsFunction": {
+        "env": lambda d: {},
+        "event": lambda d, i: api_event(query={"days": "90"}),
+    },
+    "ParseJobPdfFunction": {
+        "env": lambda d: {},
+        "event": lambda d, i: multipart_event("jobPdf", "job.pdf", d["job_pdf"]),
+        "setup": lambda module: setattr(module, "comprehend", FakeComprehend()),
+    },
+    "JobNotificationFanoutFunction": {
+        "env": lambda d: {"NOTIFICATION_QUEUE_URL": d["queue_url"]},
+        "event": lambda d, i: jobs_posted_event(d["jobs"]),
+        "iterations": 3,
+    },
+    "SendJobNotificationFunction": {
+        "env": lambda d: {},
+        "event": lambda d, i: notification_queue_event(),
+    },
+    "JobListingFunction": {
+        "env": lambda d: {"TABLE_NAME": JOB_TABLE},
+        "event": lambda d, i: api_event(),
+    },
+    "DailyJobRecommendationsFunction": {
+        "env": lambda d: {"JOB_POSTING_TABLE": JOB_TABLE},
+        "event": lambda d, i: {},
+        "iterations": 3,
+    },
+    "ResumeProcessorFunction": {
+        "env": lambda d: {"TABLE_NAME": RESUME_TABLE, "HR_TOPIC_ARN": d["topic_arn"],
+                          "DUPLICATE_INDEX_TABLE": DUPLICATE_INDEX_TABLE},
+        "event": lambda d, i: resume_queue_event(d["resumes"][0]["filename"]),
+        "setup": lambda module: setattr(module, "textract", FakeTextract()) or setattr(module, "comprehend", FakeComprehend()),
+    },
+    "ResumeUploadFunction": {
+        "env": lambda d: {"BUCKET_NAME": BUCKET, "DDB_TABLE": RESUME_TABLE},
+        "event": lambda d, i: api_event({
+            "name": "Bench User", "email": f"bench{i}@example.com", "contact": "9876543210",
+            "gender": "Male", "workPref": "Hybrid", "address": "1 Test Street, Noida",
+            "resume": "resume.pdf", "resumeSize": 200000, "experience": "0-1 Year", "age": "24",
+            "jobId": d["jobs"][0]["job_id"], "jobTitle": d["jobs"][0]["jobTitle"],
+            "submittedAt": datetime.now().strftime("%d/%m/%Y, %I:%M %p"),
+        }),
+    },
+    "JobPostingFunction": {
+        "env": lambda d: {"TABLE_NAME": JOB_TABLE},
+        "event": lambda d, i: api_event({"jobTitle": "Bench Engineer", "department": "Engineering",
+                                         "skills": ["python", "aws"], "location": "Noida"}),
+    },
+    "UpdateJobPostingStatus": {
+        "env": lambda d: {"TABLE_NAME": JOB_TABLE},
+        "event": lambda d, i: api_event({"job_id": d["jobs"][1]["job_id"], "action": "update_status",
+                                         "status": "Active" if i % 2 else "Inactive"}),
+    },
+    "UpdateAppplicatiantStatus": {
+        "env": lambda d: {"DDB_NAME": RESUME_TABLE},
+        "event": lambda d, i: api_event({"resume_id": d["resumes"][2]["resume_id"], "status": "Under Review"}),
+    },
+    "SendForReviewFunction": {
+        "env": lambda d: {"TOKEN_TABLE_NAME": TOKEN_TABLE, "JWT_SECRET_ARN": d["secret_arn"]},
+        "event": lambda d, i: api_event({"resume_id": d["resumes"][3]["resume_id"], "reviewer_email": "hod@example.com",
+                                         "candidate_name": "Bench Candidate", "department": "Engineering"}),
+    },
+    "ValidateReviewTokenFunction": {
+        "env": lambda d: {"TOKEN_TABLE_NAME": TOKEN_TABLE, "CANDIDATE_TABLE_NAME": RESUME_TABLE,
+                          "JOB_TABLE_NAME": JOB_TABLE, "JWT_SECRET_ARN": d["secret_arn"]},
+        "event": lambda d, i: api_event(query={"token": d["token"]}),
+    },
+}
+
+
+# --- Helper Functions ---
+def load_handler(name, env):
+    """(Re)imports a handler module with its own environment, since several reuse TABLE_NAME for different tables."""
+    os.environ.update(env)
+    sys.modules.pop(name, None)
+    return importlib.import_module(name)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def benchmark_handler(name, spec, dataset, iterations, warmup):
+    from common import instrumentation
+
+    module = load_handler(name, spec["env"](dataset))
+    if spec.get("setup"):
+        spec["setup"](module)
+
+    captured = []
+    original_emit = instrumentation._emit_metrics
+    instrumentation._emit_metrics = lambda invocation, duration_ms: captured.append(dict(invocation.counters))
+
+    latencies = []
+    status_codes = {}
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for i in range(warmup + iterations):
+                event = spec["event"](dataset, i)
+                started = time.perf_counter()
+                response = module.lambda_handler(event, FakeContext(name))
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if i >= warmup:
+                    latencies.append(elapsed_ms)
+                    code = str((response or {}).get("statusCode"))
+                    status_codes[code] = status_codes.get(code, 0) + 1
+
+            # Separate traced pass: tracemalloc would distort the latency numbers above
+            tracemalloc.start()
+            module.lambda_handler(spec["event"](dataset, warmup + iterations), FakeContext(name))
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    finally:
+        instrumentation._emit_metrics = original_emit
+
+    measured = captured[warmup:warmup + iterations]
+
+    def mean_counter(counter):
+        return round(sum(c.get(counter, 0) for c in measured) / max(1, len(measured)), 2)
+
+    return {
+        "iterations": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "dynamodb_calls": mean_counter("DynamoDBCalls"),
+        "consumed_capacity": mean_counter("ConsumedCapacity"),
+        "response_bytes": mean_counter("ResponseBytes"),
+        "peak_memory_kb": round(peak_bytes / 1024, 1),
+        "status_codes": status_codes,
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Returns human-readable regressions; small absolute changes are ignored as noise."""
+    noise_floor = {"p95_ms": 2.0, "dynamodb_calls": 0.5, "consumed_capacity": 0.5,
+                   "response_bytes": 256, "peak_memory_kb": 256}
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        for metric, floor in noise_floor.items():
+            old, new = previous.get(metric, 0), current.get(metric, 0)
+            if new - old > floor and new > old * (1 + tolerance):
+                regressions.append(f"{key} {metric}: {old} -> {new}")
+    return regressions
+
+
+def print_report(results):
+    header = f"{'handler':<34}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'ddb':>7}{'cap':>9}{'bytes':>11}{'peak KB':>10}  status"
+    print(header)
+    print("-" * len(header))
+    for key, r in results.items():
+        print(f"{key.split(':', 1)[1]:<34}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}{r['dynamodb_calls']:>7}"
+              f"{r['consumed_capacity']:>9}{r['response_bytes']:>11}{r['peak_memory_kb']:>10}  {r['status_codes']}")
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Lambda handlers against local AWS stand-ins.")
+    parser.add_argument("--scale", choices=SCALES.keys(), default="1k", help="Number of synthetic resumes to load")
+    parser.add_argument("--handlers", nargs="*", default=list(HANDLERS), help="Subset of handlers to run")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dynamodb-endpoint", help="Use DynamoDB Local at this URL instead of moto")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Write results to {os.path.basename(BASELINE_FILE)}")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression vs. baseline")
+    args = parser.parse_args()
+
+    os.environ.update(BASE_ENV)
+    if args.dynamodb_endpoint:
+        os.environ["AWS_ENDPOINT_URL_DYNAMODB"] = args.dynamodb_endpoint
+    sys.path.insert(0, os.path.abspath(LAMBDA_DIR))
+    smtplib.SMTP = SmtpSink
+
+    from moto import mock_aws
+
+    results = {}
+    with mock_aws():
+        print(f"Seeding {SCALES[args.scale]} resumes...")
+        dataset = seed_environment(SCALES[args.scale], random.Random(args.seed))
+
+        for name in args.handlers:
+            spec = HANDLERS[name]
+            try:
+                result = benchmark_handler(name, spec, dataset, spec.get("iterations", args.iterations), args.warmup)
+            except ImportError as e:
+                print(f"Skipping {name}: {e}")
+                continue
+            results[f"{args.scale}:{name}"] = result
+
+    print()
+    print_report(results)
+    print(f"\nSMTP sink received {SmtpSink.messages} messages ({SmtpSink.bytes_sent} bytes).")
+
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            baseline = json.load(f)
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {BASELINE_FILE}")
+    elif baseline:
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  ❌ {line}")
+            sys.exit(1)
+        print("\n✅ No regressions against baseline.")
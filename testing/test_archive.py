@@ -0,0 +1,48 @@
+import gzip
+import json
+
+import pytest
+
+from common import archive
+
+ROWS = [
+    {"resume_id": "r1", "email": "a@example.com", "skills": ["Python", "AWS"], "formData": {"cgpa": 8.1}, "age": 21},
+    {"resume_id": "r2", "email": "b@example.com", "skills": [], "formData": "n/a", "status": "Rejected"},
+    {"resume_id": "r3", "email": "c@example.com", "age": 22.5, "is_duplicate": True},
+]
+
+
+@pytest.mark.parametrize("use_pyarrow", [False, True])
+def test_archive_rows_round_trip(monkeypatch, use_pyarrow):
+    if use_pyarrow and archive.pyarrow is None:
+        pytest.skip("pyarrow is not installed")
+    if not use_pyarrow:
+        monkeypatch.setattr(archive, "pyarrow", None)
+
+    body, extension = archive.encode_rows(ROWS)
+    assert extension == (".parquet" if use_pyarrow else ".json.gz")
+    assert archive.decode_rows(body, f"part-test{extension}") == ROWS
+
+
+def test_columnar_json_file_is_compressed_by_column(monkeypatch):
+    monkeypatch.setattr(archive, "pyarrow", None)
+    body, _ = archive.encode_rows(ROWS)
+    payload = json.loads(gzip.decompress(body))
+    assert payload["format"] == archive.COLUMNAR_JSON_FORMAT and payload["rows"] == 3
+    assert payload["columns"]["resume_id"] == ["r1", "r2", "r3"]
+
+
+def test_archive_age_counts_from_the_restore():
+    assert archive.archive_age_day({"datetime": "05/03/2024, 10:15 am"}) == "2024-03-05"
+    assert archive.archive_age_day({"datetime": "05/03/2024, 10:15 am",
+                                    "restored_at": "2025-06-01T08:00:00"}) == "2025-06-01"
+    assert archive.archive_age_day({"datetime": "not a date"}) is None
+
+
+def test_archive_moves_are_not_changes():
+    restored = (None, {"resume_id": "r1", "restored_at": "2025-06-01T08:00:00"})
+    marked = ({"resume_id": "r2", "archived_at": "2025-06-01T08:00:00"}, None)
+    withdrawn = ({"resume_id": "r3"}, None)
+    assert archive.is_archive_move(*restored) and archive.is_archive_move(*marked)
+    assert not archive.is_archive_move(*withdrawn)
+    assert not archive.is_archive_move({"resume_id": "r1"}, {"resume_id": "r1", "restored_at": "x"})
@@ -0,0 +1,64 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from common import duplicates, dynamo
+
+RESUME_TEXT = " ".join(f"word{i} built services with python and aws lambda for project {i}" for i in range(40))
+
+
+@pytest.fixture
+def aws():
+    with mock_aws():
+        dynamo._tables.clear()
+        boto3.resource("dynamodb").create_table(
+            TableName=duplicates.DUPLICATE_INDEX_TABLE, KeySchema=[{"AttributeName": "bucket", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "bucket", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST")
+        yield
+        dynamo._tables.clear()
+
+
+def test_signature_is_stable_and_empty_for_no_text():
+    sig = duplicates.signature(RESUME_TEXT)
+    assert len(sig) == duplicates.NUM_PERM
+    assert all(0 <= value < 2 ** 32 for value in sig)
+    assert sig == duplicates.signature(RESUME_TEXT.upper())
+    assert duplicates.signature("") is None
+    assert duplicates.signature("  ,, ") is None
+
+
+def test_signature_python_path_matches_numpy(monkeypatch):
+    if duplicates.numpy is None:
+        pytest.skip("numpy is not installed")
+    expected = duplicates.signature(RESUME_TEXT)
+    monkeypatch.setattr(duplicates, "numpy", None)
+    assert duplicates.signature(RESUME_TEXT) == expected
+
+
+def test_similar_texts_share_bands_and_different_texts_do_not():
+    sig = duplicates.signature(RESUME_TEXT)
+    near = duplicates.signature(RESUME_TEXT + " and a short extra line")
+    other = duplicates.signature(" ".join(f"unrelated{i} marketing content about campaigns {i}" for i in range(40)))
+
+    keys = duplicates.band_keys(sig)
+    assert len(keys) == duplicates.BANDS
+    assert [key.split("#")[1] for key in keys] == [str(band) for band in range(duplicates.BANDS)]
+    assert duplicates.band_keys(sig) == keys
+    assert duplicates.similarity(sig, near) >= duplicates.DUPLICATE_THRESHOLD
+    assert set(keys) & set(duplicates.band_keys(near))
+    assert duplicates.similarity(sig, other) < 0.2
+    assert not set(keys) & set(duplicates.band_keys(other))
+
+
+def test_find_near_duplicates_verifies_the_candidates_sharing_most_bands(aws, monkeypatch):
+    monkeypatch.setattr(duplicates, "MAX_CANDIDATES", 1)
+    sig = duplicates.signature(RESUME_TEXT)
+    duplicates.index_signature("z-copy", sig, email="copy@example.com")
+    # Lexically first, but shares only one band
+    duplicates.index_signature("a-other", sig[:duplicates.ROWS] + [0] * (duplicates.NUM_PERM - duplicates.ROWS))
+
+    matches, present = duplicates.find_near_duplicates("new", sig)
+
+    assert matches == [{"resume_id": "z-copy", "similarity": 100, "email": "copy@example.com"}]
+    assert present == set()
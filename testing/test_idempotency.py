@@ -0,0 +1,115 @@
+import json
+import time
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from common import dynamo
+import ResumeUploadFunction as upload
+
+KEY = "derived#test"
+
+
+@pytest.fixture
+def aws():
+    with mock_aws():
+        dynamo._tables.clear()
+        boto3.resource("dynamodb").create_table(
+            TableName=upload.IDEMPOTENCY_TABLE, KeySchema=[{"AttributeName": "idempotency_key", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "idempotency_key", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST")
+        boto3.client("s3").create_bucket(Bucket=upload.BUCKET_NAME,
+                                         CreateBucketConfiguration={"LocationConstraint": "ap-south-1"})
+        yield
+        dynamo._tables.clear()
+
+
+def stored_record():
+    return dynamo.get_item(upload.IDEMPOTENCY_TABLE, {"idempotency_key": KEY})
+
+
+def replay(fingerprint="fp"):
+    return upload.replay_submission(KEY, stored_record(), fingerprint, "application/pdf", 1024)
+
+
+def completed_body():
+    return json.dumps({"resume_id": "r1", "content_type": "application/pdf", "s3_key": "resumes/r1.pdf",
+                       "upload_url": "https://upload", "upload_fields": {}})
+
+
+def test_first_submission_claims_the_key(aws):
+    assert upload.reserve_submission(KEY, "fp", "r1", "resumes/r1.pdf") is None
+    assert stored_record()["state"] == "pending"
+
+
+def test_pending_submission_is_not_replayed(aws):
+    upload.reserve_submission(KEY, "fp", "r1", "resumes/r1.pdf")
+    existing = upload.reserve_submission(KEY, "fp", "r2", "resumes/r2.pdf")
+    assert existing["resume_id"] == "r1"
+    assert replay()["statusCode"] == 409
+
+
+def test_other_payload_with_same_key_is_refused(aws):
+    upload.reserve_submission(KEY, "fp", "r1", "resumes/r1.pdf")
+    upload.complete_submission(KEY, completed_body())
+    response = replay(fingerprint="other")
+    assert response["statusCode"] == 409
+    assert "already submitted" in json.loads(response["body"])["error"]
+
+
+def test_completed_submission_replays_its_upload_targets(aws):
+    upload.reserve_submission(KEY, "fp", "r1", "resumes/r1.pdf")
+    upload.complete_submission(KEY, completed_body())
+    response = replay()
+    assert response["statusCode"] == 200
+    assert response["headers"]["Idempotent-Replayed"] == "true"
+    assert json.loads(response["body"])["upload_url"] == "https://upload"
+
+
+def test_expired_upload_targets_are_signed_again(aws):
+    upload.reserve_submission(KEY, "fp", "r1", "resumes/r1.pdf")
+    upload.complete_submission(KEY, completed_body())
+    dynamo.table(upload.IDEMPOTENCY_TABLE).update_item(
+        Key={"idempotency_key": KEY}, UpdateExpression="SET upload_expires_at = :past",
+        ExpressionAttributeValues={":past": int(time.time()) - 1})
+    body = json.loads(replay()["body"])
+    assert body["upload_url"] != "https://upload" and "Content-Type" in body["upload_fields"]
+    assert stored_record()["upload_expires_at"] > time.time()
+
+
+def test_uploaded_resume_is_not_handed_out_again(aws):
+    upload.reserve_submission(KEY, "fp", "r1", "resumes/r1.pdf")
+    upload.complete_submission(KEY, completed_body())
+    boto3.client("s3").put_object(Bucket=upload.BUCKET_NAME, Key="resumes/r1.pdf", Body=b"%PDF-1.4")
+    body = json.loads(replay()["body"])
+    assert body["already_uploaded"] is True and body["s3_key"] == "resumes/r1.pdf"
+    assert "upload_url" not in body and "multipart" not in body
+
+
+def test_released_key_can_be_claimed_again(aws):
+    upload.reserve_submission(KEY, "fp", "r1", "resumes/r1.pdf")
+    upload.release_submission(KEY)
+    assert upload.reserve_submission(KEY, "fp", "r2", "resumes/r2.pdf") is None
+    assert stored_record()["resume_id"] == "r2"
+
+
+@pytest.mark.parametrize("update, values", [
+    ("SET created_at = :old", {":old": int(time.time()) - upload.PENDING_TIMEOUT - 1}),
+    ("SET #state = :done, #ttl = :old", {":done": "completed", ":old": int(time.time()) - 1}),
+])
+def test_abandoned_or_expired_claims_are_taken_over(aws, update, values):
+    upload.reserve_submission(KEY, "fp", "r1", "resumes/r1.pdf")
+    names = {name: name[1:] for name in ("#state", "#ttl") if name in update}
+    dynamo.table(upload.IDEMPOTENCY_TABLE).update_item(
+        Key={"idempotency_key": KEY}, UpdateExpression=update, ExpressionAttributeValues=values,
+        **({"ExpressionAttributeNames": names} if names else {}))
+    assert upload.reserve_submission(KEY, "fp", "r2", "resumes/r2.pdf") is None
+    assert stored_record()["state"] == "pending" and stored_record()["resume_id"] == "r2"
+
+
+def test_idempotency_key_prefers_the_header():
+    event = {"headers": {"Idempotency-Key": " abc "}}
+    assert upload.idempotency_key(event, "A@example.com", "HR-1") == "key#abc"
+    derived = upload.idempotency_key({}, " A@Example.com", "HR-1")
+    assert derived == upload.idempotency_key({}, "a@example.com", "HR-1") != upload.idempotency_key({}, "a@example.com", "HR-2")
@@ -0,0 +1,48 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from common import dynamo, job_aliases
+
+
+@pytest.fixture
+def aliases():
+    with mock_aws():
+        dynamo._tables.clear()
+        boto3.resource("dynamodb").create_table(
+            TableName=job_aliases.JOB_ALIAS_TABLE, KeySchema=[{"AttributeName": "old_job_id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "old_job_id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST")
+        yield
+        dynamo._tables.clear()
+
+
+def add_alias(old_job_id, new_job_id):
+    dynamo.table(job_aliases.JOB_ALIAS_TABLE).put_item(Item=job_aliases.alias_put(old_job_id, new_job_id)["Put"]["Item"])
+
+
+def test_resolve_job_ids_follows_chains(aliases):
+    add_alias("HR-1", "ADMIN-1")
+    add_alias("ADMIN-1", "OPS-1")
+    add_alias("ENG-2", "DATA-2")
+    assert job_aliases.resolve_job_ids(["HR-1", "ADMIN-1", "ENG-2", "ENG-3"]) == {
+        "HR-1": "OPS-1", "ADMIN-1": "OPS-1", "ENG-2": "DATA-2"}
+
+
+def test_resolve_job_ids_stops_after_max_hops(aliases):
+    add_alias("A", "B")
+    add_alias("B", "A")
+    assert job_aliases.resolve_job_ids(["A"]) == {"A": "B" if job_aliases.MAX_ALIAS_HOPS % 2 else "A"}
+
+
+def test_mark_migrated_flags_the_alias(aliases):
+    add_alias("HR-1", "ADMIN-1")
+    job_aliases.mark_migrated("HR-1", 3)
+    alias = dynamo.table(job_aliases.JOB_ALIAS_TABLE).get_item(Key={"old_job_id": "HR-1"})["Item"]
+    assert alias["migrated"] is True and alias["applicants_moved"] == 3
+
+
+def test_aliases_are_optional(monkeypatch):
+    monkeypatch.setattr(job_aliases, "JOB_ALIAS_TABLE", None)
+    assert job_aliases.resolve_job_ids(["HR-1"]) == {}
+    assert job_aliases.mark_migrated("HR-1", 3) is None
@@ -0,0 +1,47 @@
+import pytest
+
+from JobPostingFunction import normalize_row, parse_csv
+
+
+def test_normalize_row_coerces_csv_cells():
+    data, errors = normalize_row({
+        "jobTitle": " Backend Intern ", "department": "Engineering", "minSalary": "15000", "maxSalary": "20000.5",
+        "allowRemote": "Yes", "isUrgent": "no", "skills": "Python, AWS;Docker", "requirements": "B.Tech\nFinal year",
+        "applicationDeadline": "2025-08-01", "reportingTo": "",
+    })
+    assert errors == []
+    assert data["jobTitle"] == "Backend Intern"
+    assert data["minSalary"] == 15000 and data["maxSalary"] == 20000.5
+    assert data["allowRemote"] is True and data["isUrgent"] is False
+    assert data["skills"] == ["Python", "AWS", "Docker"]
+    assert data["requirements"] == ["B.Tech", "Final year"]
+    assert "reportingTo" not in data
+
+
+def test_normalize_row_keeps_commas_in_non_skill_lists():
+    data, _ = normalize_row({"jobTitle": "Intern", "department": "HR", "benefits": "Meals, snacks; Cab"})
+    assert data["benefits"] == ["Meals, snacks", "Cab"]
+
+
+def test_normalize_row_accepts_json_rows():
+    data, errors = normalize_row({"jobTitle": "Intern", "department": "HR", "minExperience": 0, "maxExperience": 2,
+                                  "skills": ["Excel"], "allowRemote": True})
+    assert errors == []
+    assert data["minExperience"] == 0 and data["skills"] == ["Excel"] and data["allowRemote"] is True
+
+
+@pytest.mark.parametrize("row, error", [
+    ({"department": "HR"}, "jobTitle is required"),
+    ({"jobTitle": "Intern", "department": "HR", "minExperience": "two"}, "minExperience must be a number"),
+    ({"jobTitle": "Intern", "department": "HR", "positionsAvailable": True}, "positionsAvailable must be a number"),
+    ({"jobTitle": "Intern", "department": "HR", "minSalary": 30000, "maxSalary": "20000"}, "minSalary cannot exceed maxSalary"),
+    ({"jobTitle": "Intern", "department": "HR", "applicationDeadline": "01/08/2025"}, "applicationDeadline must be YYYY-MM-DD"),
+])
+def test_normalize_row_reports_errors(row, error):
+    _, errors = normalize_row(row)
+    assert error in errors
+
+
+def test_parse_csv_skips_blank_lines():
+    rows = parse_csv("jobTitle,department\nIntern,HR\n,\n\nAnalyst,Finance\n")
+    assert [row["jobTitle"] for row in rows] == ["Intern", "Analyst"]
@@ -0,0 +1,36 @@
+from common.lexicon import find_terms
+
+
+def test_find_terms_prefers_the_longest_match():
+    assert find_terms("React Native developer, React.js, IIT Delhi") == [
+        ("SKILL", "React Native"), ("SKILL", "React"), ("ORGANIZATION", "IIT Delhi")]
+
+
+def test_find_terms_requires_word_boundaries():
+    assert find_terms("javascripting, pythonic, sqlalchemy") == []
+
+
+def test_find_terms_ignores_everyday_words():
+    assert find_terms("6th sem, guard rails, ai team") == []
+    assert find_terms("I excel at teamwork") == [("SKILL", "Teamwork")]
+
+
+def test_find_terms_matches_exact_case_spellings():
+    assert find_terms("AI and ML projects, interned at EY") == [
+        ("SKILL", "Artificial Intelligence"), ("SKILL", "Machine Learning"), ("ORGANIZATION", "EY")]
+
+
+def test_find_terms_skips_capitalized_words_that_start_sentences():
+    assert find_terms("Excel in teams. Meta data. Swift delivery.") == []
+    assert find_terms("EY audit. AI work") == [("ORGANIZATION", "EY"), ("SKILL", "Artificial Intelligence")]
+
+
+def test_find_terms_matches_capitalized_words_in_lists():
+    assert find_terms("Skills:\nExcel, Tableau\nSwift\n• Spark") == [
+        ("SKILL", "Excel"), ("SKILL", "Tableau"), ("SKILL", "Swift"), ("SKILL", "Spark")]
+    assert find_terms("I use Excel daily") == [("SKILL", "Excel")]
+
+
+def test_find_terms_reports_each_term_once():
+    assert find_terms("Python, python and PYTHON in Bangalore and Bengaluru") == [
+        ("SKILL", "Python"), ("LOCATION", "Bengaluru")]